@@ -1,19 +1,14 @@
 import streamlit as st
-import cv2
-import time
-from getposedata import process_frame
-import mediapipe as mp
-import datetime
-from zoneinfo import ZoneInfo
+from script.pose import LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_KNEE, RIGHT_KNEE
+from script.shared import camera_monitor
+from script.quality import quality_controller
+from script.sources import SOURCE_STATE_LABELS
 
 st.set_page_config(
     page_title="지능형 노인 낙상 감지 시스템",
     layout="wide",
 )
 
-kst_now = datetime.datetime.now(ZoneInfo("Asia/Seoul"))
-timestamp = kst_now.strftime("%Y%m%d_%H%M%S")
-
 if 'history' not in st.session_state:
     st.session_state.history = []
 
@@ -49,44 +44,42 @@ with col2:
     st.subheader("📜 상태 기록")
     history_area = st.empty()
 
-# 카메라 제어
+# 카메라 제어: 카메라와 분석은 프로세스 공유 모니터가 한 번만 하고, 세션은 시청 여부만 바꿈
+# (저장소/설정 감시/최근 기록은 app2.py와 같은 방식으로, 어느 페이지가 먼저 열려도 같음)
+monitor = camera_monitor("0")
+quality_controller(monitor.config_watcher)
 if start:
-    st.session_state.camera = cv2.VideoCapture(0)
+    st.session_state.camera = True
 if stop and st.session_state.camera:
-    st.session_state.camera.release()
-    st.session_state.camera = None
+    st.session_state.camera = False
 
 # 프레임 처리 루프
 last_print_time = 0
-if st.session_state.camera and st.session_state.camera.isOpened():
-    while True:
-        ret, frame = st.session_state.camera.read()
-        if not ret:
-            st.warning("⚠️ 카메라 프레임을 읽을 수 없습니다.")
-            break
-
-        image, landmarks = process_frame(frame)
-        frame_display.image(image, channels="RGB", use_container_width=True)
-
-        current_time = time.time()
-        if landmarks and current_time - last_print_time >= 1:
-            left_shoulder = landmarks[mp.solutions.pose.PoseLandmark.LEFT_SHOULDER]
-            right_shoulder = landmarks[mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER]
-            left_knee = landmarks[mp.solutions.pose.PoseLandmark.LEFT_KNEE]
-            right_knee = landmarks[mp.solutions.pose.PoseLandmark.RIGHT_KNEE]
-
-            table_md = f"""
-            |관절|X|Y|Z|신뢰도|적합|
-            |:--:|:--:|:--:|:--:|:--:|:--:|
-            |왼쪽 어깨|{left_shoulder.x:.3f}|{left_shoulder.y:.3f}|{left_shoulder.z:.3f}|{left_shoulder.visibility:.2f}|{"✅" if left_shoulder.visibility > 0.7 else "❌"}|
-            |오른쪽 어깨|{right_shoulder.x:.3f}|{right_shoulder.y:.3f}|{right_shoulder.z:.3f}|{right_shoulder.visibility:.2f}|{"✅" if right_shoulder.visibility > 0.7 else "❌"}|
-            |왼쪽 무릎|{left_knee.x:.3f}|{left_knee.y:.3f}|{left_knee.z:.3f}|{left_knee.visibility:.2f}|{"✅" if left_knee.visibility > 0.7 else "❌"}|
-            |오른쪽 무릎|{right_knee.x:.3f}|{right_knee.y:.3f}|{right_knee.z:.3f}|{right_knee.visibility:.2f}|{"✅" if right_knee.visibility > 0.7 else "❌"}|
-            """
-            landmark_info.markdown(table_md)
-            last_print_time = current_time
-
-        time.sleep(0.03)
+if st.session_state.camera:
+    with monitor.viewer() as feed:
+        while True:
+            update = feed.next(timeout=2.0)
+            if update is None:
+                # 끊김/멈춤은 모니터가 재연결하므로 루프를 끝내지 않음
+                frame_display.info(f"📷 카메라 프레임을 기다리는 중입니다. ({SOURCE_STATE_LABELS[monitor.source_state]})")
+                continue
+
+            with monitor.profiler.stage("ui"):
+                # 관절이 그려진 공유 미리보기 (모든 세션이 같은 JPEG 사용)
+                frame_display.image(monitor.preview.jpeg(update), use_container_width=True)
+
+                frame = update.frame
+                if frame.pose is not None and update.t - last_print_time >= 1:
+                    # 표 값은 모니터가 만든 프레임 객체에서 한 번 변환된 것을 읽음 (적합 기준 신뢰도 0.7)
+                    rows = []
+                    for name, landmark_id in (("왼쪽 어깨", LEFT_SHOULDER), ("오른쪽 어깨", RIGHT_SHOULDER),
+                                              ("왼쪽 무릎", LEFT_KNEE), ("오른쪽 무릎", RIGHT_KNEE)):
+                        x, y, z, visibility, _ = frame.joint(landmark_id)
+                        fit = "✅" if visibility >= 0.7 else "❌"
+                        rows.append(f'|{name}|{x:.3f}|{y:.3f}|{z:.3f}|{visibility:.2f}|{fit}|')
+                    table_md = "\n".join(["|관절|X|Y|Z|신뢰도|적합|", "|:--:|:--:|:--:|:--:|:--:|:--:|", *rows])
+                    landmark_info.markdown(table_md)
+                    last_print_time = update.t
 
 # 상태 기록 출력
 if st.session_state.history:
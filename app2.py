@@ -1,11 +1,13 @@
 import streamlit as st
-import cv2
-import time
 import psutil
-from getposedata import process_frame
-import mediapipe as mp
-import datetime
-from zoneinfo import ZoneInfo
+import time
+from script.eventstore import STATUS_CLASS
+from script.timeutil import format_kst
+from script.detector import POSE_STATE_LABELS
+from script.shared import camera_monitor, config_watcher as shared_config_watcher, event_store
+from script.quality import QUALITY_LEVELS, quality_controller
+from script.sources import SOURCE_STATE_LABELS
+from script.render import HistoryRenderer, LandmarkTableRenderer, RenderStats
 
 # 페이지 설정
 st.set_page_config(
@@ -77,19 +79,34 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+CAMERA_ID = "0"
+# 이 시간 동안 새 분석 결과가 없으면 대기 안내 표시 (초)
+FRAME_TIMEOUT = 2.0
+HISTORY_PAGE_SIZE = 20
+
+
+# 이벤트 저장소/설정 감시는 세션/재실행과 무관하게 프로세스당 하나 (app.py와 같은 객체)
+store = event_store()
+config_watcher = shared_config_watcher()
+
+# 공유 카메라 모니터: 같은 프로세스의 모든 세션이 카메라 하나와 분석 스레드 하나를 함께 씀
+# (어느 페이지가 먼저 열려도 script/shared.py의 같은 방식으로 만들어짐)
+monitor = camera_monitor(CAMERA_ID)
+# CPU 예산([quality])에 맞춰 공유 카메라들의 FPS/해상도/모델을 자동 조절 (프로세스에 하나)
+quality = quality_controller(config_watcher)
+
 # 세션 상태 초기화
 if 'history' not in st.session_state:
-    st.session_state.history = []
+    st.session_state.history = list(monitor.history)
+
+if 'history_cursor' not in st.session_state:
+    st.session_state.history_cursor = []
 
 if 'camera' not in st.session_state:
     st.session_state.camera = None
 
 if 'fall_count' not in st.session_state:
-    st.session_state.fall_count = 0
-
-# 현재 시간(KST) 설정
-kst_now = datetime.datetime.now(ZoneInfo("Asia/Seoul"))
-timestamp = kst_now.strftime("%Y-%m-%d %H:%M:%S")
+    st.session_state.fall_count = monitor.fall_count
 
 # 제목 표시
 st.markdown("<div class='title'>🛡️ 지능형 노인 낙상 감지 시스템</div>", unsafe_allow_html=True)
@@ -109,13 +126,14 @@ with status_col1:
     """, unsafe_allow_html=True)
 
 with status_col2:
-    recent_status = st.session_state.history[-1].split(": ")[1] if st.session_state.history else "대기 중"
-    status_class = "status-normal"
-    if "주의" in recent_status:
-        status_class = "status-warning"
-    elif "위험" in recent_status or "낙상" in recent_status:
-        status_class = "status-danger"
-    
+    if st.session_state.history:
+        recent_event = st.session_state.history[-1]
+        recent_status = recent_event.message
+        status_class = STATUS_CLASS[recent_event.status]
+    else:
+        recent_status = "대기 중"
+        status_class = "status-normal"
+
     st.markdown(f"""
     <div class="status-card">
         <div style="font-weight: bold;">🔍 현재 상태</div>
@@ -151,185 +169,115 @@ with col2:
     st.markdown("<div class='subheader'>📜 상태 기록</div>", unsafe_allow_html=True)
     history_area = st.empty()
 
-# 낙상 감지 함수
-def detect_fall(landmarks):
-    """MediaPipe 관절 좌표를 기반으로 낙상 상태를 감지하는 함수"""
-    if not landmarks:
-        return "정상: 감지 중", False
-    
-    # 필요한 관절 좌표 추출
-    key_points = [
-        mp.solutions.pose.PoseLandmark.LEFT_SHOULDER,
-        mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER,
-        mp.solutions.pose.PoseLandmark.LEFT_HIP,
-        mp.solutions.pose.PoseLandmark.RIGHT_HIP,
-        mp.solutions.pose.PoseLandmark.LEFT_KNEE,
-        mp.solutions.pose.PoseLandmark.RIGHT_KNEE,
-        mp.solutions.pose.PoseLandmark.LEFT_ANKLE,
-        mp.solutions.pose.PoseLandmark.RIGHT_ANKLE
-    ]
-    
-    if not all(point in landmarks for point in key_points):
-        return "주의: 일부 관절 감지 불가", False
-    
-    left_shoulder_y = landmarks[mp.solutions.pose.PoseLandmark.LEFT_SHOULDER].y
-    right_shoulder_y = landmarks[mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER].y
-    left_hip_y = landmarks[mp.solutions.pose.PoseLandmark.LEFT_HIP].y
-    right_hip_y = landmarks[mp.solutions.pose.PoseLandmark.RIGHT_HIP].y
-    
-    shoulder_hip_diff = ((left_shoulder_y + right_shoulder_y) / 2) - ((left_hip_y + right_hip_y) / 2)
-    abs_shoulder_hip_diff = abs(shoulder_hip_diff)
-    
-    left_knee_y = landmarks[mp.solutions.pose.PoseLandmark.LEFT_KNEE].y
-    right_knee_y = landmarks[mp.solutions.pose.PoseLandmark.RIGHT_KNEE].y
-    left_ankle_y = landmarks[mp.solutions.pose.PoseLandmark.LEFT_ANKLE].y
-    right_ankle_y = landmarks[mp.solutions.pose.PoseLandmark.RIGHT_ANKLE].y
-    
-    confidences = [landmarks[point].visibility for point in key_points]
-    avg_confidence = sum(confidences) / len(confidences)
-    
-    if abs_shoulder_hip_diff < 0.15 and avg_confidence > 0.6:
-        knee_ankle_shoulder_diff = abs(((left_knee_y + right_knee_y) / 2) - ((left_shoulder_y + right_shoulder_y) / 2))
-        
-        if knee_ankle_shoulder_diff < 0.3:
-            return "위험: 낙상 감지됨", True
+    # 저장소 전체 기록 조회 (키셋 페이지네이션)
+    with st.expander("📚 전체 기록 조회"):
+        cursor = st.session_state.history_cursor
+        page_events = store.page(CAMERA_ID, before=cursor[-1] if cursor else None, limit=HISTORY_PAGE_SIZE)
+        page_col1, page_col2 = st.columns([1, 1])
+        with page_col1:
+            if st.button("◀ 최근", disabled=not cursor, use_container_width=True):
+                cursor.pop()
+                st.rerun()
+        with page_col2:
+            if st.button("이전 기록 ▶", disabled=len(page_events) < HISTORY_PAGE_SIZE, use_container_width=True):
+                cursor.append(page_events[-1])
+                st.rerun()
+        if page_events:
+            st.dataframe(
+                [{"시간": format_kst(e.ts), "상태": e.message,
+                  "신뢰도": None if e.confidence is None else round(e.confidence, 2)} for e in page_events],
+                use_container_width=True,
+                hide_index=True,
+            )
         else:
-            return "주의: 비정상적 자세", False
-    
-    elif shoulder_hip_diff < -0.2 and avg_confidence > 0.7:
-        return "정상: 안정적 자세", False
-    
-    elif abs_shoulder_hip_diff < 0.2 and avg_confidence > 0.7:
-        return "주의: 불안정한 자세", False
-        
-    return "정상: 모니터링 중", False
+            st.markdown("<div class='info-text'>기록된 활동이 없습니다.</div>", unsafe_allow_html=True)
+
+# 화면 조각 렌더러 (템플릿은 한 번만 만들고, 바뀐 부분만 다시 채움)
+landmark_renderer = LandmarkTableRenderer()
+history_renderer = HistoryRenderer()
+# UI 렌더링 비용은 감지와 별도로 집계 (사이드바에 표시)
+render_stats = RenderStats()
+
 
-# 카메라 제어
+# 상태 기록 HTML (바뀌지 않았으면 화면 갱신 생략)
+def show_history(force=False):
+    with render_stats.measure("history"):
+        history_html, changed = history_renderer.render(st.session_state.history)
+        if changed or force:
+            history_area.markdown(history_html, unsafe_allow_html=True)
+
+# 카메라 제어: 이 세션이 공유 카메라를 시청할지 여부만 바꿈
+# (카메라는 첫 시청자가 켜고, 마지막 시청자가 떠나면 잠시 뒤 꺼짐)
 if start:
-    st.session_state.camera = cv2.VideoCapture(0)
-    status_time = datetime.datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-    st.session_state.history.append(f"[{status_time}]: 카메라 활성화")
+    st.session_state.camera = True
 
 if stop and st.session_state.camera:
-    st.session_state.camera.release()
-    st.session_state.camera = None
-    status_time = datetime.datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-    st.session_state.history.append(f"[{status_time}]: 카메라 비활성화")
+    st.session_state.camera = False
 
-# 특정 관절의 정보를 테이블로 표시하는 함수
-def display_landmarks(landmarks):
-    if not landmarks:
-        return "<div class='info-text'>감지된 관절 정보가 없습니다.</div>"
-    
-    key_joints = [
-        (mp.solutions.pose.PoseLandmark.LEFT_SHOULDER, "왼쪽 어깨"),
-        (mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER, "오른쪽 어깨"),
-        (mp.solutions.pose.PoseLandmark.LEFT_HIP, "왼쪽 엉덩이"),
-        (mp.solutions.pose.PoseLandmark.RIGHT_HIP, "오른쪽 엉덩이"),
-        (mp.solutions.pose.PoseLandmark.LEFT_KNEE, "왼쪽 무릎"),
-        (mp.solutions.pose.PoseLandmark.RIGHT_KNEE, "오른쪽 무릎"),
-        (mp.solutions.pose.PoseLandmark.LEFT_ANKLE, "왼쪽 발목"),
-        (mp.solutions.pose.PoseLandmark.RIGHT_ANKLE, "오른쪽 발목")
-    ]
-    
-    table_html = """
-    <table style="width:100%; border-collapse: collapse;">
-      <tr style="background-color: #EEF2FF;">
-        <th style="text-align: left; padding: 0.5rem;">관절</th>
-        <th style="text-align: center; padding: 0.5rem;">X</th>
-        <th style="text-align: center; padding: 0.5rem;">Y</th>
-        <th style="text-align: center; padding: 0.5rem;">Z</th>
-        <th style="text-align: center; padding: 0.5rem;">신뢰도</th>
-      </tr>
-    """
-    
-    for idx, (landmark_id, joint_name) in enumerate(key_joints):
-        if landmark_id in landmarks:
-            landmark = landmarks[landmark_id]
-            
-            confidence_color = "#10B981" if landmark.visibility > 0.7 else \
-                              "#F59E0B" if landmark.visibility > 0.5 else "#EF4444"
-            
-            bg_color = "#F9FAFB" if idx % 2 == 0 else "white"
-            
-            table_html += f"""
-            <tr style="background-color: {bg_color};">
-              <td style="padding: 0.5rem;">{joint_name}</td>
-              <td style="text-align: center; padding: 0.5rem;">{landmark.x:.3f}</td>
-              <td style="text-align: center; padding: 0.5rem;">{landmark.y:.3f}</td>
-              <td style="text-align: center; padding: 0.5rem;">{landmark.z:.3f}</td>
-              <td style="text-align: center; padding: 0.5rem; color: {confidence_color}; font-weight: bold;">
-                {landmark.visibility:.2f}
-              </td>
-            </tr>
-            """
-    
-    table_html += "</table>"
-    return table_html
-
-# 버퍼 비우기 함수
-def clear_camera_buffer(capture):
-    while capture.isOpened() and capture.read()[0]:
-        continue
-
-# 프레임 처리 루프
-last_landmarks_update = 0
-last_fall_check = 0
-
-if st.session_state.camera and st.session_state.camera.isOpened():
-    while True:
-        # 버퍼 비우기
-        clear_camera_buffer(st.session_state.camera)
-
-        ret, frame = st.session_state.camera.read()
-        if not ret:
-            st.warning("⚠️ 카메라 프레임을 읽을 수 없습니다.")
-            break
-
-        image, landmarks = process_frame(frame)
-        frame_display.image(image, channels="RGB", use_container_width=True)
-
-        current_time = time.time()
-        
-        # CPU 사용량 모니터링
-        cpu_usage = psutil.cpu_percent(interval=None)
-        st.sidebar.markdown(f"**CPU 사용량:** {cpu_usage}%")
-
-        # 관절 정보 업데이트 (1초마다)
-        if current_time - last_landmarks_update >= 1:
-            landmark_table = display_landmarks(landmarks)
-            landmark_info.markdown(landmark_table, unsafe_allow_html=True)
-            last_landmarks_update = current_time
-        
-        # 낙상 상태 체크 (2초마다)
-        if current_time - last_fall_check >= 2:
-            status, is_fall = detect_fall(landmarks)
-            status_time = datetime.datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-            
-            if is_fall:
-                st.session_state.fall_count += 1
-            
-            st.session_state.history.append(f"[{status_time}]: {status}")
-            if len(st.session_state.history) > 10:
-                st.session_state.history = st.session_state.history[-10:]
-            
-            last_fall_check = current_time
-        
-        # 히스토리 렌더링
-        history_html = "<div style='max-height: 300px; overflow-y: auto;'>"
-        for item in reversed(st.session_state.history):
-            status_class = "status-normal"
-            if "주의" in item:
-                status_class = "status-warning"
-            elif "위험" in item or "낙상" in item:
-                status_class = "status-danger"
-                
-            history_html += f"<div class='log-item'><span class='{status_class}'>{item}</span></div>"
-        history_html += "</div>"
-        
-        history_area.markdown(history_html, unsafe_allow_html=True)
-        
-        time.sleep(0.03)
+# 관절 정보 표 (표시 값이 바뀐 경우만 화면 갱신)
+def show_landmarks(frame):
+    with render_stats.measure("landmarks"):
+        table_html, changed = landmark_renderer.render(frame, POSE_STATE_LABELS.get(frame.state, ""))
+        if changed:
+            landmark_info.markdown(table_html, unsafe_allow_html=True)
+
+# 프로파일링: 재시작 없이 켜고 끄며, 최근 구간을 data/profiles에 collapsed-stack/SVG로 저장
+profiler = monitor.profiler
+with st.sidebar.expander("🔬 프로파일링"):
+    st.toggle("구간 타이머 / 스택 샘플링", value=profiler.enabled, key="profiling",
+              on_change=lambda: setattr(profiler, "enabled", st.session_state.profiling))
+    if st.button("최근 30초 플레임 그래프 저장", disabled=not profiler.enabled, use_container_width=True):
+        for path in profiler.dump(seconds=30.0):
+            st.caption(path)
+
+# 분석 결과 표시 루프 (분석은 모니터 스레드에서 한 번만, 세션은 결과와 공유 미리보기만 읽음)
+if st.session_state.camera:
+    sidebar_info = st.sidebar.empty()
+    last_landmarks_update = 0
+    with monitor.viewer() as feed:
+        while True:
+            update = feed.next(timeout=FRAME_TIMEOUT)
+            if update is None:
+                # 끊김/멈춤은 모니터가 재연결하므로 루프를 끝내지 않고 상태만 안내
+                frame_display.info(f"📷 카메라 프레임을 기다리는 중입니다. ({SOURCE_STATE_LABELS[monitor.source_state]})")
+                continue
+
+            profile = config_watcher.current.profile_for(CAMERA_ID)
+
+            with profiler.stage("ui"):
+                # CPU 사용량 / UI 렌더링 비용 / 시청자 수 / (켜져 있으면) 구간별 처리 시간 모니터링
+                cpu_usage = psutil.cpu_percent(interval=None)
+                sidebar_text = (
+                    f"**CPU 사용량:** {cpu_usage}%  \n**시청 세션:** {monitor.viewers}  \n"
+                    "**렌더링 (평균/최대):**  \n" + "  \n".join(render_stats.summary())
+                )
+                # 감시 상태: 입력 버퍼/버린 프레임, Watchdog 재시작 횟수
+                video = monitor.video
+                if video is not None:
+                    sidebar_text += (f"  \n**입력 버퍼:** {video.depth}장 (버림 {video.frames_dropped})"
+                                     f"  \n**자동 재시작:** {monitor.restarts}회")
+                # 품질 자동 조절 단계와 프레임당 처리 시간
+                sidebar_text += (f"  \n**분석 품질:** {monitor.quality_level}단계 "
+                                 f"({QUALITY_LEVELS[monitor.quality_level].label}), {monitor.latency * 1e3:.0f}ms/프레임")
+                if profiler.enabled:
+                    sidebar_text += "  \n**구간 (평균/p95/최대):**  \n" + "  \n".join(profiler.summary())
+                sidebar_info.markdown(sidebar_text)
+                # 렌더링이 예산을 넘으면 관절 표 갱신 주기를 늘림
+                landmark_interval = render_stats.interval("landmarks", profile.landmark_update_interval)
+
+                # 미리보기는 모든 시청자가 같은 JPEG 바이트를 씀
+                with render_stats.measure("preview"):
+                    frame_display.image(monitor.preview.jpeg(update), use_container_width=True)
+
+                # 관절 정보 업데이트 (프로필 주기, 기본 1초)
+                if update.t - last_landmarks_update >= landmark_interval:
+                    show_landmarks(update.frame)
+                    last_landmarks_update = update.t
+
+                # 낙상 횟수/상태 기록은 모니터가 관리 (상태가 바뀔 때만 저장소에 기록)
+                st.session_state.fall_count = update.fall_count
+                st.session_state.history = list(monitor.history)
+                show_history()
 
 else:
     frame_display.markdown("""
@@ -353,23 +301,12 @@ else:
     landmark_info.markdown("<div class='info-text'>카메라가 비활성화 상태입니다. 관절 정보를 표시할 수 없습니다.</div>", unsafe_allow_html=True)
     
     if st.session_state.history:
-        history_html = "<div style='max-height: 300px; overflow-y: auto;'>"
-        for item in reversed(st.session_state.history):
-            status_class = "status-normal"
-            if "주의" in item:
-                status_class = "status-warning"
-            elif "위험" in item or "낙상" in item:
-                status_class = "status-danger"
-                
-            history_html += f"<div class='log-item'><span class='{status_class}'>{item}</span></div>"
-        history_html += "</div>"
-        
-        history_area.markdown(history_html, unsafe_allow_html=True)
+        show_history(force=True)
     else:
         history_area.markdown("<div class='info-text'>기록된 활동이 없습니다.</div>", unsafe_allow_html=True)
 
 st.markdown(f"""
 <div style="text-align: center; margin-top: 2rem; padding-top: 1rem; border-top: 1px solid #E5E7EB; color: #9CA3AF; font-size: 0.875rem;">
-    © 2025 지능형 노인 낙상 감지 시스템 | 현재 시간: {timestamp}
+    © 2025 지능형 노인 낙상 감지 시스템 | 현재 시간: {format_kst(time.time())}
 </div>
 """, unsafe_allow_html=True)
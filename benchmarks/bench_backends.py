@@ -0,0 +1,105 @@
+"""포즈 백엔드별 속도와 정확도 비교 (녹화 영상 기준)
+
+    python benchmarks/bench_backends.py clips/*.mp4
+    python benchmarks/bench_backends.py clips/*.mp4 --onnx models/pose_landmark.onnx --threads 2
+
+가장 무거운 백엔드(기본 mediapipe-heavy)의 결과를 기준값으로 삼아 다른 백엔드의
+관절 오차와 PCK(기준 관절과의 거리 < 0.05인 비율)를 계산한다. 저전력 장비에서
+정확도를 얼마나 잃고 처리량을 얼마나 얻는지 한 표로 확인하는 용도다.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script.backends import create_backend  # noqa: E402
+from script.features import KEY_POINTS  # noqa: E402
+
+
+def read_frames(paths, max_frames, stride):
+    frames = []
+    for path in paths:
+        capture = cv2.VideoCapture(path)
+        index = 0
+        while len(frames) < max_frames:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            if index % stride == 0:
+                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            index += 1
+        capture.release()
+    return frames
+
+
+def run_backend(backend, frames, warmup=5):
+    for frame in frames[:warmup]:
+        backend.process(frame)
+    poses, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        poses.append(backend.process(frame))
+        latencies.append(time.perf_counter() - start)
+    return poses, np.array(latencies) * 1000
+
+
+def compare(poses, reference, threshold=0.05, min_visibility=0.5):
+    errors, hits, agree = [], [], 0
+    for pose, ref in zip(poses, reference):
+        agree += (pose is None) == (ref is None)
+        if pose is None or ref is None:
+            continue
+        visible = ref[KEY_POINTS, 3] >= min_visibility
+        dist = np.linalg.norm(pose[KEY_POINTS, :2] - ref[KEY_POINTS, :2], axis=1)[visible]
+        errors.extend(dist.tolist())
+        hits.extend((dist < threshold).tolist())
+    return (np.mean(errors) if errors else float("nan"),
+            np.mean(hits) if hits else float("nan"),
+            agree / max(len(poses), 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clips", nargs="+")
+    parser.add_argument("--backends", default="mediapipe-lite,mediapipe-full")
+    parser.add_argument("--reference", default="mediapipe-heavy")
+    parser.add_argument("--onnx", help="onnx 모델 경로 (지정하면 onnx 백엔드도 비교)")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--max-frames", type=int, default=600)
+    parser.add_argument("--stride", type=int, default=1)
+    args = parser.parse_args()
+
+    frames = read_frames(args.clips, args.max_frames, args.stride)
+    print(f"프레임 {len(frames)}개 ({len(args.clips)}개 영상)")
+
+    names = [args.reference] + [n for n in args.backends.split(",") if n and n != args.reference]
+    if args.onnx:
+        names.append("onnx")
+
+    results = {}
+    for name in names:
+        backend = create_backend(name, model_path=args.onnx, threads=args.threads)
+        results[name] = run_backend(backend, frames)
+        backend.close()
+
+    reference = results[args.reference][0]
+    ref_ms = np.mean(results[args.reference][1])
+    print()
+    print(f"{'백엔드':<16} | {'평균(ms)':>8} | {'p95(ms)':>8} | {'FPS':>6} | {'속도비':>6} | "
+          f"{'오차':>6} | {'PCK@.05':>7} | {'검출일치':>7}")
+    print("-" * 90)
+    for name in names:
+        poses, latency = results[name]
+        error, pck, agree = compare(poses, reference)
+        print(f"{name:<16} | {latency.mean():>8.2f} | {np.percentile(latency, 95):>8.2f} | "
+              f"{1000 / latency.mean():>6.1f} | {ref_ms / latency.mean():>5.2f}x | "
+              f"{error:>6.4f} | {pck:>7.3f} | {agree:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""캡처 해상도/FPS를 포즈 모델 입력에 맞췄을 때 프레임당 전처리 비용 비교
+
+    python benchmarks/bench_capture.py                    # 합성 1080p 프레임
+    python benchmarks/bench_capture.py clips/fall.mp4 --fps 15
+
+기존 방식(원본 해상도 그대로 BGR→RGB 변환 후 모델 입력으로 letterbox)과
+VideoSource의 방식(capture_size_for로 고른 크기로 미리 할당한 버퍼에 한 번 줄인 뒤 변환, letterbox)을 비교한다.
+영상을 주면 목표 FPS를 넘는 프레임을 read() 대신 grab()만 했을 때의 디코딩 비용 절감도 잰다.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script.backends import letterbox  # noqa: E402
+from script.sources import VideoSource, capture_size_for  # noqa: E402
+
+
+def synthetic_frames(count, width=1920, height=1080, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    return [np.roll(base, i * 8, axis=1) for i in range(count)]
+
+
+def read_frames(path, count):
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e3
+
+
+def decode_cost(path, target_fps, limit):
+    """(전부 read() ms/원본 프레임, 목표 FPS만 read() ms/원본 프레임, 원본 FPS)"""
+    results = []
+    fps = 0.0
+    for decimate in (False, True):
+        capture = cv2.VideoCapture(path)
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        keep_every = fps / target_fps if decimate and fps > target_fps else 1.0
+        credit, frames = 0.0, 0
+        start = time.perf_counter()
+        while frames < limit:
+            credit += 1.0
+            if credit < keep_every:
+                ok = capture.grab()
+            else:
+                credit -= keep_every
+                ok, _ = capture.read()
+            if not ok:
+                break
+            frames += 1
+        results.append((time.perf_counter() - start) / max(frames, 1) * 1e3)
+        capture.release()
+    return results[0], results[1], fps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", nargs="?", help="측정할 영상 (없으면 합성 1920x1080)")
+    parser.add_argument("--input", type=int, nargs=2, default=(256, 256), metavar=("W", "H"),
+                        help="포즈 모델 입력 크기")
+    parser.add_argument("--scale", type=float, default=2.0, help="capture_size_for의 scale (다인원은 4)")
+    parser.add_argument("--fps", type=float, default=15.0, help="목표 분석 FPS")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames) if args.video else synthetic_frames(args.frames)
+    if not frames:
+        parser.error("프레임을 읽지 못했습니다.")
+    size = capture_size_for(args.input, args.scale)
+    h, w = frames[0].shape[:2]
+    model_input = np.zeros((args.input[1], args.input[0], 3), dtype=np.float32)
+
+    def legacy(frame):
+        letterbox(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), model_input)
+
+    # 협상이 안 되는 입력(파일/URL)에서 VideoSource가 하는 것과 같은 한 번의 축소
+    source = VideoSource(0, size=size)
+
+    def fitted(frame):
+        letterbox(cv2.cvtColor(source._fit(frame), cv2.COLOR_BGR2RGB), model_input)
+
+    def convert_only(frame):
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    small = [source._fit(frame).copy() for frame in frames]
+
+    print(f"원본 {w}x{h} → 캡처 {small[0].shape[1]}x{small[0].shape[0]} (모델 입력 {args.input[0]}x{args.input[1]})")
+    print(f"{'구간':<28} | {'ms/프레임':>9}")
+    print("-----------------------------+----------")
+    legacy_ms = timed(legacy, frames)
+    fitted_ms = timed(fitted, frames)
+    native_ms = timed(lambda frame: letterbox(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), model_input), small)
+    print(f"{'원본 변환 + letterbox':<28} | {legacy_ms:>9.2f}")
+    print(f"{'한 번 축소 + 변환 + letterbox':<28} | {fitted_ms:>9.2f}")
+    print(f"{'장치 협상 크기 + 변환 + letterbox':<28} | {native_ms:>9.2f}")
+    print(f"{'색 변환만 (원본)':<28} | {timed(convert_only, frames):>9.2f}")
+    print(f"{'색 변환만 (캡처 크기)':<28} | {timed(convert_only, small):>9.2f}")
+    print(f"절감: 파일/URL {1 - fitted_ms / legacy_ms:.0%}, 장치 협상 {1 - native_ms / legacy_ms:.0%}")
+    print(f"프레임 메모리: {frames[0].nbytes / 1e6:.1f}MB → {small[0].nbytes / 1e6:.1f}MB")
+
+    if args.video:
+        full, decimated, fps = decode_cost(args.video, args.fps, args.frames * 4)
+        print(f"디코딩 ({fps:.0f}fps → {args.fps:.0f}fps): 전부 read() {full:.2f}ms, "
+              f"grab() 생략 {decimated:.2f}ms (원본 프레임당)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""float ONNX 모델과 INT8 양자화 모델의 정확도/속도 비교
+
+    python benchmarks/bench_int8.py models/pose_landmark.onnx models/pose_landmark_int8.onnx clips/*.mp4
+    python benchmarks/bench_int8.py float.onnx int8.onnx clips/*.mp4 --threads 1,2,4
+
+스레드 수별로 지연 시간, FPS, CPU 초당 처리 프레임(전력 대비 처리량의 근사치)과
+float 모델 대비 관절 오차/PCK를 출력한다.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_backends import compare, read_frames  # noqa: E402
+from script.backends import OnnxPoseBackend  # noqa: E402
+
+
+def run(backend, frames, warmup=5):
+    for frame in frames[:warmup]:
+        backend.process(frame)
+    poses, latencies = [], []
+    cpu_start = time.process_time()
+    for frame in frames:
+        start = time.perf_counter()
+        poses.append(backend.process(frame))
+        latencies.append(time.perf_counter() - start)
+    cpu = time.process_time() - cpu_start
+    return poses, np.array(latencies) * 1000, len(frames) / max(cpu, 1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("float_model")
+    parser.add_argument("int8_model")
+    parser.add_argument("clips", nargs="+")
+    parser.add_argument("--threads", default="1,2,4")
+    parser.add_argument("--max-frames", type=int, default=300)
+    args = parser.parse_args()
+
+    frames = read_frames(args.clips, args.max_frames, 1)
+    print(f"프레임 {len(frames)}개, 모델 크기 float {os.path.getsize(args.float_model) / 1e6:.1f}MB / "
+          f"int8 {os.path.getsize(args.int8_model) / 1e6:.1f}MB")
+    print()
+    print(f"{'모델':<5} | {'스레드':>4} | {'평균(ms)':>8} | {'p95(ms)':>8} | {'FPS':>6} | "
+          f"{'CPU초당 프레임':>12} | {'오차':>6} | {'PCK@.05':>7}")
+    print("-" * 86)
+    for threads in (int(t) for t in args.threads.split(",")):
+        reference = None
+        for label, path in (("float", args.float_model), ("int8", args.int8_model)):
+            poses, latency, per_cpu = run(OnnxPoseBackend(path, threads=threads), frames)
+            if reference is None:
+                reference = poses
+            error, pck, _ = compare(poses, reference)
+            print(f"{label:<5} | {threads:>4} | {latency.mean():>8.2f} | {np.percentile(latency, 95):>8.2f} | "
+                  f"{1000 / latency.mean():>6.1f} | {per_cpu:>12.1f} | {error:>6.4f} | {pck:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""키프레임 모드(N프레임마다 추론 + 사이는 광학 흐름)의 속도와 정확도
+
+    python benchmarks/bench_keyframe.py clips/*.mp4 --backend mediapipe-full
+    python benchmarks/bench_keyframe.py clips/*.mp4 --backend onnx --onnx models/pose_landmark_int8.onnx
+
+같은 백엔드를 매 프레임 돌린 결과를 기준으로, interval별 프레임당 평균 시간과
+관절 오차/PCK, 실제 추론 비율(drift로 앞당긴 추론 포함)을 비교한다.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_backends import compare, read_frames  # noqa: E402
+from script.backends import create_backend  # noqa: E402
+from script.keyframe import KeyframeBackend  # noqa: E402
+
+
+def run(backend, frames):
+    poses, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        poses.append(backend.process(frame))
+        latencies.append(time.perf_counter() - start)
+    return poses, np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clips", nargs="+")
+    parser.add_argument("--backend", default="mediapipe-full")
+    parser.add_argument("--onnx", help="onnx 모델 경로 (--backend onnx)")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--intervals", default="2,3,5")
+    parser.add_argument("--max-frames", type=int, default=600)
+    args = parser.parse_args()
+
+    frames = read_frames(args.clips, args.max_frames, 1)
+    print(f"프레임 {len(frames)}개 ({len(args.clips)}개 영상), 백엔드 {args.backend}")
+
+    backend = create_backend(args.backend, model_path=args.onnx, threads=args.threads)
+    run(backend, frames[:5])
+    reference, ref_latency = run(backend, frames)
+    backend.close()
+
+    print()
+    print(f"{'간격':>4} | {'평균(ms)':>8} | {'p95(ms)':>8} | {'속도비':>6} | {'추론 비율':>8} | "
+          f"{'drift':>5} | {'오차':>6} | {'PCK@.05':>7} | {'검출일치':>7}")
+    print("-" * 88)
+    print(f"{1:>4} | {ref_latency.mean():>8.2f} | {np.percentile(ref_latency, 95):>8.2f} | {1:>5.2f}x | "
+          f"{1:>8.2f} | {0:>5} | {0:>6.4f} | {1:>7.3f} | {1:>7.3f}")
+    for interval in (int(n) for n in args.intervals.split(",")):
+        keyframe = KeyframeBackend(create_backend(args.backend, model_path=args.onnx, threads=args.threads),
+                                   interval=interval)
+        poses, latency = run(keyframe, frames)
+        keyframe.close()
+        error, pck, agree = compare(poses, reference)
+        print(f"{interval:>4} | {latency.mean():>8.2f} | {np.percentile(latency, 95):>8.2f} | "
+              f"{ref_latency.mean() / latency.mean():>5.2f}x | {keyframe.keyframes / len(frames):>8.2f} | "
+              f"{keyframe.forced:>5} | {error:>6.4f} | {pck:>7.3f} | {agree:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
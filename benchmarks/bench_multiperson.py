@@ -0,0 +1,98 @@
+"""다인원 모드 비용이 화면 속 인원 수에 따라 어떻게 늘어나는지 측정
+
+    python benchmarks/bench_multiperson.py               # 추적/좌표변환/판단 단계만 (합성 데이터)
+    python benchmarks/bench_multiperson.py clip.mp4      # 녹화 영상으로 검출/포즈 추정까지 포함
+
+합성 모드는 모델 비용을 뺀 순수 파이프라인 오버헤드를, 영상 모드는 검출된 인원 수별
+단계 시간(검출, crop 포즈 추정, 추적)을 보여준다.
+"""
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script.multiperson import PersonTracker, crops_to_frame, expand_boxes  # noqa: E402
+from script.pose import NUM_LANDMARKS  # noqa: E402
+
+WIDTH, HEIGHT = 1280, 720
+
+
+def synthetic_frames(people, frames, rng):
+    # 사람마다 화면을 천천히 가로지르는 박스와 서 있는 자세
+    starts = rng.uniform([0, 0], [WIDTH - 200, HEIGHT - 400], size=(people, 2))
+    velocity = rng.uniform(-3, 3, size=(people, 2))
+    for i in range(frames):
+        xy = starts + velocity * i
+        boxes = np.concatenate([xy, xy + [160, 380]], axis=1).astype(np.float32)
+        poses = rng.uniform(0.2, 0.8, size=(people, NUM_LANDMARKS, 4)).astype(np.float32)
+        poses[:, :, 3] = 0.9
+        yield boxes, poses
+
+
+def bench_synthetic(max_people=16, frames=300):
+    rng = np.random.default_rng(0)
+    print(f"{'인원':>4} | {'프레임당(ms)':>12} | {'인당(ms)':>9}")
+    print("-----+--------------+----------")
+    for people in (1, 2, 4, 8, max_people):
+        tracker = PersonTracker()
+        found = np.ones(people, dtype=bool)
+        elapsed = 0.0
+        for i, (boxes, poses) in enumerate(synthetic_frames(people, frames, rng)):
+            start = time.perf_counter()
+            boxes = expand_boxes(boxes, WIDTH, HEIGHT)
+            crops_to_frame(poses, boxes, WIDTH, HEIGHT)
+            tracker.update(boxes, poses, found, i / 30)
+            elapsed += time.perf_counter() - start
+        per_frame = elapsed / frames * 1000
+        print(f"{people:>4} | {per_frame:>12.3f} | {per_frame / people:>9.3f}")
+
+
+def bench_clip(path, frames=300):
+    import cv2
+    from script.multiperson import MultiPersonPose
+
+    pipeline = MultiPersonPose()
+    capture = cv2.VideoCapture(path)
+    stages = defaultdict(lambda: defaultdict(list))
+    for i in range(frames):
+        ret, frame = capture.read()
+        if not ret:
+            break
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        height, width = rgb.shape[:2]
+
+        t0 = time.perf_counter()
+        boxes = expand_boxes(pipeline.detector(rgb), width, height, pipeline.pad)
+        boxes = boxes[(boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])]
+        t1 = time.perf_counter()
+        poses, found = pipeline.pose_model.process_batch([rgb[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes])
+        t2 = time.perf_counter()
+        if len(boxes):
+            crops_to_frame(poses, boxes, width, height)
+        pipeline.tracker.update(boxes, poses, found, i / 30)
+        t3 = time.perf_counter()
+
+        n = len(boxes)
+        stages[n]["detect"].append(t1 - t0)
+        stages[n]["pose"].append(t2 - t1)
+        stages[n]["track"].append(t3 - t2)
+    capture.release()
+
+    print(f"{'인원':>4} | {'프레임':>6} | {'검출(ms)':>9} | {'포즈(ms)':>9} | {'추적(ms)':>9} | {'합계(ms)':>9}")
+    print("-----+--------+-----------+-----------+-----------+----------")
+    for n in sorted(stages):
+        s = {k: np.mean(v) * 1000 for k, v in stages[n].items()}
+        total = s["detect"] + s["pose"] + s["track"]
+        print(f"{n:>4} | {len(stages[n]['detect']):>6} | {s['detect']:>9.2f} | {s['pose']:>9.2f} | "
+              f"{s['track']:>9.3f} | {total:>9.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        bench_clip(sys.argv[1])
+    else:
+        bench_synthetic()
@@ -0,0 +1,88 @@
+"""골격 표시 비용: 원본 프레임에 관절별로 그리기 vs 줄인 미리보기 버퍼에 한 번에 그리기
+
+    python benchmarks/bench_overlay.py
+    python benchmarks/bench_overlay.py --size 1920 1080 --width 640
+
+기존 방식은 분석 프레임을 복사해 원본 해상도에서 연결선/관절을 하나씩 cv2.line/circle로 그린 뒤
+미리보기 크기로 줄이고, 새 방식(script/overlay.py)은 미리 할당한 버퍼로 줄인 뒤 polylines 두 번으로 그린다.
+둘 다 같은 JPEG 인코딩까지 포함한다.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script.features import PoseFrame  # noqa: E402
+from script.overlay import PreviewRenderer  # noqa: E402
+from script.pose import NUM_LANDMARKS, POSE_CONNECTIONS  # noqa: E402
+
+
+def legacy_draw(image, pose, min_visibility=0.5, color=(0, 255, 0)):
+    height, width = image.shape[:2]
+    points = [(int(x * width), int(y * height)) for x, y in pose[:, :2].tolist()]
+    visible = (pose[:, 3] >= min_visibility).tolist()
+    for a, b in POSE_CONNECTIONS:
+        if visible[a] and visible[b]:
+            cv2.line(image, points[a], points[b], color, 2)
+    for point, is_visible in zip(points, visible):
+        if is_visible:
+            cv2.circle(image, point, 3, (255, 255, 255), -1)
+    return image
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(*item)
+    return (time.perf_counter() - start) / len(items) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, nargs=2, default=(1280, 720), metavar=("W", "H"))
+    parser.add_argument("--width", type=int, default=640, help="미리보기 너비")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    width, height = args.size
+    image = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    items = []
+    for seq in range(args.frames):
+        pose = rng.uniform(0.2, 0.8, size=(NUM_LANDMARKS, 4)).astype(np.float32)
+        pose[:, 3] = rng.uniform(0.3, 1.0, NUM_LANDMARKS)
+        frame = PoseFrame(seq, seq / 30, pose)
+        frame.mask  # 감지 단계에서 이미 계산됨
+        items.append((image, frame))
+
+    preview_height = round(height * args.width / width)
+    params = [cv2.IMWRITE_JPEG_QUALITY, 70]
+
+    def legacy(rgb, frame):
+        drawn = legacy_draw(rgb.copy(), frame.pose)
+        small = cv2.resize(drawn, (args.width, preview_height), interpolation=cv2.INTER_AREA)
+        return small
+
+    def legacy_encoded(rgb, frame):
+        small = legacy(rgb, frame)
+        cv2.imencode(".jpg", cv2.cvtColor(small, cv2.COLOR_RGB2BGR), params)
+
+    renderer = PreviewRenderer(args.width)
+
+    def overlay_encoded(rgb, frame):
+        cv2.imencode(".jpg", cv2.cvtColor(renderer.render(rgb, frame), cv2.COLOR_RGB2BGR), params)
+
+    print(f"분석 프레임 {width}x{height} → 미리보기 {args.width}x{preview_height}")
+    print(f"{'구간':<24} | {'기존(ms)':>8} | {'오버레이(ms)':>10}")
+    print("-------------------------+----------+-----------")
+    print(f"{'그리기 + 축소':<24} | {timed(legacy, items):>8.3f} | {timed(renderer.render, items):>10.3f}")
+    print(f"{'그리기 + 축소 + JPEG':<24} | {timed(legacy_encoded, items):>8.3f} | {timed(overlay_encoded, items):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
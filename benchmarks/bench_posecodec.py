@@ -0,0 +1,110 @@
+"""포즈 스트림 형식 비교: JSON(랜드마크 dict, 소수 4자리) vs 바이너리(script/posecodec.py)
+
+    python benchmarks/bench_posecodec.py
+    python benchmarks/bench_posecodec.py --log logs/room101.npz --batch 30
+
+프레임당 메시지 크기와 인코딩/디코딩 시간(µs/프레임), 복원 오차를 비교한다. 바이너리는 프레임마다 메시지 하나를
+보내는 경우(실시간 화면)와 batch 프레임씩 묶는 경우(노드 사이 전송, 기록)를 따로 잰다.
+포즈 로그(--log)가 없으면 천천히 움직이며 가끔 넘어지고 사람이 사라지는 합성 포즈를 쓴다.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script.pose import NUM_LANDMARKS  # noqa: E402
+from script.poselog import load_poselog  # noqa: E402
+from script.posecodec import PoseDecoder, PoseEncoder  # noqa: E402
+
+
+def synthetic_poses(frames, fps=30.0, seed=0):
+    """(poses, timestamps, present): 서서 흔들리다 몇 초마다 빠르게 눕는 포즈, 10%는 사람 없음"""
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(frames) / fps
+    base = np.stack([rng.uniform(0.35, 0.65, NUM_LANDMARKS), np.linspace(0.1, 0.9, NUM_LANDMARKS),
+                     rng.uniform(-0.3, 0.3, NUM_LANDMARKS), rng.uniform(0.6, 1.0, NUM_LANDMARKS)], axis=1)
+    sway = 0.02 * np.sin(timestamps * 1.5)[:, None]
+    fall = np.clip((timestamps % 8.0 - 6.0) * 2.0, 0.0, 1.0)[:, None]
+    poses = np.repeat(base[None], frames, axis=0).astype(np.float32)
+    poses[:, :, 0] += sway + fall * (poses[:, :, 1] - 0.5) * 0.8
+    poses[:, :, 1] = poses[:, :, 1] * (1 - fall) + 0.85 * fall
+    poses[:, :, :3] += rng.normal(0, 0.002, (frames, NUM_LANDMARKS, 3))
+    poses[:, :, 3] = np.clip(poses[:, :, 3] + rng.normal(0, 0.01, (frames, NUM_LANDMARKS)), 0, 1)
+    present = rng.random(frames) > 0.1
+    return poses, timestamps, present
+
+
+def json_encode(camera, seq, timestamp, pose):
+    if pose is None:
+        return json.dumps({"camera": camera, "seq": seq, "ts": timestamp, "landmarks": None}).encode()
+    landmarks = [[round(value, 4) for value in point] for point in pose.tolist()]
+    return json.dumps({"camera": camera, "seq": seq, "ts": timestamp, "landmarks": landmarks}).encode()
+
+
+def json_decode(data):
+    message = json.loads(data)
+    landmarks = message["landmarks"]
+    return None if landmarks is None else np.array(landmarks, dtype=np.float32)
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    outputs = [fn(*item) for item in items]
+    return outputs, (time.perf_counter() - start) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", help="포즈 로그(.npz) (없으면 합성 포즈)")
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--batch", type=int, default=30, help="묶음 전송의 메시지당 프레임 수")
+    args = parser.parse_args()
+
+    if args.log:
+        poses, timestamps, _, _ = load_poselog(args.log)
+        present = poses[:, :, 3].any(axis=1)
+    else:
+        poses, timestamps, present = synthetic_poses(args.frames)
+    frames = len(poses)
+    seqs = np.arange(frames)
+    items = [(int(seq), float(t), pose if ok else None) for seq, t, pose, ok in zip(seqs, timestamps, poses, present)]
+
+    rows = []
+    encoded, encode_us = timed(lambda seq, t, pose: json_encode("101", seq, t, pose), items)
+    decoded, decode_us = timed(json_decode, [(data,) for data in encoded])
+    rows.append(("JSON (프레임마다)", encoded, encode_us, decode_us, [p for p in decoded if p is not None]))
+
+    encoder, decoder = PoseEncoder("101"), PoseDecoder()
+    encoded, encode_us = timed(encoder.encode_frame, items)
+    packets, decode_us = timed(decoder.decode, [(data,) for data in encoded])
+    rows.append(("바이너리 (프레임마다)", encoded, encode_us, decode_us,
+                 [packet.poses[0] for packet in packets if packet.present[0]]))
+
+    encoder, decoder = PoseEncoder("101"), PoseDecoder()
+    batches = [(seqs[i:i + args.batch], timestamps[i:i + args.batch], [item[2] for item in items[i:i + args.batch]])
+               for i in range(0, frames, args.batch)]
+    encoded, encode_us = timed(encoder.encode, batches)
+    packets, decode_us = timed(decoder.decode, [(data,) for data in encoded])
+    rows.append((f"바이너리 ({args.batch}프레임 묶음)", encoded, encode_us, decode_us,
+                 list(np.concatenate([packet.poses[packet.present] for packet in packets]))))
+
+    reference = poses[present]
+    print(f"프레임 {frames}개 (사람 있음 {int(present.sum())}개)")
+    print(f"{'형식':<22} | {'바이트/프레임':>12} | {'zlib 후':>8} | {'인코딩(µs)':>10} | {'디코딩(µs)':>10} | {'최대 오차':>9}")
+    print("-----------------------+--------------+----------+------------+------------+----------")
+    for name, encoded, encode_us, decode_us, restored in rows:
+        size = sum(len(data) for data in encoded) / frames
+        compressed = len(zlib.compress(b"".join(encoded))) / frames
+        error = float(np.abs(np.array(restored) - reference).max())
+        print(f"{name:<22} | {size:>12.1f} | {compressed:>8.1f} | {encode_us / frames:>10.2f} | "
+              f"{decode_us / frames:>10.2f} | {error:>9.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""관절 표/상태 기록 HTML 렌더링 비용 측정
+
+    python benchmarks/bench_render.py
+
+기존 방식(매번 f-string을 += 로 이어 붙이고 기록 줄마다 문자열 검사)과
+script/render.py의 렌더러(미리 만든 템플릿, 바뀐 행만 갱신, 표시 값 키 캐시)를 같은 입력으로 비교한다.
+포즈는 (1) 거의 정지한 사람(표시 값이 대부분 그대로)과 (2) 매 프레임 크게 움직이는 사람 두 경우를 잰다.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script.eventstore import Event, status_code  # noqa: E402
+from script.features import PoseFrame  # noqa: E402
+from script.pose import NUM_LANDMARKS  # noqa: E402
+from script.render import KEY_JOINTS, HistoryRenderer, LandmarkTableRenderer  # noqa: E402
+from script.timeutil import format_kst  # noqa: E402
+
+
+def legacy_table(frame):
+    table_html = """
+    <div class='info-text'>인식 상태: 판단 가능</div>
+    <table style="width:100%; border-collapse: collapse;">
+      <tr style="background-color: #EEF2FF;">
+        <th style="text-align: left; padding: 0.5rem;">관절</th>
+        <th style="text-align: center; padding: 0.5rem;">X</th>
+        <th style="text-align: center; padding: 0.5rem;">Y</th>
+        <th style="text-align: center; padding: 0.5rem;">Z</th>
+        <th style="text-align: center; padding: 0.5rem;">신뢰도</th>
+      </tr>
+    """
+    for idx, (landmark_id, joint_name) in enumerate(KEY_JOINTS):
+        bg_color = "#F9FAFB" if idx % 2 == 0 else "white"
+        x, y, z, visibility = frame.pose[landmark_id]
+        confidence_color = "#10B981" if visibility > 0.7 else "#F59E0B" if visibility > 0.5 else "#EF4444"
+        table_html += f"""
+            <tr style="background-color: {bg_color};">
+              <td style="padding: 0.5rem;">{joint_name}</td>
+              <td style="text-align: center; padding: 0.5rem;">{x:.3f}</td>
+              <td style="text-align: center; padding: 0.5rem;">{y:.3f}</td>
+              <td style="text-align: center; padding: 0.5rem;">{z:.3f}</td>
+              <td style="text-align: center; padding: 0.5rem; color: {confidence_color}; font-weight: bold;">
+                {visibility:.2f}
+              </td>
+            </tr>
+            """
+    table_html += "</table>"
+    return table_html
+
+
+def legacy_history(events):
+    history_html = "<div style='max-height: 300px; overflow-y: auto;'>"
+    for event in reversed(events):
+        item = f"[{format_kst(event.ts)}]: {event.message}"
+        status_class = "status-normal"
+        if "주의" in item:
+            status_class = "status-warning"
+        elif "위험" in item or "낙상" in item:
+            status_class = "status-danger"
+        history_html += f"<div class='log-item'><span class='{status_class}'>{item}</span></div>"
+    history_html += "</div>"
+    return history_html
+
+
+def pose_frames(count, motion, rng):
+    pose = rng.uniform(0.2, 0.8, size=(NUM_LANDMARKS, 4)).astype(np.float32)
+    pose[:, 3] = 0.9
+    for seq in range(count):
+        pose = pose + rng.normal(0, motion, size=pose.shape).astype(np.float32)
+        pose[:, 3] = 0.9
+        yield PoseFrame(seq, seq / 30, pose.copy())
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def main(count=5000):
+    rng = np.random.default_rng(0)
+    print(f"{'구간':<22} | {'기존(us)':>9} | {'렌더러(us)':>10}")
+    print("-----------------------+-----------+-----------")
+    for label, motion in (("관절 표 (정지)", 1e-5), ("관절 표 (움직임)", 1e-2)):
+        frames = list(pose_frames(count, motion, rng))
+        # 인식 상태/마스크는 감지 단계에서 이미 계산되므로 렌더링 시간에서 뺀다
+        for frame in frames:
+            frame.state
+        renderer = LandmarkTableRenderer()
+        legacy = timed(legacy_table, frames)
+        fast = timed(lambda f: renderer.render(f, "판단 가능"), frames)
+        print(f"{label:<22} | {legacy:>9.1f} | {fast:>10.1f}")
+
+    # 기록 10줄 중 가끔 한 줄씩 새로 들어오는 상황
+    messages = ["정상: 모니터링 중", "주의: 불안정한 자세", "위험: 낙상 감지됨", "카메라 활성화"]
+    events = [Event(None, "0", 1.7e9 + i, status_code(m), m, None, None)
+              for i, m in enumerate(rng.choice(messages, 10))]
+    windows = []
+    for i in range(count):
+        if i % 50 == 0:
+            message = str(rng.choice(messages))
+            events = events[1:] + [Event(None, "0", events[-1].ts + 1, status_code(message), message, None, None)]
+        windows.append(events)
+    renderer = HistoryRenderer()
+    legacy = timed(legacy_history, windows)
+    fast = timed(renderer.render, windows)
+    print(f"{'상태 기록 (10줄)':<22} | {legacy:>9.1f} | {fast:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
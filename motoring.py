@@ -1,36 +1,53 @@
 import streamlit as st
 import cv2
-import mediapipe as mp
 import psutil
 import pandas as pd
 import os
-import datetime
-from zoneinfo import ZoneInfo
-
-from script import util
-# from script import fallpredict  # ← 여기 주석 해제하면 실제 감지 모듈 연결 가능
+from collections import deque
+
+from script.pose import LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_KNEE, RIGHT_KNEE
+from script.detector import detect_fall
+from script.features import PoseFrame, POSE_NONE
+from script.config import ConfigWatcher
+from script.backends import backend_for_camera
+from script.smoothing import OneEuroFilter
+from script.sources import SOURCE_ENDED, SOURCE_STATE_LABELS, VideoSource, capture_size_for
+from script import fallpredict
+from script.profiler import PROFILER
+from script.overlay import PreviewRenderer
+from script.logqueue import LogQueue
+from script.timeutil import format_kst
 import time
-import random  # 테스트용
+
+
+CAMERA_ID = "0"
+# 좌표 로그에 남기는 관절 (표시 이름, 아이콘)
+LOG_POINTS = [LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_KNEE, RIGHT_KNEE]
+LOG_LABELS = (("🦴", "왼쪽 어깨"), ("🦴", "오른쪽 어깨"), ("🦵", "왼쪽 무릎"), ("🦵", "오른쪽 무릎"))
+
+
+# 감지 프로필은 파일 변경 시 자동으로 다시 읽힘
+@st.cache_resource
+def get_config_watcher():
+    return ConfigWatcher()
+
+
+# 좌표 로그: 루프에서는 값만 큐에 넣고, 파일 쓰기/시각 변환은 백그라운드 스레드에서
+@st.cache_resource
+def get_landmark_log():
+    return LogQueue("data/logs/landmarks.jsonl")
 
 
 def show():
     st.title("🛡️ 감시 모드")
     st.write("낙상 여부를 실시간으로 감지합니다.")
 
-    mp_pose = mp.solutions.pose
-    mp_drawing = mp.solutions.drawing_utils
-    landmark_logs = []
-
     # 초기화
     if 'camera' not in st.session_state:
         st.session_state.camera = None
     if 'fall_count' not in st.session_state:
         st.session_state.fall_count = 0
 
-    # 현재 시간(KST) 설정
-    kst_now = datetime.datetime.now(ZoneInfo("Asia/Seoul"))
-    timestamp = kst_now.strftime("%Y-%m-%d %H:%M:%S")
-
 
     
     st.markdown(
@@ -72,6 +89,13 @@ def show():
     with col3_top:
         col3_box = st.empty()
         col3_box.info("🔍 낙상 감지 결과 대기 중...")
+        # 프로파일링: 실행 중에도 켜고 끄며, 최근 30초를 data/profiles에 collapsed-stack/SVG로 저장
+        with st.expander("🔬 프로파일링"):
+            st.toggle("구간 타이머 / 스택 샘플링", value=PROFILER.enabled, key="profiling",
+                      on_change=lambda: setattr(PROFILER, "enabled", st.session_state.profiling))
+            if st.button("최근 30초 플레임 그래프 저장", disabled=not PROFILER.enabled):
+                for path in PROFILER.dump(seconds=30.0):
+                    st.caption(path)
 
     st.markdown("---")
 
@@ -89,72 +113,112 @@ def show():
             stop = st.button("카메라 종료")
 
         frame_placeholder = st.empty()
-        landmark_data = []
 
         if start:
-            st.session_state.camera = cv2.VideoCapture(0)
+            config_watcher = get_config_watcher()
+            camera_config = config_watcher.current.camera(CAMERA_ID)
+            # 카메라별 포즈 백엔드 (mediapipe-lite/full/heavy, onnx)
+            backend = backend_for_camera(camera_config)
+            # 장치/파일/RTSP/MJPEG 입력 (끊기면 백그라운드에서 다시 연결), 해상도/FPS는 모델 입력에 맞춤
+            capture_size = ((camera_config.capture_width, camera_config.capture_height) if camera_config.capture_width
+                            else capture_size_for(backend.input_size))
+            st.session_state.camera = VideoSource(camera_config.source, size=capture_size,
+                                                  fps=camera_config.capture_fps).start()
             col1_box.success("🟢 카메라 켜짐")
 
-            pose = mp_pose.Pose()
             analyzing = True
             last_check_time = time.time()
-            check_interval = 3  # 3초마다 체크
-            buffer_limit = 3
+            # 학습된 낙상 분류 모델 (없으면 규칙 기반 detect_fall 사용)
+            fall_model = fallpredict.load_model()
             frame_buffer = []
+            # 학습 모델용: 사람이 없는 프레임까지 시각과 함께 모아 두고, 판단할 때 학습 fps 간격으로 다시 뽑음
+            pose_history = deque()
+            frame_seq = 0
+            # 관절 떨림 평활화 (CameraMonitor와 같은 방식, 사람이 사라지면 초기화)
+            landmark_filter = OneEuroFilter()
+            # 골격은 줄인 미리보기 버퍼에만 그림
+            preview_renderer = PreviewRenderer()
+            landmark_log = get_landmark_log()
+            last_log_display = 0.0
 
             while analyzing:
-                ret, frame = st.session_state.camera.read()
-                if not ret:
-                    st.warning("카메라 프레임을 읽을 수 없습니다.")
-                    break
-
-                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = pose.process(image)
-
-                if results.pose_landmarks:
-                    mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-
-                    lm = results.pose_landmarks.landmark
-                    frame_landmarks = {
-                        "timestamp": util.now_kst(),
-                        "left_shoulder": extract_landmark(lm, mp_pose.PoseLandmark.LEFT_SHOULDER),
-                        "right_shoulder": extract_landmark(lm, mp_pose.PoseLandmark.RIGHT_SHOULDER),
-                        "left_knee": extract_landmark(lm, mp_pose.PoseLandmark.LEFT_KNEE),
-                        "right_knee": extract_landmark(lm, mp_pose.PoseLandmark.RIGHT_KNEE),
-                    }
-                    landmark_data.append(frame_landmarks)
-                    frame_buffer.append(frame_landmarks)
-                    if len(frame_buffer) > buffer_limit:
-                        frame_buffer.pop(0)
-
-                    # 로그 출력
-                    log_text = f"""
-                    ⏱ {frame_landmarks['timestamp']}  
-        🦴 왼쪽 어깨: {frame_landmarks['left_shoulder']}  
-        🦴 오른쪽 어깨: {frame_landmarks['right_shoulder']}  
-        🦵 왼쪽 무릎: {frame_landmarks['left_knee']}  
-        🦵 오른쪽 무릎: {frame_landmarks['right_knee']}
-                    """
-                    landmark_logs.append(log_text)
-                    landmarks_box.markdown("### 📝 누적 좌표 로그\n\n" + '\n---\n'.join(landmark_logs[-3:]), unsafe_allow_html=True)
-
-                # 프레임 출력
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame_placeholder.image(frame, channels="RGB")
-
-                # 낙상 감지 (3초마다 실행)
-                if time.time() - last_check_time >= check_interval and len(frame_buffer) == buffer_limit:
-                    last_check_time = time.time()
-
-                    # 실제 낙상 감지 모델 연결 (주석 해제)
-                    # is_fall = fallpredict.is_fallen(frame_buffer)
-                    is_fall = random.choice([True, False])  # 테스트용
-
-                    if is_fall:
-                        st.session_state.fall_count += 1
-                        col3_box.error(f"🚨 낙상이 감지되었습니다! (총 감지 횟수: {st.session_state.fall_count})")
-                    else:
-                        col3_box.success(f"✅ 안전한 자세입니다. (총 낙상 감지 횟수: {st.session_state.fall_count})")
+                # 체크 주기/버퍼 크기는 프로필에서 읽음 (기본 3초, 3프레임)
+                profile = config_watcher.current.profile_for(CAMERA_ID)
+                check_interval = profile.check_interval
+                buffer_limit = profile.buffer_limit
+
+                stage = PROFILER.stage
+                with stage("capture"):
+                    frame, _ = st.session_state.camera.read(timeout=1.0)
+                if frame is None:
+                    source_state = st.session_state.camera.state
+                    if source_state == SOURCE_ENDED:
+                        st.warning("영상이 끝났습니다.")
+                        break
+                    frame_placeholder.info(f"카메라 프레임을 기다리는 중입니다. ({SOURCE_STATE_LABELS[source_state]})")
+                    continue
+
+                with stage("convert"):
+                    image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                with stage("inference"):
+                    pose_array = backend.process(image)
+
+                # 인식 상태/파생값은 이 프레임 객체에 한 번만 계산
+                with stage("detection"):
+                    frame_seq += 1
+                    frame_time = time.time()
+                    if pose_array is not None:
+                        pose_array = landmark_filter(pose_array, frame_time).copy()
+                    frame_features = PoseFrame(frame_seq, frame_time, pose_array, profile.min_visibility)
+                    state = frame_features.state
+                    if state == POSE_NONE:
+                        landmark_filter.reset()
+
+                with stage("draw"):
+                    # 분석 프레임은 그대로 두고 색 변환한 image를 줄인 버퍼에 골격과 함께 그림
+                    preview = preview_renderer.render(image, frame_features, skeleton_only=camera_config.skeleton_only)
+
+                with stage("ui"):
+                    # 사람이 없는 프레임은 좌표 기록을 건너뜀 (기록은 값만, 문자열은 표시할 때 만듦)
+                    if state != POSE_NONE:
+                        landmark_log.log("landmarks", frame_seq, frame_features.pose[LOG_POINTS])
+                        frame_buffer.append(frame_features)
+                        if len(frame_buffer) > buffer_limit:
+                            del frame_buffer[:-buffer_limit]
+                    if fall_model is not None:
+                        pose_history.append(frame_features)
+                        while pose_history[-1].t - pose_history[0].t > fall_model.duration + 1.0:
+                            pose_history.popleft()
+
+                    # 누적 좌표 로그 표시 (프로필 주기, 기본 1초)
+                    now = time.monotonic()
+                    if now - last_log_display >= profile.landmark_update_interval:
+                        last_log_display = now
+                        logs = [format_landmark_log(landmark_log, r) for r in landmark_log.recent(3, kind="landmarks")]
+                        landmarks_box.markdown(
+                            "### 📝 누적 좌표 로그\n\n" + "\n---\n".join(logs),
+                            unsafe_allow_html=True,
+                        )
+
+                    # 프레임 출력
+                    frame_placeholder.image(preview, channels="RGB")
+
+                with stage("fall_check"):
+                    # 낙상 감지 (check_interval마다 실행)
+                    if time.time() - last_check_time >= check_interval and len(frame_buffer) == buffer_limit:
+                        last_check_time = time.time()
+
+                        if fall_model is not None:
+                            is_fall = fall_model.is_fallen([f.pose for f in pose_history],
+                                                           timestamps=[f.t for f in pose_history])
+                        else:
+                            _, is_fall, _ = detect_fall(frame_buffer[-1], profile=profile)
+
+                        if is_fall:
+                            st.session_state.fall_count += 1
+                            col3_box.error(f"🚨 낙상이 감지되었습니다! (총 감지 횟수: {st.session_state.fall_count})")
+                        else:
+                            col3_box.success(f"✅ 안전한 자세입니다. (총 낙상 감지 횟수: {st.session_state.fall_count})")
 
                 # 종료 버튼 눌림
                 if stop:
@@ -166,23 +230,25 @@ def show():
 
                 time.sleep(0.1)
 
-            st.session_state.camera.release()
+            backend.close()
+            st.session_state.camera.close()
             st.session_state.camera = None
 
 # 푸터
    
     st.markdown(f"""
     <div style="text-align: center; margin-top: 2rem; padding-top: 1rem; border-top: 1px solid #E5E7EB; color: #9CA3AF; font-size: 0.875rem;">
-    © 2025 지능형 노인 낙상 감지 시스템 | 현재 시간: {timestamp}
+    © 2025 지능형 노인 낙상 감지 시스템 | 현재 시간: {format_kst(time.time())}
 </div>
     """, unsafe_allow_html=True)  
 
 
-# 랜드마크 정보 정리 함수
-def extract_landmark(lm, point):
-    return (
-        round(lm[point].x, 2),
-        round(lm[point].y, 2),
-        round(lm[point].visibility, 2),
-        1 if round(lm[point].visibility, 2) >= 0.7 else 0
-    )
+# 좌표 로그 한 건 → 마크다운 (x, y, visibility, 보임 여부)
+def format_landmark_log(log, record):
+    _, rows = record.values
+    lines = [f"⏱ {log.format_time(record)}  "]
+    for (icon, label), row in zip(LOG_LABELS, rows.tolist()):
+        x, y, _, visibility = row
+        visibility = round(visibility, 2)
+        lines.append(f"{icon} {label}: {(round(x, 2), round(y, 2), visibility, 1 if visibility >= 0.7 else 0)}  ")
+    return "\n".join(lines)
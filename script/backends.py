@@ -0,0 +1,169 @@
+import cv2
+import numpy as np
+
+from script.pose import NUM_LANDMARKS, to_array
+
+
+class PoseBackend:
+    """포즈 추정 백엔드 공통 인터페이스
+
+    process()는 RGB 이미지를 받아 (33, 4) float32 배열(x, y, z, visibility, 프레임 기준 정규화 좌표)
+    또는 사람이 없으면 None을 반환한다.
+    """
+
+    name = ""
+    # 모델 입력 크기 (너비, 높이)
+    input_size = (256, 256)
+
+    def process(self, rgb):
+        raise NotImplementedError
+
+    def process_batch(self, images):
+        """여러 이미지(crop)를 한 번에 처리. (N, 33, 4) 포즈와 (N,) 검출 여부를 반환"""
+        poses = np.zeros((len(images), NUM_LANDMARKS, 4), dtype=np.float32)
+        found = np.zeros(len(images), dtype=bool)
+        for i, image in enumerate(images):
+            pose = self.process(image)
+            if pose is not None:
+                poses[i] = pose
+                found[i] = True
+        return poses, found
+
+    def close(self):
+        pass
+
+
+class MediaPipeBackend(PoseBackend):
+    """MediaPipe Pose (model_complexity 0=lite, 1=full, 2=heavy)"""
+
+    def __init__(self, model_complexity=1, static_image_mode=False):
+        import mediapipe as mp
+        self.name = ("mediapipe-lite", "mediapipe-full", "mediapipe-heavy")[model_complexity]
+        self._pose = mp.solutions.pose.Pose(
+            static_image_mode=static_image_mode,
+            model_complexity=model_complexity,
+        )
+
+    def process(self, rgb):
+        results = self._pose.process(rgb)
+        return to_array(results.pose_landmarks)
+
+    def close(self):
+        self._pose.close()
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def letterbox(rgb, out):
+    """비율을 유지해 out(H, W, 3) float32 버퍼 가운데에 [0, 1] 값으로 채운다
+
+    좌표 복원용 (scale, pad_x, pad_y, 원본 너비, 원본 높이)를 반환한다.
+    """
+    height, width = out.shape[:2]
+    h, w = rgb.shape[:2]
+    scale = min(width / w, height / h)
+    new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+    pad_x, pad_y = (width - new_w) // 2, (height - new_h) // 2
+    resized = cv2.resize(rgb, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    out.fill(0)
+    out[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+    out *= 1.0 / 255.0
+    return scale, pad_x, pad_y, w, h
+
+
+class OnnxPoseBackend(PoseBackend):
+    """ONNX Runtime CPU 백엔드
+
+    BlazePose 랜드마크 모델 형식을 가정한다.
+    - 입력: (N, H, W, 3) 또는 (N, 3, H, W), RGB float32 [0, 1]
+    - 출력 0: (N, 39 * 5) 입력 픽셀 기준 (x, y, z, visibility logit, presence logit), 앞의 33개 사용
+    - 출력 1: (N, 1) 사람 존재 점수 (logit)
+    프레임은 비율을 유지한 채 입력 크기에 맞춰 여백(letterbox)을 넣고, 결과 좌표는 원래 프레임 기준으로 되돌린다.
+    INT8 양자화 모델(script/quantize.py로 생성)도 같은 형식이라 model_path만 바꾸면 된다.
+    """
+
+    def __init__(self, model_path, threads=0, min_presence=0.5, name="onnx"):
+        # threads: intra-op 스레드 수 (0 = ONNX Runtime 기본값, 팬리스 장비는 물리 코어 수 이하 권장)
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.name = name
+        self.min_presence = min_presence
+        self._session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        shape = model_input.shape
+        self._nchw = shape[1] == 3
+        height, width = (shape[2], shape[3]) if self._nchw else (shape[1], shape[2])
+        self.input_size = (int(width), int(height))
+        self._dynamic_batch = not isinstance(shape[0], int)
+        self._buffer = np.zeros((1, int(height), int(width), 3), dtype=np.float32)
+
+    def _run(self, batch):
+        tensor = batch.transpose(0, 3, 1, 2) if self._nchw else batch
+        outputs = self._session.run(None, {self._input_name: np.ascontiguousarray(tensor)})
+        landmarks = outputs[0].reshape(len(batch), -1, 5)[:, :NUM_LANDMARKS]
+        presence = _sigmoid(outputs[1].reshape(len(batch))) if len(outputs) > 1 else np.ones(len(batch))
+        return landmarks, presence
+
+    @staticmethod
+    def _decode(raw, scale, pad_x, pad_y, w, h):
+        pose = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+        pose[:, 0] = (raw[:, 0] - pad_x) / scale / w
+        pose[:, 1] = (raw[:, 1] - pad_y) / scale / h
+        pose[:, 2] = raw[:, 2] / scale / w
+        pose[:, 3] = _sigmoid(raw[:, 3])
+        return pose
+
+    def process(self, rgb):
+        geometry = letterbox(rgb, self._buffer[0])
+        landmarks, presence = self._run(self._buffer)
+        if presence[0] < self.min_presence:
+            return None
+        return self._decode(landmarks[0], *geometry)
+
+    def process_batch(self, images):
+        if not self._dynamic_batch or len(images) <= 1:
+            return super().process_batch(images)
+        width, height = self.input_size
+        batch = np.zeros((len(images), height, width, 3), dtype=np.float32)
+        geometry = [letterbox(image, batch[i]) for i, image in enumerate(images)]
+        landmarks, presence = self._run(batch)
+        poses = np.zeros((len(images), NUM_LANDMARKS, 4), dtype=np.float32)
+        found = presence >= self.min_presence
+        for i in np.flatnonzero(found):
+            poses[i] = self._decode(landmarks[i], *geometry[i])
+        return poses, found
+
+
+# 카메라 설정의 backend 값 → 생성 함수
+BACKENDS = {
+    "mediapipe-lite": lambda **o: MediaPipeBackend(0, o.get("static_image_mode", False)),
+    "mediapipe-full": lambda **o: MediaPipeBackend(1, o.get("static_image_mode", False)),
+    "mediapipe-heavy": lambda **o: MediaPipeBackend(2, o.get("static_image_mode", False)),
+    "onnx": lambda **o: OnnxPoseBackend(o["model_path"], threads=o.get("threads", 0)),
+}
+
+
+def create_backend(name="mediapipe-full", **options):
+    """이름으로 포즈 백엔드 생성 (options: model_path, threads, static_image_mode)"""
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 포즈 백엔드: {name}")
+    return BACKENDS[name](**options)
+
+
+def backend_for_camera(camera, **options):
+    """CameraConfig의 backend/model_path/threads 설정으로 백엔드 생성
+
+    keyframe_interval이 2 이상이면 (단일 인원 모드) 그 간격으로만 추론하고 사이는 광학 흐름으로 채운다.
+    """
+    backend = create_backend(camera.backend, model_path=camera.model_path, threads=camera.threads, **options)
+    if camera.keyframe_interval > 1 and not camera.multi_person:
+        from script.keyframe import KeyframeBackend  # keyframe이 이 모듈을 import하므로 여기서
+        backend = KeyframeBackend(backend, interval=camera.keyframe_interval)
+    return backend
@@ -0,0 +1,115 @@
+import threading
+
+import cv2
+import numpy as np
+
+from script.overlay import PreviewRenderer
+from script.profiler import PROFILER
+
+
+class Broadcast:
+    """단일 생산자 / 다중 소비자 최신 값 채널
+
+    생산자는 publish()로 최신 값만 덮어쓰고 (큐 없음, 블로킹 없음), 소비자는 자기가 마지막으로 본
+    version 이후의 값을 기다린다. 느린 소비자는 중간 값을 건너뛰고 항상 최신 값을 받으므로
+    소비자 수가 늘어도 생산자 비용은 그대로다.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.version = 0
+        self.value = None
+        self.closed = False
+
+    def publish(self, value):
+        with self._cond:
+            self.version += 1
+            self.value = value
+            self._cond.notify_all()
+
+    def wait(self, after=0, timeout=None):
+        """version > after인 값이 나올 때까지 기다려 (version, 값) 반환. 시간 초과/종료면 (after, None)"""
+        with self._cond:
+            ready = self._cond.wait_for(lambda: self.version > after or self.closed, timeout)
+            if not ready or self.version <= after:
+                return after, None
+            return self.version, self.value
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class Feed:
+    """소비자 한 명의 구독 위치"""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.version = 0
+
+    def next(self, timeout=None):
+        """아직 보지 않은 최신 값 (없으면 timeout 뒤 None)"""
+        self.version, value = self.channel.wait(self.version, timeout)
+        return value
+
+
+class SharedPreview:
+    """미리보기 JPEG를 프레임(seq)당 한 번만 만들어 모든 시청자가 같은 바이트를 씀
+
+    분석 프레임(update.image)을 width로 줄인 버퍼에 골격/사람 박스를 그린 뒤 인코딩하므로
+    분석 프레임 자체는 바뀌지 않는다. 그리기/인코딩 시간은 profiler의 draw/encode 구간으로 잰다.
+    skeleton_only(카메라 설정, 모니터가 맞춤)면 영상 없이 빈 배경에 골격만 그린다.
+    """
+
+    def __init__(self, width=640, quality=70, profiler=PROFILER):
+        self.width = width
+        self.quality = quality
+        self.profiler = profiler
+        self.skeleton_only = False
+        self._renderer = PreviewRenderer(width)
+        self._bgr = None
+        self._lock = threading.Lock()
+        self._seq = None
+        self._data = None
+
+    def jpeg(self, update):
+        with self._lock:
+            if update.seq != self._seq:
+                with self.profiler.stage("draw"):
+                    self._renderer.width = self.width
+                    rgb = self._renderer.render(update.image, update.frame, update.tracks, self.skeleton_only)
+                with self.profiler.stage("encode"):
+                    if self._bgr is None or self._bgr.shape != rgb.shape:
+                        self._bgr = np.empty_like(rgb)
+                    cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR, dst=self._bgr)
+                    ok, data = cv2.imencode(".jpg", self._bgr, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                self._seq = update.seq
+                self._data = data.tobytes() if ok else None
+            return self._data
+
+
+# 프로세스 안에서 카메라별로 하나만 여는 모니터 목록
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def shared_monitor(camera_id, factory):
+    """camera_id의 공유 모니터. 처음 요청할 때만 factory()로 만든다.
+
+    같은 프로세스의 Streamlit 세션들(app.py, app2.py를 여러 명이 열어도)이 카메라와 분석 스레드를
+    하나만 쓰도록 한다.
+    """
+    camera_id = str(camera_id)
+    with _shared_lock:
+        monitor = _shared.get(camera_id)
+        if monitor is None:
+            monitor = factory()
+            _shared[camera_id] = monitor
+        return monitor
+
+
+def shared_monitors():
+    """지금까지 만든 공유 모니터 목록"""
+    with _shared_lock:
+        return list(_shared.values())
@@ -0,0 +1,149 @@
+"""노드 사이 메시지 전달 (주제별 발행/구독)
+
+    broker = create_broker("redis://10.0.0.5:6379/0")   # 여러 장비
+    broker = create_broker("local")                    # 한 프로세스 (시험, 단일 장비)
+    unsubscribe = broker.subscribe("fallwatch.events", callback)
+    broker.publish("fallwatch.events", {"camera": "101", ...})
+
+메시지는 JSON으로 바꿀 수 있는 dict이며, 구독 콜백은 브로커의 전달 스레드에서 호출되므로 오래 걸리는 일은
+다른 스레드로 넘길 것. 주제 이름 끝의 '*'는 접두어 일치 구독이다 (fallwatch.assign.*).
+"""
+import json
+import queue
+import threading
+
+from script.metrics import METRICS
+
+
+class Broker:
+    def publish(self, topic, message):
+        raise NotImplementedError
+
+    def subscribe(self, topic, callback):
+        """callback(topic, message) 등록, 해제 함수를 반환"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def _matches(pattern, topic):
+    return topic.startswith(pattern[:-1]) if pattern.endswith("*") else topic == pattern
+
+
+class LocalBroker(Broker):
+    """같은 프로세스 안의 브로커 (노드들을 스레드로 함께 돌리는 시험/단일 장비용)
+
+    네트워크 브로커와 같게 메시지를 JSON으로 왕복시켜 (복사 + 직렬화 가능 여부 확인) 하나의 전달 스레드에서
+    발행 순서대로 전달한다. 발행은 막히지 않는다.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._deliver, name="local-broker", daemon=True)
+        self._thread.start()
+
+    def publish(self, topic, message):
+        self._queue.put((topic, json.dumps(message)))
+
+    def subscribe(self, topic, callback):
+        entry = (topic, callback)
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+    def _deliver(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            topic, payload = item
+            with self._lock:
+                callbacks = [callback for pattern, callback in self._subscribers if _matches(pattern, topic)]
+            message = json.loads(payload)
+            for callback in callbacks:
+                try:
+                    callback(topic, message)
+                except Exception as exc:
+                    METRICS.event("broker_error", f"{topic}: {type(exc).__name__}: {exc}")
+
+    def drain(self, timeout=2.0):
+        """지금까지 발행한 메시지가 모두 전달될 때까지 대기 (시험용)"""
+        done = threading.Event()
+        unsubscribe = self.subscribe("", lambda topic, message: done.set())
+        self._queue.put(("", "null"))
+        try:
+            return done.wait(timeout)
+        finally:
+            unsubscribe()
+
+    def close(self):
+        self._queue.put(None)
+
+
+class RedisBroker(Broker):
+    """Redis pub/sub 브로커 (redis 패키지 필요, 장비 여러 대)"""
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._callbacks = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def publish(self, topic, message):
+        self._client.publish(topic, json.dumps(message))
+
+    def subscribe(self, topic, callback):
+        with self._lock:
+            callbacks = self._callbacks.setdefault(topic, [])
+            callbacks.append(callback)
+            if len(callbacks) == 1:
+                if topic.endswith("*"):
+                    self._pubsub.psubscribe(**{topic: self._dispatch})
+                else:
+                    self._pubsub.subscribe(**{topic: self._dispatch})
+            if self._thread is None:
+                self._thread = self._pubsub.run_in_thread(sleep_time=0.1, daemon=True)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._callbacks.get(topic, []):
+                    self._callbacks[topic].remove(callback)
+        return unsubscribe
+
+    def _dispatch(self, item):
+        topic = item["channel"].decode()
+        pattern = item.get("pattern")
+        key = pattern.decode() if pattern else topic
+        message = json.loads(item["data"])
+        with self._lock:
+            callbacks = list(self._callbacks.get(key, []))
+        for callback in callbacks:
+            try:
+                callback(topic, message)
+            except Exception as exc:
+                METRICS.event("broker_error", f"{topic}: {type(exc).__name__}: {exc}")
+
+    def close(self):
+        if self._thread is not None:
+            self._thread.stop()
+        self._pubsub.close()
+        self._client.close()
+
+
+def create_broker(url="local"):
+    """'local' 또는 'redis://호스트:포트/DB'"""
+    if url == "local":
+        return LocalBroker()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBroker(url)
+    raise ValueError(f"알 수 없는 브로커 주소: {url}")
@@ -0,0 +1,357 @@
+"""여러 장비에 카메라를 나눠 분석 (작업 노드 + 조정자, 브로커로 통신)
+
+    python -m script.cluster coordinator --broker redis://10.0.0.5:6379/0
+    python -m script.cluster worker --node box1 --broker redis://10.0.0.5:6379/0
+    python -m script.cluster local --workers 2          # 한 프로세스에서 조정자 + 작업 노드 (LocalBroker)
+
+모든 장비는 같은 설정 파일을 쓴다 ([cameras.<id>]가 분석할 카메라 목록).
+- 작업 노드(WorkerNode): 배정받은 카메라마다 CameraMonitor(입력 → 포즈 추론 → detect_fall)를 돌리고,
+  heartbeat_interval마다 카메라별 측정 부하(프레임당 처리 시간 × 처리 FPS = 코어 몇 개분)를 알리며,
+  상태 기록(낙상 등)은 저장소 대신 브로커로 보낸다.
+- 조정자(Coordinator): 카메라를 노드의 (부하 합 / capacity)가 가장 낮은 곳에 배정하고, node_timeout 동안 소식이
+  없는 노드의 카메라는 남은 노드로 옮기며, 노드 사이 사용률 차이가 imbalance를 넘으면 한 번에 하나씩 옮긴다.
+  모든 노드의 상태 기록을 모아 EventStore에 쓴다.
+"""
+import argparse
+import os
+import threading
+import time
+from collections import deque
+
+from script.broker import create_broker
+from script.config import ConfigWatcher
+from script.eventstore import Event, EventStore, status_code
+from script.metrics import METRICS
+from script.monitor import CameraMonitor
+from script.quality import QualityController
+
+TOPIC_HEARTBEAT = "fallwatch.heartbeat"
+TOPIC_EVENTS = "fallwatch.events"
+TOPIC_ASSIGN = "fallwatch.assign."
+
+
+class BrokerEventSink:
+    """EventStore.record와 같은 모양으로 받아 브로커로 보내는 저장소 대신 객체 (작업 노드의 CameraMonitor용)"""
+
+    def __init__(self, broker, node_id):
+        self.broker = broker
+        self.node_id = node_id
+
+    def record(self, camera, message, confidence=None, features=None, ts=None, status=None):
+        self.broker.publish(TOPIC_EVENTS, {
+            "node": self.node_id, "camera": str(camera), "ts": time.time() if ts is None else ts,
+            "status": status_code(message) if status is None else status, "message": message,
+            "confidence": confidence, "features": features,
+        })
+
+
+class WorkerNode:
+    """배정받은 카메라를 분석하는 노드
+
+    capacity는 이 장비가 감당할 분석 코어 수 (기본 CPU 수). quality가 켜져 있으면 노드 안에서도
+    [quality] 설정으로 카메라별 품질을 조절한다.
+    """
+
+    def __init__(self, node_id, broker, config_watcher=None, capacity=None, heartbeat_interval=2.0,
+                 monitor_factory=None, quality=True):
+        self.node_id = node_id
+        self.broker = broker
+        self.config_watcher = config_watcher or ConfigWatcher()
+        self.capacity = capacity or os.cpu_count() or 1
+        self.heartbeat_interval = heartbeat_interval
+        self.events = BrokerEventSink(broker, node_id)
+        self.monitor_factory = monitor_factory or (
+            lambda camera_id: CameraMonitor(camera_id, config_watcher=self.config_watcher, store=self.events))
+        self.monitors = {}
+        self._rates = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._unsubscribe = None
+        self.quality = QualityController(lambda: list(self.monitors.values()), self.config_watcher) if quality else None
+
+    def start(self):
+        self._stop.clear()
+        self._unsubscribe = self.broker.subscribe(TOPIC_ASSIGN + self.node_id, self._on_assign)
+        self._thread = threading.Thread(target=self._run, name=f"worker-{self.node_id}", daemon=True)
+        self._thread.start()
+        if self.quality is not None:
+            self.quality.start()
+        return self
+
+    def stop(self, leaving=True):
+        """모든 카메라를 끄고, leaving이면 조정자가 바로 다른 노드로 옮기도록 알림"""
+        self._stop.set()
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+        if self.quality is not None:
+            self.quality.stop()
+        self.assign([])
+        if leaving:
+            self.broker.publish(TOPIC_HEARTBEAT, {"node": self.node_id, "leaving": True})
+
+    def _on_assign(self, topic, message):
+        self.assign(message["cameras"])
+
+    def assign(self, cameras):
+        """배정 목록에 맞춰 카메라 분석을 켜고 끔"""
+        with self._lock:
+            cameras = [str(camera) for camera in cameras]
+            for camera_id in [c for c in self.monitors if c not in cameras]:
+                self.monitors.pop(camera_id).stop()
+                self._rates.pop(camera_id, None)
+            for camera_id in cameras:
+                if camera_id not in self.monitors:
+                    monitor = self.monitors[camera_id] = self.monitor_factory(camera_id)
+                    monitor.start()
+        self.heartbeat()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.heartbeat()
+            except Exception as exc:
+                METRICS.event("worker_node_error", f"{type(exc).__name__}: {exc}", node=self.node_id)
+            self._stop.wait(self.heartbeat_interval)
+
+    def heartbeat(self):
+        """노드/카메라 상태를 알림: 카메라별 load = 프레임당 처리 시간 × 최근 처리 FPS (코어 수)"""
+        now = time.monotonic()
+        cameras = {}
+        with self._lock:
+            monitors = dict(self.monitors)
+        for camera_id, monitor in monitors.items():
+            seq, at, fps = self._rates.get(camera_id, (monitor._seq, now, 0.0))
+            if now - at >= 0.5:
+                fps = (monitor._seq - seq) / (now - at)
+                seq, at = monitor._seq, now
+            self._rates[camera_id] = (seq, at, fps)
+            cameras[camera_id] = {
+                "load": round(monitor.latency * fps, 4), "fps": round(fps, 2), "latency": round(monitor.latency, 4),
+                "quality_level": monitor.quality_level, "running": monitor.running, "state": monitor.source_state,
+                "fall_count": monitor.fall_count,
+            }
+        self.broker.publish(TOPIC_HEARTBEAT, {
+            "node": self.node_id, "capacity": self.capacity, "ts": time.time(), "cameras": cameras,
+        })
+
+
+class NodeState:
+    def __init__(self, node_id, capacity):
+        self.node_id = node_id
+        self.capacity = capacity
+        self.last_seen = time.monotonic()
+        self.cameras = {}
+
+
+class Coordinator:
+    """카메라 → 작업 노드 배정, 죽은 노드의 카메라 재배정, 상태 기록 모음
+
+    default_load: 아직 부하를 잰 적 없는 카메라의 추정 부하 (코어 수)
+    """
+
+    def __init__(self, broker, config_watcher=None, store=None, node_timeout=6.0, interval=1.0, imbalance=0.25,
+                 default_load=0.25, republish=10.0, history_limit=200):
+        self.broker = broker
+        self.config_watcher = config_watcher or ConfigWatcher()
+        self.store = store
+        self.node_timeout = node_timeout
+        self.interval = interval
+        self.imbalance = imbalance
+        self.default_load = default_load
+        self.republish = republish
+        self.nodes = {}
+        self.assignment = {}
+        self.version = 0
+        self.events = deque(maxlen=history_limit)
+        self._loads = {}
+        self._published = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._unsubscribe = []
+
+    def start(self):
+        self._stop.clear()
+        self._unsubscribe = [
+            self.broker.subscribe(TOPIC_HEARTBEAT, self._on_heartbeat),
+            self.broker.subscribe(TOPIC_EVENTS, self._on_event),
+        ]
+        self._thread = threading.Thread(target=self._run, name="coordinator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.balance()
+            except Exception as exc:
+                METRICS.event("coordinator_error", f"{type(exc).__name__}: {exc}")
+
+    def _on_heartbeat(self, topic, message):
+        node_id = message["node"]
+        with self._lock:
+            if message.get("leaving"):
+                self._drop_node(node_id, "노드 종료")
+                return
+            node = self.nodes.get(node_id)
+            if node is None:
+                node = self.nodes[node_id] = NodeState(node_id, message["capacity"])
+                METRICS.event("node_joined", f"{node_id} 합류 (capacity {node.capacity})", node=node_id)
+            node.capacity = message["capacity"]
+            node.last_seen = time.monotonic()
+            node.cameras = message["cameras"]
+            for camera_id, info in node.cameras.items():
+                if info["fps"] > 0:
+                    self._loads[camera_id] = info["load"]
+                # 조정자가 다시 시작된 경우: 노드가 이미 돌리는 카메라는 그대로 인정
+                self.assignment.setdefault(camera_id, node_id)
+
+    def _on_event(self, topic, message):
+        event = Event(None, message["camera"], message["ts"], message["status"], message["message"],
+                      message["confidence"], message["features"])
+        self.events.append(event)
+        if self.store is not None:
+            self.store.record(event.camera, event.message, confidence=event.confidence, features=event.features,
+                              ts=event.ts, status=event.status)
+
+    def _drop_node(self, node_id, reason):
+        # _lock 안에서 호출
+        if self.nodes.pop(node_id, None) is None:
+            return
+        moved = [camera for camera, node in self.assignment.items() if node == node_id]
+        for camera in moved:
+            del self.assignment[camera]
+        METRICS.event("node_lost", f"{node_id} {reason}, 카메라 {len(moved)}대 재배정", node=node_id)
+
+    def load(self, camera_id):
+        return self._loads.get(camera_id, self.default_load)
+
+    def utilization(self):
+        """노드별 (배정 카메라 부하 합 / capacity)"""
+        usage = {node_id: 0.0 for node_id in self.nodes}
+        for camera, node_id in self.assignment.items():
+            if node_id in usage:
+                usage[node_id] += self.load(camera)
+        return {node_id: value / self.nodes[node_id].capacity for node_id, value in usage.items()}
+
+    def balance(self, now=None):
+        """죽은 노드 정리 → 미배정 카메라 배정 → 불균형이면 카메라 하나 이동. 배정이 바뀌면 True"""
+        now = time.monotonic() if now is None else now
+        cameras = set(self.config_watcher.current.cameras)
+        with self._lock:
+            for node_id in [n for n, node in self.nodes.items() if now - node.last_seen > self.node_timeout]:
+                self._drop_node(node_id, f"{self.node_timeout:g}초 응답 없음")
+            changed = False
+            for camera in [c for c in self.assignment if c not in cameras or self.assignment[c] not in self.nodes]:
+                del self.assignment[camera]
+                changed = True
+            if self.nodes:
+                # 무거운 카메라부터 가장 여유 있는 노드에 (부하 추정이 없으면 default_load)
+                for camera in sorted(cameras - set(self.assignment), key=self.load, reverse=True):
+                    usage = self.utilization()
+                    self.assignment[camera] = min(usage, key=lambda n: (usage[n], n))
+                    changed = True
+                changed |= self._rebalance_one()
+            if changed or now - self._published >= self.republish:
+                self._publish(now, changed)
+        return changed
+
+    def _rebalance_one(self):
+        """가장 바쁜 노드 → 가장 한가한 노드로, 옮겨서 최대 사용률이 줄어드는 카메라 중 가장 작은 것 하나"""
+        usage = self.utilization()
+        if len(usage) < 2:
+            return False
+        busiest = max(usage, key=usage.get)
+        idlest = min(usage, key=usage.get)
+        if usage[busiest] - usage[idlest] <= self.imbalance:
+            return False
+        capacity = self.nodes[idlest].capacity
+        movable = [
+            camera for camera, node_id in self.assignment.items()
+            if node_id == busiest and usage[idlest] + self.load(camera) / capacity < usage[busiest]
+        ]
+        if not movable:
+            return False
+        camera = min(movable, key=self.load)
+        self.assignment[camera] = idlest
+        METRICS.event("camera_moved", f"{camera}: {busiest} → {idlest} (사용률 차이 {usage[busiest] - usage[idlest]:.2f})",
+                      camera=camera)
+        return True
+
+    def _publish(self, now, changed):
+        # _lock 안에서 호출. 바뀌지 않았어도 republish초마다 다시 보내 새로 켜진 노드가 따라오게 함
+        if changed:
+            self.version += 1
+        self._published = now
+        for node_id in self.nodes:
+            cameras = sorted(c for c, n in self.assignment.items() if n == node_id)
+            self.broker.publish(TOPIC_ASSIGN + node_id, {"version": self.version, "cameras": cameras})
+
+    def status(self):
+        """노드별 (사용률, 카메라 목록, 마지막 소식 후 초)"""
+        now = time.monotonic()
+        with self._lock:
+            usage = self.utilization()
+            return {
+                node_id: (usage[node_id], sorted(c for c, n in self.assignment.items() if n == node_id),
+                          now - node.last_seen)
+                for node_id, node in self.nodes.items()
+            }
+
+
+def _print_status(coordinator):
+    for node_id, (usage, cameras, age) in sorted(coordinator.status().items()):
+        print(f"{node_id}: 사용률 {usage:.0%}, 카메라 {', '.join(cameras) or '-'} ({age:.1f}초 전)")
+    for event in list(coordinator.events)[-3:]:
+        print(f"  [{event.camera}] {event.message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("role", choices=("coordinator", "worker", "local"))
+    parser.add_argument("--broker", default="local", help="'local' 또는 redis://호스트:포트/DB")
+    parser.add_argument("--node", default=os.uname().nodename, help="작업 노드 이름")
+    parser.add_argument("--capacity", type=float, default=None, help="작업 노드의 분석 코어 수 (기본 CPU 수)")
+    parser.add_argument("--workers", type=int, default=2, help="local: 작업 노드 수")
+    parser.add_argument("--db", default="data/events.db", help="조정자가 상태 기록을 쓸 저장소")
+    args = parser.parse_args()
+
+    if args.role != "local" and args.broker == "local":
+        parser.error("coordinator/worker는 여러 장비가 공유하는 --broker가 필요합니다.")
+    broker = create_broker(args.broker)
+    config_watcher = ConfigWatcher()
+    store = EventStore(args.db) if args.role != "worker" else None
+    coordinator = None
+    workers = []
+    if args.role in ("coordinator", "local"):
+        coordinator = Coordinator(broker, config_watcher, store).start()
+    if args.role == "worker":
+        workers.append(WorkerNode(args.node, broker, config_watcher, args.capacity).start())
+    elif args.role == "local":
+        workers += [WorkerNode(f"{args.node}-{i}", broker, config_watcher, args.capacity).start()
+                    for i in range(args.workers)]
+    try:
+        while True:
+            time.sleep(5.0)
+            if coordinator is not None:
+                _print_status(coordinator)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            worker.stop()
+        if coordinator is not None:
+            coordinator.stop()
+        if store is not None:
+            store.close()
+        broker.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import dataclasses
+import os
+import threading
+import tomllib
+from dataclasses import dataclass, field
+
+from script.backends import BACKENDS
+from script.metrics import METRICS
+from script.sources import DROP_POLICIES
+
+DEFAULT_CONFIG_PATH = os.environ.get("FALLWATCH_CONFIG", "config/fallwatch.toml")
+
+
+class ConfigError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class DetectionProfile:
+    """감지 민감도와 갱신 주기 (방/카메라별로 다르게 지정 가능)"""
+    name: str = "default"
+    # 관절 visibility 기준 (pose_state)
+    min_visibility: float = 0.5
+    # detect_fall 임계값
+    lying_shoulder_hip: float = 0.15
+    lying_knee_shoulder: float = 0.3
+    upright_shoulder_hip: float = 0.2
+    unstable_shoulder_hip: float = 0.2
+    lying_confidence: float = 0.6
+    upright_confidence: float = 0.7
+    # 갱신 주기 (초)
+    landmark_update_interval: float = 1.0
+    check_interval: float = 3.0
+    buffer_limit: int = 3
+    # 낙상 고위험: CPU가 부족할 때 분석 품질을 가장 나중에, 적게 낮춤 (QualityController)
+    high_risk: bool = False
+
+    def validate(self):
+        for name in ("min_visibility", "lying_confidence", "upright_confidence"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ConfigError(f"[{self.name}] {name}는 0~1 사이여야 합니다.")
+        for name in ("lying_shoulder_hip", "lying_knee_shoulder", "upright_shoulder_hip", "unstable_shoulder_hip"):
+            if not 0.0 < getattr(self, name) < 1.0:
+                raise ConfigError(f"[{self.name}] {name}는 0과 1 사이여야 합니다.")
+        for name in ("landmark_update_interval", "check_interval"):
+            if getattr(self, name) < 0:
+                raise ConfigError(f"[{self.name}] {name}는 0 이상이어야 합니다.")
+        if self.buffer_limit < 1:
+            raise ConfigError(f"[{self.name}] buffer_limit은 1 이상이어야 합니다.")
+
+
+@dataclass(frozen=True)
+class CameraConfig:
+    id: str
+    room: str = ""
+    profile: str = ""
+    # 입력: 장치 번호("0"), 영상 파일 경로, RTSP/HTTP(MJPEG) 주소
+    source: str = "0"
+    # 캡처 해상도/FPS (0 = 포즈 모델 입력 크기에 맞춰 자동)
+    capture_width: int = 0
+    capture_height: int = 0
+    capture_fps: int = 15
+    # 분석이 밀릴 때 입력 버퍼 정책 (oldest: queue_size장을 순서대로, 넘치면 오래된 것부터 버림 / latest: 최신만)
+    drop_policy: str = "oldest"
+    queue_size: int = 2
+    # 감시(Watchdog): 분석 한 프레임/입력 읽기가 이 시간(초) 넘게 멈추면 해당 작업을 새로 시작
+    inference_timeout: float = 10.0
+    capture_timeout: float = 15.0
+    # 여러 사람 동시 추적 (공용 병실 등)
+    multi_person: bool = False
+    # 포즈 백엔드 (mediapipe-lite/full/heavy, onnx) 및 onnx 모델 경로/스레드 수 (0 = 자동)
+    backend: str = "mediapipe-full"
+    model_path: str = ""
+    threads: int = 0
+    # N프레임마다 한 번만 포즈 추론, 사이는 광학 흐름으로 관절 이동 (1 = 매 프레임 추론, 단일 인원 모드만)
+    keyframe_interval: int = 1
+    # 영상은 장비 밖으로 보내지 않음 (개인정보 보호): 미리보기는 빈 배경에 골격만, 대시보드는 관절 좌표만 보냄
+    skeleton_only: bool = False
+
+    def validate(self):
+        if self.backend not in BACKENDS:
+            raise ConfigError(f"[cameras.{self.id}] 알 수 없는 포즈 백엔드: {self.backend}")
+        if self.backend == "onnx" and not self.model_path:
+            raise ConfigError(f"[cameras.{self.id}] onnx 백엔드는 model_path가 필요합니다.")
+        if self.threads < 0:
+            raise ConfigError(f"[cameras.{self.id}] threads는 0 이상이어야 합니다.")
+        if self.drop_policy not in DROP_POLICIES:
+            raise ConfigError(f"[cameras.{self.id}] drop_policy는 {', '.join(DROP_POLICIES)} 중 하나여야 합니다.")
+        if self.queue_size < 1:
+            raise ConfigError(f"[cameras.{self.id}] queue_size는 1 이상이어야 합니다.")
+        if self.inference_timeout <= 0 or self.capture_timeout <= 0:
+            raise ConfigError(f"[cameras.{self.id}] inference_timeout/capture_timeout은 0보다 커야 합니다.")
+        if self.keyframe_interval < 1:
+            raise ConfigError(f"[cameras.{self.id}] keyframe_interval은 1 이상이어야 합니다.")
+        if min(self.capture_width, self.capture_height, self.capture_fps) < 0:
+            raise ConfigError(f"[cameras.{self.id}] capture_width/height/fps는 0 이상이어야 합니다.")
+        if (self.capture_width == 0) != (self.capture_height == 0):
+            raise ConfigError(f"[cameras.{self.id}] capture_width와 capture_height는 함께 지정해야 합니다.")
+
+
+@dataclass(frozen=True)
+class QualityConfig:
+    """CPU 예산에 맞춘 카메라별 분석 품질 자동 조절 (QualityController)"""
+    enabled: bool = True
+    # 전체 CPU 사용률(%) 목표: 넘으면 한 단계씩 낮추고, cpu_budget - headroom 밑이면 한 단계씩 올림
+    cpu_budget: float = 80.0
+    headroom: float = 15.0
+    # 점검 주기, 품질을 바꾼 뒤 다음 변경까지 기다리는 시간 (초)
+    interval: float = 2.0
+    cooldown: float = 6.0
+    # 분석 FPS 하한, 고위험 프로필 카메라가 내려갈 수 있는 최대 단계 (0 = 낮추지 않음)
+    min_fps: int = 3
+    high_risk_max_level: int = 2
+
+    def validate(self):
+        if not 0.0 < self.cpu_budget <= 100.0:
+            raise ConfigError("[quality] cpu_budget은 0보다 크고 100 이하여야 합니다.")
+        if not 0.0 <= self.headroom < self.cpu_budget:
+            raise ConfigError("[quality] headroom은 0 이상, cpu_budget 미만이어야 합니다.")
+        if self.interval <= 0 or self.cooldown < 0:
+            raise ConfigError("[quality] interval은 0보다 크고 cooldown은 0 이상이어야 합니다.")
+        if self.min_fps < 1 or self.high_risk_max_level < 0:
+            raise ConfigError("[quality] min_fps는 1 이상, high_risk_max_level은 0 이상이어야 합니다.")
+
+
+@dataclass(frozen=True)
+class Config:
+    profiles: dict = field(default_factory=lambda: {"default": DetectionProfile()})
+    rooms: dict = field(default_factory=dict)
+    cameras: dict = field(default_factory=dict)
+    quality: QualityConfig = field(default_factory=QualityConfig)
+
+    def camera(self, camera_id):
+        camera_id = str(camera_id)
+        return self.cameras.get(camera_id) or CameraConfig(camera_id)
+
+    def profile_for(self, camera_id):
+        """카메라 지정 프로필 → 방 프로필 → default 순으로 찾는다"""
+        camera = self.camera(camera_id)
+        name = camera.profile or self.rooms.get(camera.room) or "default"
+        return self.profiles[name]
+
+
+def _section(data, context):
+    """[context]가 표(table)인지 확인 (cameras = 1 처럼 잘못 쓴 경우)"""
+    if not isinstance(data, dict):
+        raise ConfigError(f"[{context}]는 표 형식이어야 합니다: {data!r}")
+    return data
+
+
+# 항목 이름과 형식을 확인한 값 dict (int는 float 항목에 허용)
+def _checked_values(cls, data, context, fixed=()):
+    _section(data, context)
+    fields = {f.name: f.type for f in dataclasses.fields(cls)}
+    values = {}
+    for key, value in data.items():
+        if key not in fields or key in fixed:
+            raise ConfigError(f"[{context}] 알 수 없는 설정 항목: {key}")
+        expected = fields[key]
+        if expected is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        # source = 0 처럼 숫자로 쓴 장치 번호는 문자열로 받음
+        if expected is str and isinstance(value, int) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, expected) or isinstance(value, bool) != (expected is bool):
+            raise ConfigError(f"[{context}] {key}의 형식이 올바르지 않습니다: {value!r}")
+        values[key] = value
+    return values
+
+
+def parse_config(data):
+    """TOML에서 읽은 dict를 검증된 Config로 변환
+
+    [profiles.<이름>]   DetectionProfile 항목 (지정하지 않은 값은 [profiles.default]를 따름)
+    [rooms]             방 이름 = 프로필 이름
+    [cameras.<id>]      room, profile, source, capture_width/height/fps, drop_policy, queue_size,
+                        inference_timeout, capture_timeout, multi_person, backend, model_path, threads,
+                        keyframe_interval, skeleton_only
+    [quality]           QualityConfig 항목 (CPU 예산, 고위험 카메라 하한 등)
+    """
+    unknown = set(data) - {"profiles", "rooms", "cameras", "quality"}
+    if unknown:
+        raise ConfigError(f"알 수 없는 설정 섹션: {', '.join(sorted(unknown))}")
+
+    raw_profiles = _section(data.get("profiles", {}), "profiles")
+    default = DetectionProfile(**_checked_values(
+        DetectionProfile, raw_profiles.get("default", {}), "profiles.default", fixed=("name",)))
+    default.validate()
+    profiles = {"default": default}
+    for name, values in raw_profiles.items():
+        if name == "default":
+            continue
+        overrides = _checked_values(DetectionProfile, values, f"profiles.{name}", fixed=("name",))
+        profile = dataclasses.replace(default, name=name, **overrides)
+        profile.validate()
+        profiles[name] = profile
+
+    rooms = {}
+    for room, profile_name in _section(data.get("rooms", {}), "rooms").items():
+        if not isinstance(profile_name, str):
+            raise ConfigError(f"[rooms] {room}의 값은 프로필 이름(문자열)이어야 합니다: {profile_name!r}")
+        if profile_name not in profiles:
+            raise ConfigError(f"[rooms.{room}] 정의되지 않은 프로필: {profile_name}")
+        rooms[room] = profile_name
+
+    cameras = {}
+    for camera_id, values in _section(data.get("cameras", {}), "cameras").items():
+        camera = CameraConfig(str(camera_id), **_checked_values(
+            CameraConfig, values, f"cameras.{camera_id}", fixed=("id",)))
+        if camera.profile and camera.profile not in profiles:
+            raise ConfigError(f"[cameras.{camera_id}] 정의되지 않은 프로필: {camera.profile}")
+        camera.validate()
+        cameras[camera.id] = camera
+
+    quality = QualityConfig(**_checked_values(QualityConfig, data.get("quality", {}), "quality"))
+    quality.validate()
+
+    return Config(profiles, rooms, cameras, quality)
+
+
+def load_config(path=DEFAULT_CONFIG_PATH):
+    """설정 파일을 읽는다. 파일이 없으면 기본 프로필만 있는 설정을 반환"""
+    if not os.path.exists(path):
+        return Config()
+    with open(path, "rb") as f:
+        try:
+            data = tomllib.load(f)
+        except (tomllib.TOMLDecodeError, UnicodeDecodeError) as e:
+            raise ConfigError(f"{path}: {e}") from e
+    return parse_config(data)
+
+
+class ConfigWatcher:
+    """설정 파일 변경을 감시해 새 Config로 통째로 교체한다
+
+    읽는 쪽은 watcher.current만 참조하면 되고, 교체는 참조 한 번 대입이라 잠금 없이 안전하다.
+    새 파일이 잘못되었으면 (읽기 실패 등 예상하지 못한 오류 포함) 기존 설정을 유지하고 last_error와
+    METRICS 사건(config_error)으로 남기며, 감시는 계속한다.
+    """
+
+    def __init__(self, path=DEFAULT_CONFIG_PATH, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self.last_error = None
+        self._signature = self._stat()
+        self.current = load_config(path)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                self._failed(f"{type(e).__name__}: {e}")
+
+    def _failed(self, message):
+        if message != self.last_error:
+            METRICS.event("config_error", f"{self.path}: {message} (기존 설정 유지)")
+        self.last_error = message
+
+    def reload_if_changed(self):
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            config = load_config(self.path)
+        except ConfigError as e:
+            self._failed(str(e))
+            return False
+        except Exception as e:
+            self._failed(f"{type(e).__name__}: {e}")
+            return False
+        self.last_error = None
+        self.current = config
+        return True
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
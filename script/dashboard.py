@@ -0,0 +1,504 @@
+"""웹소켓 실시간 대시보드
+
+    python -m script.dashboard --camera 0 --source 0 --port 8600
+
+카메라 분석은 CameraMonitor 스레드에서 한 번만 하고, 브라우저에는 웹소켓으로
+바뀐 상태 항목(상태, 낙상 횟수, 관절 표, 상태 기록)만 JSON으로 보낸다.
+미리보기는 프레임당 한 번만 JPEG로 인코딩해 같은 바이트를 모든 접속자에게 보내며,
+이전 프레임을 아직 다 받지 못한 느린 접속자는 그 프레임을 건너뛴다.
+골격 모드(--skeleton 또는 카메라 설정 skeleton_only)에서는 영상 대신 관절 좌표만 포즈 스트림 형식
+(script/posecodec.py, 프레임당 약 150바이트)으로 보내고 브라우저가 캔버스에 골격을 그린다.
+서버의 그리기/JPEG 인코딩이 없고 접속자당 전송량이 Mbps에서 kbps 단위로 줄어든다.
+Streamlit 화면과 달리 버튼/재접속으로 카메라 루프가 다시 시작되지 않는다.
+
+접근 제한: 기본은 127.0.0.1에서만 듣는다. 다른 주소(--address 0.0.0.0 등)로 열려면 --token
+(또는 FALLWATCH_DASHBOARD_TOKEN)이 필요하며, 모든 요청은 Authorization: Bearer <토큰> 헤더,
+?token=<토큰> 인자 또는 처음 ?token=으로 접속했을 때 받은 쿠키로 토큰을 확인한다.
+    브라우저: http://<주소>:8600/?token=<토큰>
+
+프로파일링 (재시작 없이):
+    /profile?seconds=10                  최근 10초 구간 타이머, collapsed-stack 텍스트
+    /profile?seconds=10&samples=1&format=svg   샘플링 스택의 SVG 플레임 그래프
+    /profile/stats                       구간별 평균/p95/최대 (JSON)
+    POST /profile/enable?on=1            계속 켜 두기 (on=0이면 끔)
+프로파일러가 꺼져 있으면 /profile은 seconds초 동안만 켜서 모은 뒤 원래대로 돌린다.
+
+감시 지표: /metrics (Prometheus 텍스트), /metrics/events (최근 재시작/재연결 등 사건, JSON)
+"""
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import json
+import os
+
+import tornado.ioloop
+import tornado.web
+import tornado.websocket
+
+from script.detector import POSE_STATE_LABELS
+from script.eventstore import EventStore, STATUS_CLASS, status_code
+from script.monitor import CameraMonitor
+from script.pose import POSE_CONNECTIONS
+from script.posecodec import SCALES, PoseEncoder
+from script.profiler import flamegraph_svg
+from script.render import HistoryRenderer, LandmarkTableRenderer
+from script.timeutil import format_kst
+
+DEFAULT_TOKEN = os.environ.get("FALLWATCH_DASHBOARD_TOKEN")
+TOKEN_COOKIE = "fallwatch_token"
+
+
+def skeleton_streams(update):
+    """(스트림 이름, 포즈 또는 None, 낙상 여부) 목록: 단일 인원은 카메라 하나, 다인원은 사람별"""
+    if update.tracks:
+        return [(f"{update.camera}#{track.id}", track.frame.pose, track.is_fall) for track in update.tracks]
+    return [(update.camera, update.frame.pose, update.is_fall)]
+
+
+class DashboardHub:
+    """모니터 결과 → 접속자 전체로 상태 변화분과 공유 미리보기를 보냄
+
+    on_update()는 분석 스레드에서 불리며 렌더링을 한 번만 하고, 미리보기는 모니터의 공유 JPEG
+    (Streamlit 시청자와 같은 인코딩)를 쓴다. 전송은 IOLoop 스레드로 넘기며 state는 IOLoop 스레드에서만 바뀐다.
+    골격 모드에서는 미리보기 대신 사람별 포즈를 IOLoop 스레드에서 인코딩해 보낸다 (인코더도 IOLoop 스레드 전용).
+    """
+
+    def __init__(self, monitor, loop, preview_interval=0.1, skeleton=False):
+        self.monitor = monitor
+        self.loop = loop
+        self.preview_interval = preview_interval
+        # True면 카메라 설정과 관계없이 항상 골격 모드
+        self.skeleton = skeleton
+        self.clients = set()
+        self.state = {}
+        self.preview = None
+        self._encoders = {}
+        self._landmarks = LandmarkTableRenderer()
+        self._history = HistoryRenderer()
+        self._last_preview = 0.0
+        self._last_landmarks = 0.0
+
+    def on_update(self, update):
+        skeleton = self.skeleton or self.monitor.camera_config().skeleton_only
+        profile = self.monitor.config_watcher.current.profile_for(update.camera)
+        state = {
+            "camera": update.camera,
+            "status": update.status,
+            "status_class": STATUS_CLASS[status_code(update.status)],
+            "fall_count": update.fall_count,
+            "time": format_kst(update.t),
+            "skeleton": skeleton,
+        }
+        # 관절 표는 Streamlit 화면처럼 landmark_update_interval마다 (매 프레임 보내면 표 HTML이 전송량 대부분)
+        if update.t - self._last_landmarks >= profile.landmark_update_interval:
+            self._last_landmarks = update.t
+            state["landmarks"], _ = self._landmarks.render(update.frame, POSE_STATE_LABELS.get(update.frame.state, ""))
+        state["history"], _ = self._history.render(list(self.monitor.history))
+        preview = poses = None
+        if update.t - self._last_preview >= self.preview_interval:
+            self._last_preview = update.t
+            if skeleton:
+                height, width = update.image.shape[:2]
+                streams = skeleton_streams(update)
+                state["frame_size"] = [width, height]
+                state["min_visibility"] = profile.min_visibility
+                state["people"] = [[name, bool(is_fall)] for name, _, is_fall in streams]
+                poses = [(name, update.seq, update.t, pose) for name, pose, _ in streams]
+            else:
+                preview = self.monitor.preview.jpeg(update)
+        self.loop.add_callback(self._publish, state, preview, poses)
+
+    def _publish(self, state, preview, poses=None):
+        delta = {key: value for key, value in state.items() if self.state.get(key) != value}
+        if delta:
+            self.state.update(delta)
+            message = json.dumps(delta, ensure_ascii=False)
+            for client in list(self.clients):
+                client.send(message)
+        if state["skeleton"]:
+            # 영상 미리보기를 새 접속자에게 보내지 않음 (skeleton_only로 바뀐 직후 포함)
+            self.preview = None
+            preview = self._encode_poses(poses) if poses else None
+        elif preview is not None:
+            self.preview = preview
+        if preview:
+            for client in list(self.clients):
+                client.send_preview(preview)
+
+    def _encode_poses(self, poses):
+        """사람별 포즈 스트림 메시지를 이어 붙인 바이트 (웹소켓 메시지 하나)"""
+        messages = []
+        for name, seq, t, pose in poses:
+            encoder = self._encoders.get(name)
+            if encoder is None:
+                encoder = self._encoders[name] = PoseEncoder(name, keyframe_interval=20)
+            messages.append(encoder.encode_frame(seq, t, pose))
+        # 사라진 사람의 인코더 정리 (다시 나타나면 키프레임부터)
+        current = {name for name, _, _, _ in poses}
+        for name in [name for name in self._encoders if name not in current]:
+            del self._encoders[name]
+        return b"".join(messages)
+
+    def request_keyframe(self):
+        """다음 포즈 메시지를 키프레임으로 (새 접속자, 프레임을 건너뛴 접속자가 바로 복원하도록)"""
+        for encoder in self._encoders.values():
+            encoder.reset()
+
+
+def is_loopback(address):
+    """로컬에서만 접속 가능한 주소인지"""
+    if address == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(address).is_loopback
+    except ValueError:
+        return False
+
+
+class TokenAuthMixin:
+    """settings["dashboard_token"]이 있으면 Bearer 헤더, token 인자, 쿠키 중 하나로 토큰을 확인 (없으면 401)
+
+    token 인자로 인증하면 같은 토큰을 쿠키로 남겨 브라우저의 이후 요청(웹소켓 포함)이 통과하게 한다.
+    """
+
+    def prepare(self):
+        token = self.settings.get("dashboard_token")
+        if not token:
+            return
+        argument = self.get_argument("token", None)
+        header = self.request.headers.get("Authorization", "")
+        supplied = argument or (header[7:] if header.startswith("Bearer ") else None) or self.get_cookie(TOKEN_COOKIE)
+        if supplied is None or not hmac.compare_digest(supplied.encode(), token.encode()):
+            raise tornado.web.HTTPError(401)
+        if argument is not None:
+            self.set_cookie(TOKEN_COOKIE, argument, httponly=True, samesite="Strict")
+
+
+class DashboardSocket(TokenAuthMixin, tornado.websocket.WebSocketHandler):
+    def initialize(self, hub):
+        self.hub = hub
+        self._preview_pending = False
+
+    def open(self):
+        self.hub.clients.add(self)
+        # 새 접속자는 현재 전체 상태와 마지막 미리보기부터 받음
+        if self.hub.state:
+            self.send(json.dumps(self.hub.state, ensure_ascii=False))
+        if self.hub.preview is not None:
+            self.send_preview(self.hub.preview)
+        self.hub.request_keyframe()
+
+    def on_close(self):
+        self.hub.clients.discard(self)
+
+    def send(self, message):
+        try:
+            self.write_message(message)
+        except tornado.websocket.WebSocketClosedError:
+            self.hub.clients.discard(self)
+
+    def send_preview(self, data):
+        # 이전 프레임 전송이 끝나지 않았으면 건너뜀 (접속자별 버퍼가 쌓이지 않게).
+        # 포즈 스트림은 이전 포즈와의 차이이므로 다음 메시지를 키프레임으로
+        if self._preview_pending:
+            self.hub.request_keyframe()
+            return
+        try:
+            future = self.write_message(data, binary=True)
+        except tornado.websocket.WebSocketClosedError:
+            self.hub.clients.discard(self)
+            return
+        self._preview_pending = True
+        future.add_done_callback(self._preview_sent)
+
+    def _preview_sent(self, future):
+        self._preview_pending = False
+        future.exception()
+
+
+class ProfileHandler(TokenAuthMixin, tornado.web.RequestHandler):
+    def initialize(self, hub):
+        self.profiler = hub.monitor.profiler
+
+    async def get(self):
+        seconds = min(float(self.get_argument("seconds", "10")), self.profiler.window)
+        samples = self.get_argument("samples", "0") == "1"
+        if not self.profiler.enabled:
+            self.profiler.enabled = True
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                self.profiler.enabled = False
+        lines = self.profiler.collapsed(seconds, samples=samples)
+        if self.get_argument("format", "collapsed") == "svg":
+            self.set_header("Content-Type", "image/svg+xml; charset=utf-8")
+            unit = "샘플" if samples else "µs"
+            self.write(flamegraph_svg(lines, f"FallWatch 최근 {seconds:g}초 ({unit})"))
+        else:
+            self.set_header("Content-Type", "text/plain; charset=utf-8")
+            self.write("\n".join(lines) + "\n")
+
+
+class ProfileStatsHandler(TokenAuthMixin, tornado.web.RequestHandler):
+    def initialize(self, hub):
+        self.profiler = hub.monitor.profiler
+
+    def get(self):
+        seconds = float(self.get_argument("seconds", "10"))
+        stats = {
+            key: {"count": count, "avg_ms": average * 1e3, "p95_ms": p95 * 1e3, "max_ms": worst * 1e3}
+            for key, (count, average, worst, p95) in self.profiler.stats(seconds).items()
+        }
+        self.write({"enabled": self.profiler.enabled, "seconds": seconds, "stages": stats})
+
+
+class ProfileToggleHandler(TokenAuthMixin, tornado.web.RequestHandler):
+    def initialize(self, hub):
+        self.profiler = hub.monitor.profiler
+
+    # 상태를 바꾸므로 POST만 (링크/미리 읽기로 켜지지 않게)
+    def post(self):
+        self.profiler.enabled = self.get_argument("on", "1") == "1"
+        self.write({"enabled": self.profiler.enabled})
+
+
+class MetricsHandler(TokenAuthMixin, tornado.web.RequestHandler):
+    def initialize(self, hub):
+        self.metrics = hub.monitor.metrics
+
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.write(self.metrics.prometheus())
+
+
+class MetricsEventsHandler(TokenAuthMixin, tornado.web.RequestHandler):
+    def initialize(self, hub):
+        self.metrics = hub.monitor.metrics
+
+    def get(self):
+        limit = int(self.get_argument("limit", "100"))
+        self.write({"events": [
+            {"time": format_kst(e.ts), "kind": e.kind, "message": e.message, **e.labels}
+            for e in self.metrics.events(limit)
+        ]})
+
+
+class IndexHandler(TokenAuthMixin, tornado.web.RequestHandler):
+    def get(self):
+        # 토큰은 쿠키로 남았으므로 주소창/기록에서 지움
+        if self.get_argument("token", None) is not None:
+            self.redirect("/")
+            return
+        self.write(INDEX_HTML.replace("__CONNECTIONS__", json.dumps([list(pair) for pair in POSE_CONNECTIONS]))
+                   .replace("__SCALES__", json.dumps(SCALES.tolist())))
+
+
+INDEX_HTML = """<!doctype html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<title>지능형 노인 낙상 감지 시스템</title>
+<style>
+  body { font-family: sans-serif; margin: 1.5rem; color: #111827; }
+  .title { font-size: 2rem; font-weight: bold; color: #1E3A8A; text-align: center;
+           padding: 0.5rem; border-bottom: 2px solid #EEF2FF; }
+  .row { display: flex; gap: 1rem; margin-top: 1rem; }
+  .status-card { flex: 1; background-color: #F9FAFB; padding: 1rem; border-radius: 0.5rem;
+                 border-left: 4px solid #3B82F6; }
+  .status-normal { color: #10B981; font-weight: bold; }
+  .status-warning { color: #F59E0B; font-weight: bold; }
+  .status-danger { color: #EF4444; font-weight: bold; }
+  .subheader { color: #1E3A8A; font-size: 1.3rem; font-weight: bold; margin: 1rem 0 0.5rem;
+               border-bottom: 1px solid #EEF2FF; }
+  .info-text { background-color: #F3F4F6; padding: 0.5rem; border-radius: 0.3rem; font-size: 0.9rem; }
+  .log-item { padding: 0.5rem; margin-bottom: 0.3rem; border-radius: 0.3rem; background-color: #F9FAFB;
+              border-left: 3px solid #3B82F6; }
+  #preview { width: 100%; border-radius: 10px; background: #F3F4F6; min-height: 300px; }
+  #skeleton-view { width: 100%; border-radius: 10px; background: #1F2937; display: none; }
+</style>
+</head>
+<body>
+<div class="title">🛡️ 지능형 노인 낙상 감지 시스템</div>
+<div class="row">
+  <div class="status-card"><b>📷 카메라</b><div id="camera">-</div><div id="connection">연결 중...</div></div>
+  <div class="status-card"><b>🔍 현재 상태</b><div id="status">대기 중</div></div>
+  <div class="status-card"><b>⚠️ 낙상 감지</b><div><span id="fall_count">0</span>회</div></div>
+</div>
+<div class="row">
+  <div style="flex: 1.5">
+    <div class="subheader">📹 실시간 관절 추출 <small id="time"></small></div>
+    <img id="preview" alt="">
+    <canvas id="skeleton-view"></canvas>
+  </div>
+  <div style="flex: 1">
+    <div class="subheader">🦴 관절 정보</div>
+    <div id="landmarks"></div>
+    <div class="subheader">📜 상태 기록</div>
+    <div id="history"></div>
+  </div>
+</div>
+<script>
+const $ = (id) => document.getElementById(id);
+const html = { landmarks: true, history: true };
+// 골격 모드: 포즈 스트림(script/posecodec.py) 복원과 캔버스 그리기
+const CONNECTIONS = __CONNECTIONS__;
+const SCALES = __SCALES__;
+const VALUES = 33 * 4;
+const streams = new Map();
+const skeleton = { people: [], frame_size: [640, 480], min_visibility: 0.5 };
+function decodePoses(buffer) {
+  // 메시지 여러 개가 이어 붙어 있음. 기준 seq가 맞지 않는(빠진 메시지 뒤) 스트림은 키프레임까지 건너뜀
+  const view = new DataView(buffer);
+  let offset = 0;
+  while (offset < buffer.byteLength) {
+    const flags = view.getUint8(offset + 4), count = view.getUint16(offset + 5, true);
+    const firstSeq = view.getUint32(offset + 7, true), base = view.getUint32(offset + 11, true);
+    const length = view.getUint8(offset + 23);
+    const name = new TextDecoder().decode(new Uint8Array(buffer, offset + 24, length));
+    const kinds = new Uint8Array(buffer, offset + 24 + length, count);
+    const seqs = offset + 24 + length + count;
+    let small = 0, large = 0;
+    for (const kind of kinds) { if (kind === 1) small++; else if (kind === 2) large++; }
+    let p8 = seqs + 6 * count, p16 = p8 + small * VALUES;
+    offset = p16 + large * VALUES * 2;
+    let state = streams.get(name);
+    if (flags & 1) state = { base: 0xFFFFFFFF, ref: new Int16Array(VALUES), pose: null };
+    else if (!state || state.base !== base) { streams.delete(name); continue; }
+    for (let i = 0; i < count; i++) {
+      if (kinds[i] === 0) { state.pose = null; continue; }
+      for (let j = 0; j < VALUES; j++) {
+        // Int16Array에 넣으면 2^16 나머지로 잘리므로 인코더의 차이가 정확히 되돌아감
+        state.ref[j] += kinds[i] === 1 ? view.getInt8(p8 + j) : view.getInt16(p16 + 2 * j, true);
+      }
+      if (kinds[i] === 1) p8 += VALUES; else p16 += VALUES * 2;
+      state.base = (firstSeq + view.getUint16(seqs + 2 * i, true)) >>> 0;
+      state.pose = Float32Array.from(state.ref, (value, j) => value / SCALES[j % 4]);
+    }
+    streams.set(name, state);
+  }
+}
+function drawSkeleton() {
+  const canvas = $("skeleton-view"), ctx = canvas.getContext("2d");
+  const [frameWidth, frameHeight] = skeleton.frame_size;
+  const width = canvas.clientWidth || frameWidth, height = Math.round(width * frameHeight / frameWidth);
+  if (canvas.width !== width || canvas.height !== height) { canvas.width = width; canvas.height = height; }
+  ctx.clearRect(0, 0, width, height);
+  for (const [name, isFall] of skeleton.people) {
+    const pose = streams.get(name)?.pose;
+    if (!pose) continue;
+    const visible = (i) => pose[i * 4 + 3] >= skeleton.min_visibility;
+    const x = (i) => pose[i * 4] * width, y = (i) => pose[i * 4 + 1] * height;
+    ctx.strokeStyle = isFall ? "#EF4444" : "#10B981";
+    ctx.lineWidth = 3;
+    ctx.beginPath();
+    for (const [a, b] of CONNECTIONS) {
+      if (visible(a) && visible(b)) { ctx.moveTo(x(a), y(a)); ctx.lineTo(x(b), y(b)); }
+    }
+    ctx.stroke();
+    ctx.fillStyle = "#FFFFFF";
+    for (let i = 0; i < 33; i++) {
+      if (visible(i)) { ctx.beginPath(); ctx.arc(x(i), y(i), 3, 0, 2 * Math.PI); ctx.fill(); }
+    }
+  }
+}
+function apply(key, value) {
+  if (key === "skeleton") {
+    $("skeleton-view").style.display = value ? "block" : "none";
+    $("preview").style.display = value ? "none" : "";
+    if (value) $("preview").removeAttribute("src");
+    return;
+  }
+  if (key in skeleton) { skeleton[key] = value; drawSkeleton(); return; }
+  if (key === "status_class") { $("status").className = value; return; }
+  const el = $(key);
+  if (!el) return;
+  if (html[key]) el.innerHTML = value; else el.textContent = value;
+}
+function connect() {
+  const ws = new WebSocket(`${location.protocol === "https:" ? "wss" : "ws"}://${location.host}/ws`);
+  ws.binaryType = "arraybuffer";
+  ws.onopen = () => { $("connection").textContent = "🟢 연결됨"; };
+  ws.onclose = () => { $("connection").textContent = "🔴 연결 끊김 - 재연결 중"; setTimeout(connect, 2000); };
+  ws.onmessage = (event) => {
+    if (typeof event.data === "string") {
+      for (const [key, value] of Object.entries(JSON.parse(event.data))) apply(key, value);
+    } else if (new Uint8Array(event.data, 0, 4).every((b, i) => b === "FWP1".charCodeAt(i))) {
+      decodePoses(event.data);
+      drawSkeleton();
+    } else {
+      const url = URL.createObjectURL(new Blob([event.data], { type: "image/jpeg" }));
+      const img = $("preview");
+      img.onload = () => URL.revokeObjectURL(url);
+      img.src = url;
+    }
+  };
+}
+connect();
+</script>
+</body>
+</html>
+"""
+
+
+def make_app(hub, token=None):
+    """token이 있으면 모든 경로에 토큰 인증을 건다"""
+    return tornado.web.Application([
+        (r"/", IndexHandler),
+        (r"/ws", DashboardSocket, {"hub": hub}),
+        (r"/profile", ProfileHandler, {"hub": hub}),
+        (r"/profile/stats", ProfileStatsHandler, {"hub": hub}),
+        (r"/profile/enable", ProfileToggleHandler, {"hub": hub}),
+        (r"/metrics", MetricsHandler, {"hub": hub}),
+        (r"/metrics/events", MetricsEventsHandler, {"hub": hub}),
+    ], dashboard_token=token)
+
+
+def serve(monitor, port=8600, address="127.0.0.1", token=DEFAULT_TOKEN, **hub_options):
+    """모니터를 시작하고 대시보드 서버를 띄운다 (Ctrl+C로 종료)
+
+    127.0.0.1/localhost가 아닌 주소로 열려면 token이 있어야 한다.
+    """
+    if not token and not is_loopback(address):
+        raise ValueError(f"{address}로 열려면 토큰이 필요합니다 (--token 또는 FALLWATCH_DASHBOARD_TOKEN).")
+    loop = tornado.ioloop.IOLoop.current()
+    hub = DashboardHub(monitor, loop, **hub_options)
+    make_app(hub, token).listen(port, address)
+    unsubscribe = monitor.subscribe(hub.on_update)
+    monitor.start()
+    print(f"대시보드: http://{address}:{port}/ (카메라 {monitor.camera_id})")
+    try:
+        loop.start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        unsubscribe()
+        monitor.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--camera", default="0", help="설정 파일의 카메라 ID")
+    parser.add_argument("--source", help="장치 번호, 영상 경로 또는 RTSP/HTTP 주소 (기본: 설정 파일의 카메라 source)")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--address", default="127.0.0.1", help="다른 장치에서 접속하려면 0.0.0.0 (--token 필요)")
+    parser.add_argument("--token", default=DEFAULT_TOKEN, help="접속 토큰 (기본: FALLWATCH_DASHBOARD_TOKEN)")
+    parser.add_argument("--preview-fps", type=float, default=10.0)
+    parser.add_argument("--preview-width", type=int, default=640)
+    parser.add_argument("--skeleton", action="store_true", help="영상 대신 관절 좌표만 보냄 (브라우저에서 골격을 그림)")
+    parser.add_argument("--db", default="data/events.db")
+    args = parser.parse_args()
+    if not args.token and not is_loopback(args.address):
+        parser.error(f"--address {args.address}로 열려면 --token 또는 FALLWATCH_DASHBOARD_TOKEN이 필요합니다.")
+
+    store = EventStore(args.db)
+    monitor = CameraMonitor(args.camera, args.source, store=store)
+    monitor.preview.width = args.preview_width
+    try:
+        serve(monitor, args.port, args.address, args.token, preview_interval=1.0 / args.preview_fps, skeleton=args.skeleton)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
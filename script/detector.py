@@ -0,0 +1,49 @@
+from script.config import DetectionProfile
+from script.features import PoseFrame, POSE_NONE, POSE_OCCLUDED, POSE_VALID
+
+POSE_STATE_LABELS = {
+    POSE_NONE: "사람 없음",
+    POSE_OCCLUDED: "일부 가려짐",
+    POSE_VALID: "정상 인식",
+}
+
+DEFAULT_PROFILE = DetectionProfile()
+
+
+# 낙상 감지 함수
+def detect_fall(frame, profile=DEFAULT_PROFILE):
+    """PoseFrame(또는 (33, 4) 관절 배열)을 기반으로 낙상 상태를 감지하는 함수
+
+    특징값은 PoseFrame에 한 번만 계산되어 저장되므로 화면 표시와 중복 계산되지 않는다.
+    임계값은 profile(DetectionProfile)에서 읽는다.
+    (상태 문자열, 낙상 여부, 판단에 사용한 특징값 dict)를 반환한다.
+    """
+    if not isinstance(frame, PoseFrame):
+        frame = PoseFrame(0, None, frame, profile.min_visibility)
+    if frame.state == POSE_NONE:
+        return "정상: 감지 중", False, None
+    if frame.state == POSE_OCCLUDED:
+        return "주의: 일부 관절 감지 불가", False, None
+
+    shoulder_hip_diff = frame.shoulder_hip_diff
+    abs_shoulder_hip_diff = abs(shoulder_hip_diff)
+
+    avg_confidence = frame.mean_confidence
+    features = {"shoulder_hip_diff": shoulder_hip_diff, "confidence": avg_confidence}
+
+    if abs_shoulder_hip_diff < profile.lying_shoulder_hip and avg_confidence > profile.lying_confidence:
+        knee_shoulder_diff = frame.knee_shoulder_diff
+        features["knee_shoulder_diff"] = knee_shoulder_diff
+
+        if knee_shoulder_diff < profile.lying_knee_shoulder:
+            return "위험: 낙상 감지됨", True, features
+        else:
+            return "주의: 비정상적 자세", False, features
+
+    elif shoulder_hip_diff < -profile.upright_shoulder_hip and avg_confidence > profile.upright_confidence:
+        return "정상: 안정적 자세", False, features
+
+    elif abs_shoulder_hip_diff < profile.unstable_shoulder_hip and avg_confidence > profile.upright_confidence:
+        return "주의: 불안정한 자세", False, features
+
+    return "정상: 모니터링 중", False, features
@@ -0,0 +1,321 @@
+"""주석 달린 영상/포즈 로그로 낙상 감지 정확도와 속도를 함께 평가
+
+    python -m script.evaluate data/eval/ --profiles default,high_risk
+    python -m script.evaluate clips/*.mp4 logs/*.npz --backends mediapipe-full,mediapipe-lite --jobs 4
+
+데이터: 포즈 로그(.npz, falls에 낙상 구간) 또는 영상(.mp4 등)과 같은 이름의 .json 주석
+({"falls": [[시작초, 끝초], ...]}, 낙상이 없는 영상은 빈 목록). 디렉터리를 주면 안의 파일을 모두 쓴다.
+
+설정(프로필 × 백엔드)마다 모든 데이터를 CameraMonitor와 같은 순서(One-Euro 필터 → PoseFrame → detect_fall)로
+재생하고, 낙상 판정이 이어진 구간을 경보 하나로 보아 사건 단위로 채점한다.
+- 정밀도: 주석 구간(앞뒤 tolerance초 포함)과 겹친 경보 / 전체 경보
+- 재현율: 경보가 하나라도 겹친 주석 구간 / 전체 주석 구간
+- 지연: 주석 구간 시작 → 그 구간의 첫 경보 (초)
+- 처리 속도: 감지만(프레임/초), 영상은 포즈 추론 포함(프레임/초)
+영상의 포즈 추론은 (백엔드, 영상)마다 한 번만 하고, 추론과 재생은 모두 프로세스 풀에서 나눠 돌린다.
+작업 프로세스끼리 CPU를 나눠 쓰므로 실제 장비 속도를 보려면 --jobs 1로 잴 것.
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from script.backends import backend_for_camera
+from script.config import DEFAULT_CONFIG_PATH, CameraConfig, load_config
+from script.detector import detect_fall
+from script.features import POSE_NONE, PoseFrame
+from script.pose import NUM_LANDMARKS
+from script.poselog import load_poselog
+from script.smoothing import OneEuroFilter
+from script.sources import capture_size_for
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov")
+
+# 평가할 설정 하나: 감지 프로필 + 영상용 카메라 설정(백엔드, keyframe_interval, capture_fps)
+Setting = namedtuple("Setting", "name profile camera")
+
+# 설정 하나의 전체 데이터 결과 (지연은 초, 속도는 프레임/초, 영상이 없으면 pipeline_fps는 None)
+Result = namedtuple(
+    "Result",
+    "name items frames hours falls detected alarms false_alarms precision recall f1 "
+    "delay_mean delay_max detect_fps pipeline_fps",
+)
+
+
+def collect(paths):
+    """경로/패턴/디렉터리 → 정렬된 데이터 파일 목록 (.npz와 영상)"""
+    files = []
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            if os.path.isdir(path):
+                files += [os.path.join(path, name) for name in sorted(os.listdir(path))]
+            else:
+                files.append(path)
+    return [path for path in files if path.endswith(".npz") or path.lower().endswith(VIDEO_EXTENSIONS)]
+
+
+def load_annotation(path):
+    """영상 옆 .json 주석의 낙상 구간 (K, 2)"""
+    annotation = os.path.splitext(path)[0] + ".json"
+    if not os.path.exists(annotation):
+        raise FileNotFoundError(f"주석 파일이 없습니다: {annotation}")
+    with open(annotation, encoding="utf-8") as f:
+        falls = json.load(f).get("falls", [])
+    return np.asarray(falls, dtype=np.float64).reshape(-1, 2)
+
+
+_backends = {}
+
+
+def _backend(camera):
+    # 작업 프로세스마다 (백엔드 설정별로) 한 번만 모델을 읽음
+    key = (camera.backend, camera.model_path, camera.threads, camera.keyframe_interval)
+    if key not in _backends:
+        _backends[key] = backend_for_camera(camera)
+    return _backends[key]
+
+
+def extract_poses(path, camera):
+    """영상 → (poses (T, 33, 4), timestamps, 추론 시간 합 초)
+
+    VideoSource처럼 capture_fps를 넘는 프레임은 건너뛰고 포즈 모델 입력에 맞춘 크기로 줄인다.
+    """
+    backend = _backend(camera)
+    if hasattr(backend, "reset"):
+        backend.reset()
+    size = capture_size_for(backend.input_size)
+    capture = cv2.VideoCapture(path)
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    keep_every = fps / camera.capture_fps if camera.capture_fps and fps > camera.capture_fps else 1.0
+    poses, timestamps = [], []
+    credit, index, seconds = 0.0, -1, 0.0
+    try:
+        while True:
+            index += 1
+            credit += 1.0
+            if credit < keep_every:
+                if not capture.grab():
+                    break
+                continue
+            credit -= keep_every
+            ok, frame = capture.read()
+            if not ok:
+                break
+            h, w = frame.shape[:2]
+            scale = min(size) / min(w, h)
+            if scale < 1.0:
+                frame = cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_LINEAR)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            start = time.perf_counter()
+            pose = backend.process(rgb)
+            seconds += time.perf_counter() - start
+            poses.append(np.zeros((NUM_LANDMARKS, 4), dtype=np.float32) if pose is None else pose)
+            timestamps.append(index / fps)
+    finally:
+        capture.release()
+    return np.array(poses, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 4), np.array(timestamps), seconds
+
+
+def replay(poses, timestamps, profile):
+    """CameraMonitor 단일 인원 경로와 같은 순서로 감지 → (프레임별 낙상 판정 (T,) bool, 걸린 시간 초)"""
+    smoother = OneEuroFilter()
+    result = np.zeros(len(poses), dtype=bool)
+    start = time.perf_counter()
+    for i, (pose, t) in enumerate(zip(poses, timestamps)):
+        # 포즈 로그는 사람 없는 프레임을 0으로 저장
+        if pose[:, 3].any():
+            pose = smoother(pose, t).copy()
+        else:
+            pose = None
+        frame = PoseFrame(i, t, pose, profile.min_visibility)
+        if frame.state == POSE_NONE:
+            smoother.reset()
+        result[i] = detect_fall(frame, profile)[1]
+    return result, time.perf_counter() - start
+
+
+def fall_events(timestamps, is_fall):
+    """낙상 판정이 이어진 구간 목록 [(시작, 끝)] (CameraMonitor의 낙상 횟수와 같은 기준)"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], is_fall.astype(np.int8), [0]))))
+    return [(timestamps[a], timestamps[b - 1]) for a, b in zip(edges[::2], edges[1::2])]
+
+
+def score(events, falls, tolerance=1.0):
+    """(맞은 경보 수, 찾은 주석 구간 수, 찾은 구간별 지연 목록)"""
+    correct = sum(
+        any(start <= end + tolerance and stop >= begin - tolerance for begin, end in falls)
+        for start, stop in events
+    )
+    detected, delays = 0, []
+    for begin, end in falls:
+        onsets = [start for start, stop in events if start <= end + tolerance and stop >= begin - tolerance]
+        if onsets:
+            detected += 1
+            delays.append(max(0.0, min(onsets) - begin))
+    return correct, detected, delays
+
+
+def _extract_task(args):
+    path, camera = args
+    return extract_poses(path, camera)
+
+
+def _replay_task(args):
+    poses, timestamps, falls, profile, tolerance = args
+    is_fall, seconds = replay(poses, timestamps, profile)
+    events = fall_events(timestamps, is_fall)
+    correct, detected, delays = score(events, falls, tolerance)
+    return len(events), correct, detected, delays, seconds
+
+
+def _summarize(name, rows):
+    """_replay_task 결과 + 데이터 정보 rows → Result"""
+    frames = sum(row["frames"] for row in rows)
+    falls = sum(row["falls"] for row in rows)
+    alarms = sum(row["alarms"] for row in rows)
+    correct = sum(row["correct"] for row in rows)
+    detected = sum(row["detected"] for row in rows)
+    delays = [delay for row in rows for delay in row["delays"]]
+    hours = sum(row["duration"] for row in rows) / 3600
+    precision = correct / alarms if alarms else float("nan")
+    recall = detected / falls if falls else float("nan")
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+    detect_seconds = sum(row["detect_seconds"] for row in rows)
+    videos = [row for row in rows if row["inference_seconds"] is not None]
+    pipeline_fps = None
+    if videos:
+        pipeline_fps = sum(row["frames"] for row in videos) / max(
+            sum(row["inference_seconds"] + row["detect_seconds"] for row in videos), 1e-9)
+    return Result(
+        name, len(rows), frames, hours, falls, detected, alarms, alarms - correct, precision, recall, f1,
+        float(np.mean(delays)) if delays else float("nan"), max(delays) if delays else float("nan"),
+        frames / max(detect_seconds, 1e-9), pipeline_fps,
+    )
+
+
+def evaluate(paths, settings, jobs=None, tolerance=1.0):
+    """데이터 파일 목록을 settings(Setting 목록)마다 평가해 Result 목록을 반환
+
+    jobs: 작업 프로세스 수 (None = CPU 수, 1 = 현재 프로세스에서 순서대로)
+    """
+    jobs = jobs or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(jobs) if jobs > 1 else None
+    run = executor.map if executor is not None else map
+    try:
+        # 포즈 로그는 그대로, 영상은 (백엔드 설정, 영상)마다 한 번만 포즈 추론
+        logs = {path: load_poselog(path)[:3] for path in paths if path.endswith(".npz")}
+        videos = [path for path in paths if path not in logs]
+        annotations = {path: load_annotation(path) for path in videos}
+        cameras = {}
+        for setting in settings:
+            cameras.setdefault(_camera_key(setting.camera), setting.camera)
+        jobs_extract = [(path, camera) for camera in cameras.values() for path in videos]
+        extracted = dict(zip(
+            [(_camera_key(camera), path) for path, camera in jobs_extract], run(_extract_task, jobs_extract)))
+
+        tasks, rows = [], []
+        for index, setting in enumerate(settings):
+            for path in paths:
+                if path in logs:
+                    poses, timestamps, falls = logs[path]
+                    inference_seconds = None
+                else:
+                    poses, timestamps, inference_seconds = extracted[(_camera_key(setting.camera), path)]
+                    falls = annotations[path]
+                tasks.append((poses, timestamps, falls, setting.profile, tolerance))
+                rows.append({
+                    "setting": index, "frames": len(poses), "falls": len(falls),
+                    "duration": float(timestamps[-1] - timestamps[0]) if len(timestamps) > 1 else 0.0,
+                    "inference_seconds": inference_seconds,
+                })
+        for row, (alarms, correct, detected, delays, seconds) in zip(rows, run(_replay_task, tasks)):
+            row.update(alarms=alarms, correct=correct, detected=detected, delays=delays, detect_seconds=seconds)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return [_summarize(setting.name, [row for row in rows if row["setting"] == index])
+            for index, setting in enumerate(settings)]
+
+
+def _camera_key(camera):
+    return camera.backend, camera.model_path, camera.threads, camera.keyframe_interval, camera.capture_fps
+
+
+def settings_from_config(config, profiles=None, backends=None, keyframe_interval=None, base_camera=None):
+    """설정 파일의 프로필 × 백엔드 조합 목록 (백엔드를 하나만 쓰면 이름은 프로필 이름)"""
+    base_camera = base_camera or CameraConfig("eval")
+    names = profiles or list(config.profiles)
+    backends = backends or [base_camera.backend]
+    settings = []
+    for backend in backends:
+        camera = CameraConfig(
+            "eval", backend=backend, model_path=base_camera.model_path, threads=base_camera.threads,
+            keyframe_interval=keyframe_interval or base_camera.keyframe_interval,
+            capture_fps=base_camera.capture_fps,
+        )
+        for name in names:
+            if name not in config.profiles:
+                raise ValueError(f"설정에 없는 프로필: {name}")
+            label = name if len(backends) == 1 else f"{name}@{backend}"
+            settings.append(Setting(label, config.profiles[name], camera))
+    return settings
+
+
+def _fmt(value, pattern):
+    return "-" if value is None or value != value else format(value, pattern)
+
+
+def format_table(results):
+    header = (f"{'설정':<24} | {'데이터':>6} | {'낙상':>4} | {'찾음':>4} | {'경보':>4} | {'오경보/h':>8} | "
+              f"{'정밀도':>6} | {'재현율':>6} | {'F1':>5} | {'지연 평균/최대':>13} | {'감지 fps':>9} | {'전체 fps':>8}")
+    lines = [header, "-" * len(header)]
+    for r in results:
+        false_rate = r.false_alarms / r.hours if r.hours else None
+        delay = f"{_fmt(r.delay_mean, '.2f')}/{_fmt(r.delay_max, '.2f')}s"
+        lines.append(
+            f"{r.name:<24} | {r.items:>6} | {r.falls:>4} | {r.detected:>4} | {r.alarms:>4} | "
+            f"{_fmt(false_rate, '.1f'):>8} | {_fmt(r.precision, '.3f'):>6} | {_fmt(r.recall, '.3f'):>6} | "
+            f"{_fmt(r.f1, '.3f'):>5} | {delay:>13} | {_fmt(r.detect_fps, ',.0f'):>9} | "
+            f"{_fmt(r.pipeline_fps, '.1f'):>8}"
+        )
+    return "\n".join(lines)
+
+
+def _names(text):
+    return [name for name in text.split(",") if name] if text else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data", nargs="+", help="포즈 로그(.npz), 영상(.json 주석 필요), 또는 디렉터리")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH)
+    parser.add_argument("--profiles", help="평가할 프로필 (쉼표로 구분, 기본 = 설정 파일의 전체)")
+    parser.add_argument("--backends", help="영상에 쓸 포즈 백엔드 (쉼표로 구분, 기본 = mediapipe-full)")
+    parser.add_argument("--model-path", default="", help="onnx 백엔드 모델 경로")
+    parser.add_argument("--keyframe-interval", type=int, default=1)
+    parser.add_argument("--fps", type=int, default=15, help="영상 분석 FPS (capture_fps)")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="주석 구간 앞뒤 허용 오차 (초)")
+    parser.add_argument("--jobs", type=int, default=None, help="작업 프로세스 수 (기본 = CPU 수)")
+    args = parser.parse_args()
+
+    paths = collect(args.data)
+    if not paths:
+        parser.error("평가할 데이터가 없습니다.")
+    settings = settings_from_config(
+        load_config(args.config), _names(args.profiles), _names(args.backends), args.keyframe_interval,
+        CameraConfig("eval", model_path=args.model_path, capture_fps=args.fps),
+    )
+    start = time.perf_counter()
+    results = evaluate(paths, settings, args.jobs, args.tolerance)
+    print(f"데이터 {len(paths)}개 × 설정 {len(settings)}개 ({time.perf_counter() - start:.1f}초)")
+    print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
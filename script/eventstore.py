@@ -0,0 +1,214 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from script.metrics import METRICS
+
+# 상태 코드 (문자열 부분 일치 대신 저장 시 한 번만 분류)
+STATUS_INFO = 0
+STATUS_NORMAL = 1
+STATUS_WARNING = 2
+STATUS_DANGER = 3
+
+STATUS_CLASS = {
+    STATUS_INFO: "status-normal",
+    STATUS_NORMAL: "status-normal",
+    STATUS_WARNING: "status-warning",
+    STATUS_DANGER: "status-danger",
+}
+
+Event = namedtuple("Event", "id camera ts status message confidence features")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    camera TEXT NOT NULL,
+    ts REAL NOT NULL,
+    status INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    confidence REAL,
+    features TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS idx_events_camera_ts ON events (camera, ts);
+"""
+
+_COLUMNS = "id, camera, ts, status, message, confidence, features"
+
+
+def status_code(message):
+    """'위험: 낙상 감지됨' 같은 감지 결과 문자열을 상태 코드로 변환"""
+    if message.startswith("위험") or "낙상 감지" in message:
+        return STATUS_DANGER
+    if message.startswith("주의"):
+        return STATUS_WARNING
+    if message.startswith("정상"):
+        return STATUS_NORMAL
+    return STATUS_INFO
+
+
+def _row_to_event(row):
+    features = json.loads(row[6]) if row[6] else None
+    return Event(row[0], row[1], row[2], row[3], row[4], row[5], features)
+
+
+class EventStore:
+    """SQLite(WAL) 기반 낙상 이벤트 저장소
+
+    record()는 큐에 넣기만 하고 반환하며, 백그라운드 스레드가 모아서 한 트랜잭션으로 기록한다.
+    기록에 실패한 묶음(디스크 가득 참, 잠김 등)은 METRICS 사건으로 남기고 failed에 센 뒤 버리며 기록은 계속한다.
+    path가 ":memory:"면 (시험용) 쓰기/읽기 스레드가 연결 하나를 같이 쓴다.
+    """
+
+    def __init__(self, path="data/events.db", batch_size=64, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._queue = queue.SimpleQueue()
+        self._local = threading.local()
+        self._closed = False
+        self._flushed = threading.Condition()
+        self._pending = 0
+        self.failed = 0
+        # 메모리 DB는 연결마다 따로 생기므로 하나를 공유
+        self._shared = sqlite3.connect(path, check_same_thread=False) if path == ":memory:" else None
+
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+        self._writer = threading.Thread(target=self._write_loop, name="event-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        if self._shared is not None:
+            return self._shared
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # 읽기 연결은 스레드마다 하나씩 재사용
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def record(self, camera, message, confidence=None, features=None, ts=None, status=None):
+        """이벤트 한 건을 쓰기 큐에 넣는다 (블로킹 없음)"""
+        if self._closed:
+            raise RuntimeError("EventStore가 이미 닫혔습니다.")
+        if ts is None:
+            ts = time.time()
+        if status is None:
+            status = status_code(message)
+        with self._flushed:
+            self._pending += 1
+        self._queue.put((str(camera), ts, status, message, confidence, features))
+
+    def _write_loop(self):
+        conn = self._connect()
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if item is None:
+                stop = True
+            if batch:
+                try:
+                    self._insert(conn, batch)
+                except Exception as exc:
+                    self.failed += len(batch)
+                    METRICS.event("event_store_error", f"이벤트 {len(batch)}건 기록 실패: {type(exc).__name__}: {exc}")
+            with self._flushed:
+                self._pending -= len(batch)
+                self._flushed.notify_all()
+        if conn is not self._shared:
+            conn.close()
+
+    def _insert(self, conn, batch):
+        rows = [
+            # JSON으로 못 바꾸는 값(numpy 스칼라 등)은 문자열로 (한 건 때문에 묶음 전체를 잃지 않게)
+            (camera, ts, status, message, confidence,
+             json.dumps(features, default=str) if features is not None else None)
+            for camera, ts, status, message, confidence, features in batch
+        ]
+        with conn:
+            conn.executemany(
+                "INSERT INTO events (camera, ts, status, message, confidence, features) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def flush(self, timeout=5.0):
+        """큐에 쌓인 이벤트가 모두 기록될 때까지 대기"""
+        with self._flushed:
+            return self._flushed.wait_for(lambda: self._pending <= 0, timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        if self._shared is not None:
+            self._shared.close()
+
+    def recent(self, camera=None, limit=10):
+        """최신 이벤트부터 limit 건"""
+        return self.page(camera=camera, limit=limit)
+
+    def page(self, camera=None, before=None, since=None, limit=50):
+        """(ts, id) 키셋 페이지네이션. before에는 이전 페이지 마지막 Event를 넘긴다."""
+        where, params = [], []
+        if camera is not None:
+            where.append("camera = ?")
+            params.append(str(camera))
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since)
+        if before is not None:
+            where.append("(ts < ? OR (ts = ? AND id < ?))")
+            params.extend([before.ts, before.ts, before.id])
+        sql = f"SELECT {_COLUMNS} FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [_row_to_event(row) for row in self._reader().execute(sql, params)]
+
+    def count(self, camera=None, status=None, since=None):
+        where, params = [], []
+        if camera is not None:
+            where.append("camera = ?")
+            params.append(str(camera))
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        if since is not None:
+            where.append("ts >= ?")
+            params.append(since)
+        sql = "SELECT COUNT(*) FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._reader().execute(sql, params).fetchone()[0]
@@ -0,0 +1,311 @@
+"""포즈 특징 윈도우 기반 낙상 분류기
+
+    python -m script.fallpredict train logs/*.npz -o models/fallpredict.npz --window 30
+    python -m script.fallpredict eval logs/*.npz -m models/fallpredict.npz
+
+학습 로그의 프레임 간격(fps)으로 연속 프레임 window개의 (33, 4) 포즈에서 자세 특징(어깨/엉덩이/무릎 높이, 몸통 기울기, 외곽 박스 비율 등)을
+뽑아 요약 통계로 만들고, 깊이 고정(oblivious) 그래디언트 부스팅 트리로 낙상 확률을 계산한다.
+같은 깊이의 노드가 모두 같은 분기 조건을 쓰므로 예측은 비교 → 비트 조합 → 표 조회만으로 끝나고,
+여러 윈도우를 한 번에 numpy 연산으로 점수 매길 수 있다.
+fps는 모델에 함께 저장되며, 실시간 입력은 프레임 시각으로 같은 간격에 맞춰 다시 뽑는다 (is_fallen의 timestamps).
+"""
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+
+from script.features import KEY_POINTS
+from script.pose import (
+    NUM_LANDMARKS, NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP, LEFT_KNEE, RIGHT_KNEE,
+)
+from script.poselog import frame_labels, load_poselog
+
+DEFAULT_MODEL_PATH = os.environ.get("FALLWATCH_FALL_MODEL", "models/fallpredict.npz")
+
+FRAME_FEATURES = (
+    "shoulder_y", "hip_y", "knee_y", "shoulder_hip_dy", "knee_shoulder_dy",
+    "torso_angle", "box_aspect", "confidence", "head_hip_dy",
+)
+
+
+def frame_features(poses):
+    """(..., 33, 4) 포즈 → (..., 9) 프레임 특징"""
+    xy = poses[..., :2]
+    shoulder = (xy[..., LEFT_SHOULDER, :] + xy[..., RIGHT_SHOULDER, :]) / 2
+    hip = (xy[..., LEFT_HIP, :] + xy[..., RIGHT_HIP, :]) / 2
+    knee = (xy[..., LEFT_KNEE, :] + xy[..., RIGHT_KNEE, :]) / 2
+    torso = shoulder - hip
+    key = xy[..., KEY_POINTS, :]
+    extent = key.max(axis=-2) - key.min(axis=-2)
+    return np.stack([
+        shoulder[..., 1],
+        hip[..., 1],
+        knee[..., 1],
+        torso[..., 1],
+        np.abs(knee[..., 1] - shoulder[..., 1]),
+        np.arctan2(np.abs(torso[..., 0]), np.abs(torso[..., 1]) + 1e-6),
+        extent[..., 0] / (extent[..., 1] + 1e-3),
+        poses[..., KEY_POINTS, 3].mean(axis=-1),
+        xy[..., NOSE, 1] - hip[..., 1],
+    ], axis=-1).astype(np.float32)
+
+
+def window_features(frames):
+    """(N, W, 9) 프레임 특징 윈도우 → (N, 47) 요약 특징 (마지막/평균/최소/최대/변화량 + 최대 하강 속도)"""
+    velocity = np.diff(frames[:, :, :2], axis=1)
+    return np.concatenate([
+        frames[:, -1],
+        frames.mean(axis=1),
+        frames.min(axis=1),
+        frames.max(axis=1),
+        frames[:, -1] - frames[:, 0],
+        velocity.max(axis=1) if velocity.shape[1] else np.zeros((len(frames), 2), np.float32),
+    ], axis=1)
+
+
+def sliding_windows(values, window, stride=1):
+    """(T, ...) → (N, window, ...) 복사 없는 슬라이딩 윈도우"""
+    view = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+    return np.moveaxis(view, -1, 1)[::stride]
+
+
+class FallClassifier:
+    """깊이 고정 그래디언트 부스팅 트리 (로지스틱 손실)
+
+    features/thresholds: (트리 수, 깊이) 분기 특징 번호와 기준값, values: (트리 수, 2^깊이) 잎 값
+    fps: 학습 윈도우의 프레임 속도 (윈도우 길이는 window / fps초)
+    """
+
+    def __init__(self, features, thresholds, values, base, window, fps):
+        self.features = features
+        self.thresholds = thresholds
+        self.values = values
+        self.base = float(base)
+        self.window = int(window)
+        self.fps = float(fps)
+        if self.fps <= 0:
+            raise ValueError("fps는 0보다 커야 합니다.")
+        self._powers = 1 << np.arange(features.shape[1] - 1, -1, -1)
+        self._tree_index = np.arange(len(features))
+
+    def decision_function(self, X):
+        """(N, 47) 요약 특징 → (N,) logit"""
+        bits = X[:, self.features] > self.thresholds
+        leaves = bits @ self._powers
+        return self.base + self.values[self._tree_index, leaves].sum(axis=1)
+
+    def predict_features(self, X):
+        return 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+
+    def predict(self, windows):
+        """(N, window, 33, 4) 포즈 윈도우 묶음 → (N,) 낙상 확률"""
+        return self.predict_features(window_features(frame_features(np.asarray(windows, dtype=np.float32))))
+
+    @property
+    def duration(self):
+        """윈도우가 덮는 시간 (초)"""
+        return (self.window - 1) / self.fps
+
+    def resample(self, frame_buffer, timestamps, max_gap=0.5):
+        """시각이 있는 포즈 목록(오래된 것부터) → 학습 fps 간격의 (window, 33, 4) 윈도우
+
+        각 목표 시각에 가장 가까운 프레임을 쓰고, 사람이 없는 프레임(None)은 학습 로그처럼 0으로 채운다.
+        기록이 윈도우 길이보다 짧거나 프레임 사이가 max_gap초보다 벌어졌으면 None.
+        """
+        t = np.asarray(timestamps, dtype=np.float64)
+        if len(t) != len(frame_buffer):
+            raise ValueError("포즈와 시각의 개수가 다릅니다.")
+        if not len(t):
+            return None
+        targets = t[-1] - np.arange(self.window - 1, -1, -1) / self.fps
+        if targets[0] < t[0] - 0.5 / self.fps:
+            return None
+        first = max(int(np.searchsorted(t, targets[0], side="right")) - 1, 0)
+        if np.diff(t[first:]).max(initial=0.0) > max_gap:
+            return None
+        if len(t) == 1:
+            index = np.zeros(self.window, dtype=np.int64)
+        else:
+            right = np.clip(np.searchsorted(t, targets), 1, len(t) - 1)
+            left = right - 1
+            index = np.where(targets - t[left] <= t[right] - targets, left, right)
+        empty = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        return np.stack([empty if frame_buffer[i] is None else frame_buffer[i] for i in index.tolist()])
+
+    def is_fallen(self, frame_buffer, threshold=0.5, timestamps=None):
+        """최근 포즈 목록(오래된 것부터, 사람이 없으면 None)으로 낙상 여부 판단
+
+        timestamps(프레임 시각, 초)를 주면 학습 fps 간격으로 다시 뽑아 판단한다.
+        없으면 목록이 이미 학습 fps로 빠짐없이 기록된 것으로 보고 마지막 window 프레임을 쓴다.
+        """
+        if timestamps is not None:
+            window = self.resample(frame_buffer, timestamps)
+            if window is None:
+                return False
+        else:
+            if len(frame_buffer) < self.window:
+                return False
+            empty = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+            window = np.stack([empty if p is None else p for p in frame_buffer[-self.window:]])
+        return bool(self.predict(window[None])[0] >= threshold)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(path, features=self.features, thresholds=self.thresholds, values=self.values,
+                 base=self.base, window=self.window, fps=self.fps)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if "fps" not in data.files:
+                raise ValueError(f"fps가 없는 예전 모델입니다. 다시 학습하세요: {path}")
+            return cls(data["features"], data["thresholds"], data["values"], data["base"], data["window"],
+                       data["fps"])
+
+    @classmethod
+    def fit(cls, X, y, window, fps, n_trees=100, depth=4, learning_rate=0.1, n_bins=32, l2=1.0):
+        """(N, F) 특징과 (N,) 0/1 라벨로 학습. 낙상 샘플이 적으므로 양성 가중치를 자동으로 맞춘다."""
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float64)
+        n, n_features = X.shape
+        # 특징별 분위수 경계로 구간화 (bin b 초과 ⇔ x > edges[b])
+        qs = np.linspace(0, 1, n_bins + 1)[1:-1]
+        edges = np.quantile(X, qs, axis=0).T.astype(np.float32)
+        binned = np.stack([np.searchsorted(edges[f], X[:, f], side="left") for f in range(n_features)], axis=1)
+
+        positives = max(y.sum(), 1.0)
+        weight = np.where(y > 0, (n - positives) / positives, 1.0)
+        p0 = np.clip(np.average(y, weights=weight), 1e-3, 1 - 1e-3)
+        base = np.log(p0 / (1 - p0))
+        logit = np.full(n, base)
+
+        n_leaves = 1 << depth
+        features = np.zeros((n_trees, depth), dtype=np.int64)
+        thresholds = np.zeros((n_trees, depth), dtype=np.float32)
+        values = np.zeros((n_trees, n_leaves), dtype=np.float32)
+        for t in range(n_trees):
+            p = 1.0 / (1.0 + np.exp(-logit))
+            g = (p - y) * weight
+            h = np.maximum(p * (1 - p), 1e-6) * weight
+            leaf = np.zeros(n, dtype=np.int64)
+            for level in range(depth):
+                n_nodes = 1 << level
+                best_gain, best_f, best_b = -np.inf, 0, 0
+                for f in range(n_features):
+                    idx = leaf * n_bins + binned[:, f]
+                    G = np.bincount(idx, g, n_nodes * n_bins).reshape(n_nodes, n_bins)
+                    H = np.bincount(idx, h, n_nodes * n_bins).reshape(n_nodes, n_bins)
+                    GL, HL = np.cumsum(G, axis=1)[:, :-1], np.cumsum(H, axis=1)[:, :-1]
+                    GR, HR = G.sum(axis=1, keepdims=True) - GL, H.sum(axis=1, keepdims=True) - HL
+                    gain = (GL ** 2 / (HL + l2) + GR ** 2 / (HR + l2)).sum(axis=0)
+                    b = int(np.argmax(gain))
+                    if gain[b] > best_gain:
+                        best_gain, best_f, best_b = gain[b], f, b
+                features[t, level] = best_f
+                thresholds[t, level] = edges[best_f, best_b]
+                leaf = leaf * 2 + (binned[:, best_f] > best_b)
+            G = np.bincount(leaf, g, n_leaves)
+            H = np.bincount(leaf, h, n_leaves)
+            values[t] = -learning_rate * G / (H + l2)
+            logit += values[t, leaf]
+        return cls(features, thresholds, values, base, window, fps)
+
+
+def dataset_from_logs(paths, window, stride=1):
+    """포즈 로그들 → (요약 특징 X, 라벨 y). 윈도우 마지막 프레임이 낙상 구간이면 양성."""
+    X, y = [], []
+    for path in paths:
+        poses, timestamps, falls, _ = load_poselog(path)
+        if len(poses) < window:
+            continue
+        feats = sliding_windows(frame_features(poses), window, stride)
+        labels = frame_labels(timestamps, falls)[window - 1::stride][:len(feats)]
+        X.append(window_features(feats))
+        y.append(labels)
+    if not X:
+        raise ValueError(f"window({window})보다 긴 포즈 로그가 없습니다.")
+    return np.concatenate(X), np.concatenate(y)
+
+
+def logs_fps(paths):
+    """포즈 로그들의 프레임 속도 (프레임 간격 중앙값 기준)"""
+    gaps = [np.diff(load_poselog(path)[1]) for path in paths]
+    gaps = np.concatenate(gaps) if gaps else np.empty(0)
+    gaps = gaps[gaps > 0]
+    if not len(gaps):
+        raise ValueError("포즈 로그에서 프레임 속도를 구할 수 없습니다.")
+    return float(1.0 / np.median(gaps))
+
+
+_default_model = None
+
+
+def load_model(path=DEFAULT_MODEL_PATH):
+    """학습된 모델을 읽는다. 파일이 없으면 None (규칙 기반 detect_fall로 대체)"""
+    global _default_model
+    if not os.path.exists(path):
+        return None
+    if path != DEFAULT_MODEL_PATH:
+        return FallClassifier.load(path)
+    if _default_model is None:
+        _default_model = FallClassifier.load(path)
+    return _default_model
+
+
+def is_fallen(frame_buffer, timestamps=None):
+    """기본 모델로 최근 포즈 목록의 낙상 여부 판단"""
+    model = load_model()
+    if model is None:
+        raise FileNotFoundError(f"낙상 분류 모델이 없습니다: {DEFAULT_MODEL_PATH}")
+    return model.is_fallen(frame_buffer, timestamps=timestamps)
+
+
+def _report(model, X, y):
+    pred = model.predict_features(X) >= 0.5
+    tp = int((pred & y).sum())
+    precision = tp / max(int(pred.sum()), 1)
+    recall = tp / max(int(y.sum()), 1)
+    start = time.perf_counter()
+    model.predict_features(X)
+    per_window = (time.perf_counter() - start) / max(len(X), 1) * 1e6
+    print(f"윈도우 {len(X)}개 (낙상 {int(y.sum())}) | 정밀도 {precision:.3f} | 재현율 {recall:.3f} | "
+          f"예측 {per_window:.2f}us/윈도우")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train")
+    train.add_argument("logs", nargs="+")
+    train.add_argument("-o", "--output", default=DEFAULT_MODEL_PATH)
+    train.add_argument("--window", type=int, default=30)
+    train.add_argument("--stride", type=int, default=2)
+    train.add_argument("--trees", type=int, default=100)
+    train.add_argument("--depth", type=int, default=4)
+    train.add_argument("--lr", type=float, default=0.1)
+    evaluate = sub.add_parser("eval")
+    evaluate.add_argument("logs", nargs="+")
+    evaluate.add_argument("-m", "--model", default=DEFAULT_MODEL_PATH)
+    args = parser.parse_args()
+
+    paths = sorted(p for pattern in args.logs for p in glob.glob(pattern))
+    if args.command == "train":
+        X, y = dataset_from_logs(paths, args.window, args.stride)
+        model = FallClassifier.fit(X, y, args.window, logs_fps(paths), n_trees=args.trees, depth=args.depth, learning_rate=args.lr)
+        model.save(args.output)
+        print(f"{args.output} 저장 완료 ({model.fps:.1f}fps)")
+        _report(model, X, y)
+    else:
+        model = FallClassifier.load(args.model)
+        fps = logs_fps(paths)
+        # 프레임 수 윈도우는 같은 fps에서만 같은 시간을 덮음
+        if abs(fps - model.fps) > 0.1 * model.fps:
+            parser.error(f"로그 프레임 속도({fps:.1f}fps)가 모델({model.fps:.1f}fps)과 다릅니다.")
+        X, y = dataset_from_logs(paths, model.window)
+        _report(model, X, y)
+
+
+if __name__ == "__main__":
+    main()
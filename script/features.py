@@ -0,0 +1,142 @@
+import math
+from collections import OrderedDict
+from functools import cached_property
+
+import numpy as np
+
+from script.pose import (
+    VIS,
+    LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP, LEFT_KNEE, RIGHT_KNEE, LEFT_ANKLE, RIGHT_ANKLE,
+)
+
+# 프레임 단위 포즈 상태
+POSE_NONE = "none"          # 사람 없음 (랜드마크 없음 또는 주요 관절이 하나도 안 보임)
+POSE_OCCLUDED = "occluded"  # 일부 관절 가려짐
+POSE_VALID = "valid"        # 판단 가능
+
+# 표시/판단에 쓰는 주요 관절
+KEY_POINTS = np.array([
+    LEFT_SHOULDER, RIGHT_SHOULDER,
+    LEFT_HIP, RIGHT_HIP,
+    LEFT_KNEE, RIGHT_KNEE,
+    LEFT_ANKLE, RIGHT_ANKLE,
+])
+# 낙상 판단에 반드시 보여야 하는 관절 (발목은 판단에 쓰지 않음)
+REQUIRED_POINTS = np.array([LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP, LEFT_KNEE, RIGHT_KNEE])
+
+
+class PoseFrame:
+    """한 프레임의 포즈와 파생값
+
+    파생값은 처음 읽을 때 한 번만 계산되어 저장되므로, 감지 함수와 화면 표(UI)가
+    같은 PoseFrame을 읽으면 중복 계산이 없다. pose 배열은 이 객체가 소유한다고 가정한다(복사본을 넘길 것).
+    """
+
+    def __init__(self, seq, t, pose, min_visibility=0.5):
+        self.seq = seq
+        self.t = t
+        self.pose = pose
+        self.min_visibility = min_visibility
+
+    @cached_property
+    def mask(self):
+        """관절별 visibility 통과 여부 (33,)"""
+        if self.pose is None:
+            return None
+        return self.pose[:, VIS] >= self.min_visibility
+
+    @cached_property
+    def state(self):
+        mask = self.mask
+        if mask is None or not mask[KEY_POINTS].any():
+            return POSE_NONE
+        if not mask[REQUIRED_POINTS].all():
+            return POSE_OCCLUDED
+        return POSE_VALID
+
+    @cached_property
+    def rows(self):
+        """관절별 [x, y, z, visibility] 파이썬 float 목록 (표 출력용)"""
+        return self.pose.tolist()
+
+    @cached_property
+    def visible(self):
+        return self.mask.tolist()
+
+    @cached_property
+    def centres(self):
+        """어깨/엉덩이/무릎/발목 중심점 (4, 2): 행 순서 shoulder, hip, knee, ankle"""
+        xy = self.pose[:, :2]
+        return np.stack([
+            (xy[LEFT_SHOULDER] + xy[RIGHT_SHOULDER]) / 2,
+            (xy[LEFT_HIP] + xy[RIGHT_HIP]) / 2,
+            (xy[LEFT_KNEE] + xy[RIGHT_KNEE]) / 2,
+            (xy[LEFT_ANKLE] + xy[RIGHT_ANKLE]) / 2,
+        ])
+
+    @cached_property
+    def shoulder_hip_diff(self):
+        return float(self.centres[0, 1] - self.centres[1, 1])
+
+    @cached_property
+    def knee_shoulder_diff(self):
+        return float(abs(self.centres[2, 1] - self.centres[0, 1]))
+
+    @cached_property
+    def torso_angle(self):
+        """몸통(엉덩이→어깨)이 수직에서 기운 각도 (도, 0 = 서 있음, 90 = 누움)"""
+        dx, dy = (self.centres[0] - self.centres[1]).tolist()
+        return math.degrees(math.atan2(abs(dx), abs(dy) + 1e-9))
+
+    @cached_property
+    def mean_confidence(self):
+        return float(self.pose[KEY_POINTS, VIS].mean())
+
+    @cached_property
+    def bbox(self):
+        """보이는 주요 관절의 외곽 박스 (x1, y1, x2, y2), 보이는 관절이 없으면 None"""
+        visible = KEY_POINTS[self.mask[KEY_POINTS]]
+        if len(visible) == 0:
+            return None
+        xy = self.pose[visible, :2]
+        x1, y1 = xy.min(axis=0).tolist()
+        x2, y2 = xy.max(axis=0).tolist()
+        return x1, y1, x2, y2
+
+    def joint(self, index):
+        """(x, y, z, visibility, 보임 여부)"""
+        x, y, z, visibility = self.rows[index]
+        return x, y, z, visibility, self.visible[index]
+
+
+# 포즈가 없는 프레임에서 읽을 때 쓸 공통 객체
+EMPTY_FRAME = PoseFrame(-1, None, None)
+
+
+class FeatureCache:
+    """프레임 순번(seq)을 키로 최근 PoseFrame 몇 개를 보관
+
+    같은 프레임을 여러 곳(표시, 감지, 기록)에서 요청해도 같은 객체가 돌아온다.
+    """
+
+    def __init__(self, size=8):
+        self.size = size
+        self._frames = OrderedDict()
+
+    def frame(self, seq, t=None, pose=None, min_visibility=0.5):
+        frame = self._frames.get(seq)
+        if frame is None:
+            frame = PoseFrame(seq, t, pose, min_visibility)
+            self._frames[seq] = frame
+            if len(self._frames) > self.size:
+                self._frames.popitem(last=False)
+        return frame
+
+    def get(self, seq):
+        return self._frames.get(seq)
+
+    def latest(self):
+        if not self._frames:
+            return None
+        return next(reversed(self._frames.values()))
+
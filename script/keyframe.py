@@ -0,0 +1,110 @@
+import cv2
+import numpy as np
+
+from script.backends import PoseBackend
+
+# 피라미드 Lucas-Kanade 설정 (축소한 흑백 프레임 기준)
+LK_PARAMS = dict(
+    winSize=(15, 15),
+    maxLevel=2,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+)
+
+
+class KeyframeBackend(PoseBackend):
+    """interval 프레임마다 한 번만 포즈 추론을 하고, 사이 프레임은 광학 흐름으로 관절을 옮기는 백엔드 래퍼
+
+    사이 프레임은 flow_width 너비로 줄인 흑백 영상에서 직전 관절 33개를 피라미드 LK로 추적한다.
+    앞/뒤 방향 추적 오차(forward-backward)가 max_fb_error 픽셀을 넘는 관절은 추적 실패로 보고
+    좌표를 유지한 채 visibility를 낮춘다. 아래 경우(drift)는 순서와 상관없이 바로 추론한다.
+    - 보이던 관절 중 추적에 성공한 비율이 min_tracked 미만 (가림, 급격한 자세 변화)
+    - 관절 이동량 중앙값이 max_motion(프레임 크기 대비)을 넘음 (넘어지는 중일 수 있으므로 추정 대신 추론)
+    사람이 없을 때도 interval마다만 추론하므로 빈 병실 카메라도 비용이 줄어든다.
+    detect_fall은 매 프레임 포즈를 그대로 받는다.
+    """
+
+    def __init__(self, backend, interval=3, flow_width=320, max_fb_error=1.5, min_tracked=0.6,
+                 max_motion=0.04, min_visibility=0.5, lost_visibility=0.5):
+        self.backend = backend
+        self.name = f"{backend.name}+keyframe{interval}"
+        self.input_size = backend.input_size
+        self.interval = interval
+        self.flow_width = flow_width
+        self.max_fb_error = max_fb_error
+        self.min_tracked = min_tracked
+        self.max_motion = max_motion
+        self.min_visibility = min_visibility
+        self.lost_visibility = lost_visibility
+        # 통계: 추론한 프레임, 광학 흐름으로 채운 프레임, drift로 앞당긴 추론
+        self.keyframes = 0
+        self.propagated = 0
+        self.forced = 0
+        self._gray = None
+        self._pose = None
+        self._since = 0
+
+    def _small_gray(self, rgb):
+        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        h, w = gray.shape
+        if w <= self.flow_width:
+            return gray
+        return cv2.resize(gray, (self.flow_width, round(h * self.flow_width / w)), interpolation=cv2.INTER_AREA)
+
+    def _propagate(self, gray):
+        """직전 포즈를 gray로 옮긴 포즈, drift면 None"""
+        h, w = gray.shape
+        prev = self._pose
+        points = np.ascontiguousarray(prev[:, :2] * (w, h), dtype=np.float32).reshape(-1, 1, 2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self._gray, gray, points, None, **LK_PARAMS)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self._gray, moved, None, **LK_PARAMS)
+        fb_error = np.linalg.norm((back - points).reshape(-1, 2), axis=1)
+        ok = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < self.max_fb_error)
+
+        visible = prev[:, 3] >= self.min_visibility
+        if ok[visible].sum() < self.min_tracked * visible.sum():
+            return None
+        moved = moved.reshape(-1, 2) / (w, h)
+        if ok.any() and np.median(np.linalg.norm(moved[ok] - prev[ok, :2], axis=1)) > self.max_motion:
+            return None
+
+        pose = prev.copy()
+        pose[ok, :2] = moved[ok]
+        pose[~ok, 3] *= self.lost_visibility
+        return pose
+
+    def process(self, rgb):
+        gray = self._small_gray(rgb)
+        due = self._gray is None or self._since >= self.interval - 1 or gray.shape != self._gray.shape
+        pose = None
+        if not due:
+            if self._pose is None:
+                # 사람이 없던 키프레임 사이: 다음 키프레임까지 추론 생략
+                self._since += 1
+                self._gray = gray
+                return None
+            pose = self._propagate(gray)
+            if pose is None:
+                self.forced += 1
+        if pose is None:
+            pose = self.backend.process(rgb)
+            self.keyframes += 1
+            self._since = 0
+        else:
+            self.propagated += 1
+            self._since += 1
+        self._gray = gray
+        self._pose = pose
+        # 호출 쪽(필터 등)이 결과를 바꿔도 다음 추적 기준은 그대로 두도록 복사본을 돌려줌
+        return None if pose is None else pose.copy()
+
+    def process_batch(self, images):
+        # 서로 다른 crop 묶음은 프레임 간 연속성이 없으므로 그대로 추론
+        return self.backend.process_batch(images)
+
+    def reset(self):
+        """다음 프레임을 키프레임으로 (장면 전환, 입력 재연결 등)"""
+        self._gray = None
+        self._pose = None
+
+    def close(self):
+        self.backend.close()
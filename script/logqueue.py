@@ -0,0 +1,139 @@
+"""분석 루프용 구조화 로그 (문자열 만들기/시각 변환/파일 쓰기는 백그라운드에서)
+
+    LOG = LogQueue("data/logs/landmarks.jsonl")
+    LOG.log("landmarks", seq, pose[LOG_POINTS])     # 루프 안: monotonic 시각과 값만 큐에 넣음
+    LOG.recent(3, kind="landmarks")                 # 화면: 최근 기록 (표시할 때만 format_record)
+
+기록은 (monotonic 시각, 종류, 값 튜플)로만 큐에 들어가고, 백그라운드 스레드가 flush_interval마다 모아
+JSON 한 줄씩(KST 시각 포함) 파일에 쓰며 max_bytes를 넘으면 path.1 … path.<backups>로 돌려 쓴다.
+큐가 capacity를 넘으면 오래된 기록부터 버리고 dropped에 센다 (디스크가 느려도 분석 루프는 막히지 않음).
+쓰기에 실패한 기록(디스크 가득 참, 권한 등)은 METRICS 사건으로 남기고 failed에 센 뒤 버리며 기록은 계속한다.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from script.metrics import METRICS
+from script.timeutil import format_kst
+
+# mono: time.monotonic() 시각, values: 기록한 값 그대로 (numpy 배열 등, 복사본이어야 함)
+LogRecord = namedtuple("LogRecord", "mono kind values")
+
+
+def _plain(value):
+    """JSON으로 쓸 수 있는 값 (numpy 배열/스칼라는 소수 4자리 목록/숫자)"""
+    if isinstance(value, np.ndarray):
+        return np.round(value.astype(np.float64), 4).tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+class LogQueue:
+    def __init__(self, path=None, capacity=10_000, recent=100, flush_interval=1.0, max_bytes=5_000_000, backups=3):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        # monotonic → epoch 변환 기준 (표시/내보내기 때만 사용)
+        self._offset = time.time() - time.monotonic()
+        # 가득 차면 append가 가장 오래된 기록을 버림 (쓰기 스레드의 popleft와 경쟁하지 않음)
+        self._queue = deque(maxlen=capacity)
+        self._recent = deque(maxlen=recent)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def log(self, kind, *values):
+        """값을 그대로 큐에 넣음 (문자열/시각 변환 없음). 배열은 이후 바뀌지 않는 것을 넘길 것"""
+        record = LogRecord(time.monotonic(), kind, values)
+        # 버린 수는 대략 (그 사이 쓰기 스레드가 꺼내 갔으면 하나 더 셀 수 있음)
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(record)
+        self._recent.append(record)
+        if self._thread is None and self.path:
+            self.start()
+
+    def recent(self, limit=None, kind=None):
+        """최근 기록 (오래된 것부터)"""
+        records = [r for r in list(self._recent) if kind is None or r.kind == kind]
+        return records[-limit:] if limit else records
+
+    def epoch(self, record):
+        return record.mono + self._offset
+
+    def format_time(self, record, fmt="%Y-%m-%d %H:%M:%S"):
+        """기록 시각의 KST 문자열 (표시/내보내기 시점에만)"""
+        return format_kst(self.epoch(record), fmt)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.flush_interval + 2.0)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as exc:
+                METRICS.event("log_write_error", f"{self.path}: {type(exc).__name__}: {exc}")
+
+    def flush(self):
+        """쌓인 기록을 파일에 씀 (백그라운드 스레드, 닫을 때)"""
+        records = []
+        while self._queue:
+            try:
+                records.append(self._queue.popleft())
+            except IndexError:
+                break
+        if not records or not self.path:
+            return
+        lines = []
+        for record in records:
+            epoch = self.epoch(record)
+            lines.append(json.dumps({
+                "time": format_kst(epoch, "%Y-%m-%dT%H:%M:%S") + f".{int(epoch % 1 * 1000):03d}+09:00",
+                "mono": round(record.mono, 4),
+                "kind": record.kind,
+                "values": _plain(record.values),
+            }, ensure_ascii=False))
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as exc:
+            self.failed += len(lines)
+            METRICS.event("log_write_error", f"{self.path}: 기록 {len(lines)}건 실패: {type(exc).__name__}: {exc}")
+            return
+        self.written += len(lines)
+
+    def _rotate(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < self.max_bytes:
+            return
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
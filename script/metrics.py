@@ -0,0 +1,76 @@
+"""파이프라인 상태 지표 (카운터, 게이지, 최근 사건)
+
+    METRICS.inc("fallwatch_worker_restarts_total", camera="0")
+    METRICS.set("fallwatch_queue_depth", 2, camera="0")
+    METRICS.event("restart", "분석 멈춤 12.0초 → 작업 스레드 재시작", camera="0")
+
+prometheus()는 Prometheus 텍스트 형식(대시보드 /metrics), events()는 최근 사건 목록을 돌려준다.
+"""
+import threading
+import time
+from collections import deque, namedtuple
+
+# 사건 기록: ts(epoch 초), kind, message, labels(dict)
+MetricEvent = namedtuple("MetricEvent", "ts kind message labels")
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    """Prometheus 라벨 값 이스케이프 (역슬래시, 큰따옴표, 줄바꿈)"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self, event_limit=500):
+        self._counters = {}
+        self._gauges = {}
+        self._events = deque(maxlen=event_limit)
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def event(self, kind, message, **labels):
+        """사건을 기록하고 fallwatch_events_total{kind=...}를 올림"""
+        self._events.append(MetricEvent(time.time(), kind, message, labels))
+        self.inc("fallwatch_events_total", kind=kind, **labels)
+
+    def counter(self, name, **labels):
+        return self._counters.get(_key(name, labels), 0)
+
+    def gauge(self, name, **labels):
+        return self._gauges.get(_key(name, labels))
+
+    def events(self, limit=None, **labels):
+        """최근 사건 (오래된 것부터), labels를 주면 그 값이 같은 것만"""
+        events = [e for e in list(self._events) if all(e.labels.get(k) == v for k, v in labels.items())]
+        return events[-limit:] if limit else events
+
+    def prometheus(self):
+        lines = []
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        for kind, values in (("counter", counters), ("gauge", gauges)):
+            seen = set()
+            for (name, labels), value in sorted(values.items(), key=lambda item: item[0]):
+                if name not in seen:
+                    lines.append(f"# TYPE {name} {kind}")
+                    seen.add(name)
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {value:g}" if label_text else f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전체에서 쓰는 기본 지표
+METRICS = Metrics()
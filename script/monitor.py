@@ -0,0 +1,413 @@
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+import cv2
+
+from script.backends import backend_for_camera
+from script.broadcast import Broadcast, Feed, SharedPreview
+from script.config import ConfigWatcher
+from script.detector import detect_fall
+from script.eventstore import STATUS_WARNING, Event, status_code
+from script.features import EMPTY_FRAME, FeatureCache, POSE_NONE
+from script.metrics import METRICS
+from script.multiperson import MultiPersonPose
+from script.profiler import PROFILER
+from script.quality import QUALITY_LEVELS, apply_quality
+from script.smoothing import OneEuroFilter
+from script.watchdog import Watchdog
+from script.sources import (
+    SOURCE_STATE_LABELS, SOURCE_CONNECTING, SOURCE_ENDED, SOURCE_STREAMING, VideoSource, capture_size_for,
+)
+
+# 한 프레임 분석 결과
+#   image: 분석한 RGB 프레임 (그리지 않음, 골격은 미리보기에서 그림), frame: PoseFrame (다인원 모드는 가장 크게 보이는 사람)
+#   tracks: 다인원 모드의 Track 목록 (단일 모드는 빈 튜플)
+MonitorUpdate = namedtuple(
+    "MonitorUpdate", "camera seq t image frame status is_fall fall_count features tracks"
+)
+
+
+class CameraMonitor:
+    """카메라 하나를 백그라운드 스레드에서 읽고 분석해 구독자에게 결과를 전달
+
+    Streamlit 재실행과 무관하게 카메라/모델/필터 상태가 유지된다. 구독 콜백은 분석 스레드에서
+    호출되므로 오래 걸리는 일(인코딩, 네트워크 전송)은 콜백 안에서 다른 스레드로 넘길 것.
+    화면 세션은 viewer()로 updates 채널을 구독하고 preview(공유 JPEG)를 읽는다.
+    첫 시청자가 카메라를 켜고, 마지막 시청자가 떠나면 linger초 뒤에 끈다 (재실행 사이에는 유지).
+    상태가 바뀌면 store(EventStore)에 기록한다.
+    프레임 처리 단계(capture, convert, inference, detection, publish)는 profiler 구간으로 잰다
+    (골격 그리기/인코딩은 preview에서 시청자가 있을 때만, draw/encode 구간).
+    """
+
+    def __init__(self, camera_id="0", source=None, config_watcher=None, store=None, frame_interval=0.03,
+                 history_limit=10, linger=5.0, profiler=PROFILER, metrics=METRICS, watchdog=True,
+                 **source_options):
+        self.camera_id = str(camera_id)
+        # None이면 카메라 설정의 source를 쓰고, 설정이 바뀌면 다시 연결
+        self.source = source
+        self.source_options = source_options
+        self.video = None
+        self.config_watcher = config_watcher or ConfigWatcher()
+        self.store = store
+        self.frame_interval = frame_interval
+        self.profiler = profiler
+        self.fall_count = 0
+        self.latest = None
+        # 화면용 최근 상태 기록 (Event, 오래된 것부터). 다른 스레드에서 읽으므로 바뀔 때마다 튜플로 교체
+        self._history = deque(maxlen=history_limit)
+        self.history = ()
+        # 최신 분석 결과 채널과 공유 미리보기 (시청자 수와 무관하게 분석/인코딩은 한 번)
+        self.updates = Broadcast()
+        self.preview = SharedPreview(profiler=profiler)
+        self.linger = linger
+        self._viewers = 0
+        self._idle_timer = None
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._seq = 0
+        self._backend = None
+        self._backend_key = None
+        self._multi_person = None
+        self._filter = OneEuroFilter()
+        self._features = FeatureCache()
+        self._last_status = None
+        self._was_fall = False
+        self._person_status = {}
+        self._person_falls = {}
+        # 감시용 상태: 진행 중인 단계 (이름, 시작 monotonic), 단계별 마지막 완료 시각, 재시작 횟수
+        self.current_stage = None
+        self.heartbeats = {}
+        self.restarts = 0
+        self.error = None
+        self.metrics = metrics
+        self._generation = 0
+        self._abandoned = {}
+        self._reopen = None
+        self.watchdog = Watchdog(self) if watchdog else None
+        # 분석 품질 단계 (QualityController가 바꿈, 0 = 설정 그대로)와 프레임당 처리 시간 (초, 지수 평균)
+        self.quality_level = 0
+        self.latency = 0.0
+
+    def subscribe(self, callback):
+        """callback(MonitorUpdate) 등록, 해제 함수를 반환"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._spawn()
+        if self.watchdog is not None:
+            self.watchdog.start()
+
+    def _spawn(self, resumed=False):
+        # _lock 안에서 호출. 세대 번호가 바뀌면 이전 스레드는 (멈춰 있다가 돌아와도) 스스로 끝난다
+        self._generation += 1
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(self._generation, resumed),
+                                        name=f"monitor-{self.camera_id}", daemon=True)
+        self._thread.start()
+
+    def _abandon(self):
+        """_lock 안에서 호출. 현재 스레드의 백엔드/입력을 떼어 내 그 스레드가 끝날 때 닫게 함"""
+        self._abandoned[self._generation] = self._backend
+        video = self.video
+        self._backend, self._backend_key, self._multi_person = None, None, None
+        self.video = None
+        self.current_stage = None
+        self._filter.reset()
+        return video
+
+    def restart_worker(self, reason):
+        """멈추거나 죽은 분석 스레드를 버리고 새 스레드로 다시 시작 (Watchdog가 호출)
+
+        파이썬 스레드는 강제로 끝낼 수 없으므로, 멈춘 호출에서 돌아온 이전 스레드는 세대 번호를 보고
+        결과를 버린 뒤 자기 백엔드를 닫고 끝난다.
+        """
+        with self._lock:
+            if self._stop.is_set():
+                return
+            video = self._abandon()
+            self._spawn(resumed=True)
+        if video is not None:
+            video.close(timeout=0.5)
+        self.restarts += 1
+        self.metrics.inc("fallwatch_worker_restarts_total", camera=self.camera_id)
+        self.metrics.event("worker_restart", reason, camera=self.camera_id)
+        self._record(f"감시: {reason} → 분석 다시 시작", status=STATUS_WARNING)
+
+    def reopen_source(self, reason):
+        """입력 읽기 스레드가 멈췄을 때 분석 스레드가 다음 루프에서 입력을 새로 열게 함 (Watchdog가 호출)"""
+        self._reopen = reason
+
+    def camera_config(self, config=None):
+        """현재 품질 단계를 적용한 이 카메라의 CameraConfig"""
+        config = config or self.config_watcher.current
+        return apply_quality(config.camera(self.camera_id), self.quality_level, config.quality.min_fps)
+
+    def set_quality(self, level, reason):
+        """품질 단계를 바꿈 (다음 프레임부터 FPS/해상도는 입력을 다시 열지 않고, 모델은 새로 읽어 적용)"""
+        if level == self.quality_level:
+            return
+        self.quality_level = level
+        self.metrics.set("fallwatch_quality_level", level, camera=self.camera_id)
+        self.metrics.event("quality", f"{reason} → {level}단계 ({QUALITY_LEVELS[level].label})", camera=self.camera_id)
+
+    @property
+    def behind(self):
+        """처리 시간이 프레임 간격보다 길어 입력을 따라가지 못하는지"""
+        fps = self.camera_config().capture_fps
+        return bool(fps) and self.latency > 1.0 / fps
+
+    @contextmanager
+    def viewer(self):
+        """시청자 등록 (with 블록 동안). 카메라가 꺼져 있으면 켜고 Feed를 돌려준다."""
+        with self._lock:
+            self._viewers += 1
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+        self.start()
+        try:
+            yield Feed(self.updates)
+        finally:
+            with self._lock:
+                self._viewers -= 1
+                if self._viewers == 0:
+                    self._idle_timer = threading.Timer(self.linger, self._stop_if_idle)
+                    self._idle_timer.daemon = True
+                    self._idle_timer.start()
+
+    @property
+    def source_state(self):
+        return self.video.state if self.video is not None else SOURCE_CONNECTING
+
+    @property
+    def viewers(self):
+        return self._viewers
+
+    def _stop_if_idle(self):
+        with self._lock:
+            if self._viewers:
+                return
+            self._idle_timer = None
+        self.stop()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            with self._lock:
+                if self._thread is not None and self._thread.is_alive():
+                    # 멈춘 호출에서 못 돌아옴: 다음 start()가 같은 백엔드를 쓰지 않게 떼어 냄
+                    video = self._abandon()
+                    if video is not None:
+                        video.close(timeout=0.5)
+                self._thread = None
+
+    def _record(self, message, confidence=None, features=None, status=None):
+        ts = time.time()
+        if status is None:
+            status = status_code(message)
+        self._history.append(Event(None, self.camera_id, ts, status, message, confidence, features))
+        self.history = tuple(self._history)
+        if self.store is not None:
+            self.store.record(self.camera_id, message, confidence=confidence, features=features, ts=ts, status=status)
+
+    def seed_history(self, events):
+        """저장소에서 읽은 이전 기록(오래된 것부터)으로 화면용 기록을 채움"""
+        self._history = deque([*events, *self._history], maxlen=self._history.maxlen)
+        self.history = tuple(self._history)
+
+    def _ensure_backend(self, camera):
+        key = (camera.backend, camera.model_path, camera.threads, camera.multi_person, camera.keyframe_interval)
+        if key != self._backend_key:
+            if self._backend is not None:
+                self._backend.close()
+            with self._stage("load"):
+                self._backend = backend_for_camera(camera, static_image_mode=camera.multi_person)
+            self._backend_key = key
+            self._multi_person = MultiPersonPose(pose_model=self._backend) if camera.multi_person else None
+
+    @contextmanager
+    def _stage(self, name):
+        """처리 단계 하나: profiler 구간 + Watchdog용 진행 중 단계/완료 시각 (현재 세대 스레드만 기록)"""
+        current = threading.current_thread() is self._thread
+        if current:
+            self.current_stage = (name, time.monotonic())
+        with self.profiler.stage(name):
+            yield
+        if current:
+            self.heartbeats[name] = time.monotonic()
+            self.current_stage = None
+
+    def process(self, image, t, generation=None):
+        """RGB 프레임 하나를 분석하고 (image는 바꾸지 않음) MonitorUpdate를 구독자에게 전달
+
+        generation을 주면 추론이 끝났을 때 그 사이 재시작된 경우(이전 세대) 결과를 버리고 None을 반환한다.
+        """
+        config = self.config_watcher.current
+        profile = config.profile_for(self.camera_id)
+        camera = self.camera_config(config)
+        self._ensure_backend(camera)
+        # 이 프레임을 발행하기 전에 맞춰 두므로 skeleton_only로 바뀐 뒤의 미리보기에는 영상이 들어가지 않음
+        self.preview.skeleton_only = camera.skeleton_only
+        started = time.perf_counter()
+        self._seq += 1
+        stage = self._stage
+
+        if self._multi_person is not None:
+            with stage("inference"):
+                tracks = tuple(self._multi_person.process(image, t, profile))
+            if generation is not None and generation != self._generation:
+                return None
+            for track in tracks:
+                if track.is_fall and track.fall_count > self._person_falls.get(track.id, 0):
+                    self.fall_count += 1
+                self._person_falls[track.id] = track.fall_count
+                if track.status != self._person_status.get(track.id):
+                    self._record(
+                        f"{track.id}번: {track.status}",
+                        confidence=track.features["confidence"] if track.features else None,
+                        features=dict(track.features or {}, person=track.id),
+                        status=status_code(track.status),
+                    )
+                    self._person_status[track.id] = track.status
+            primary = max(tracks, key=lambda tr: (tr.box[2] - tr.box[0]) * (tr.box[3] - tr.box[1]), default=None)
+            frame = primary.frame if primary else EMPTY_FRAME
+            status = primary.status if primary else "정상: 모니터링 중"
+            is_fall = any(track.is_fall for track in tracks)
+            features = primary.features if primary else None
+        else:
+            tracks = ()
+            with stage("inference"):
+                pose = self._backend.process(image)
+            if generation is not None and generation != self._generation:
+                return None
+            with stage("detection"):
+                if pose is not None:
+                    pose = self._filter(pose, t).copy()
+                frame = self._features.frame(self._seq, t, pose, profile.min_visibility)
+                if frame.state == POSE_NONE:
+                    self._filter.reset()
+                status, is_fall, features = detect_fall(frame, profile)
+            if is_fall and not self._was_fall:
+                self.fall_count += 1
+            self._was_fall = is_fall
+            if status != self._last_status:
+                self._record(status, confidence=features["confidence"] if features else None, features=features)
+                self._last_status = status
+
+        elapsed = time.perf_counter() - started
+        self.latency = elapsed if not self.latency else 0.8 * self.latency + 0.2 * elapsed
+
+        update = MonitorUpdate(self.camera_id, self._seq, t, image, frame, status, is_fall,
+                               self.fall_count, features, tracks)
+        self.latest = update
+        # 화면 전달 (시청 세션 깨우기 + 대시보드 등 구독 콜백)
+        with stage("publish"):
+            self.updates.publish(update)
+            with self._lock:
+                subscribers = list(self._subscribers)
+            for callback in subscribers:
+                callback(update)
+        return update
+
+    def _capture_key(self):
+        """(입력, 캡처 크기, FPS, 버퍼 정책, 버퍼 크기): 캡처 크기는 포즈 모델 입력에 맞춤 (다인원은 crop용으로 더 크게)
+
+        품질 단계가 낮으면 FPS와 캡처 해상도도 그만큼 낮춘다.
+        """
+        camera = self.camera_config()
+        self._ensure_backend(camera)
+        source = self.source if self.source is not None else camera.source
+        if camera.capture_width:
+            size = (camera.capture_width, camera.capture_height)
+        else:
+            scale = (4.0 if camera.multi_person else 2.0) * QUALITY_LEVELS[self.quality_level].size_scale
+            size = capture_size_for(self._backend.input_size, scale=scale)
+        return source, size, camera.capture_fps, camera.drop_policy, camera.queue_size
+
+    def _open(self, key):
+        source, size, fps, drop_policy, queue_size = key
+        options = {"buffer_frames": queue_size, "drop_policy": drop_policy, **self.source_options}
+        return VideoSource(source, size=size, fps=fps, **options).start()
+
+    def _run(self, generation, resumed=False):
+        video = None
+        try:
+            key = self._capture_key()
+            video = self.video = self._open(key)
+            if not resumed:
+                self._record("카메라 활성화")
+            last_state = video.state
+            while generation == self._generation and not self._stop.is_set():
+                # 설정에서 입력 주소/백엔드/캡처 설정이 바뀌었거나 Watchdog가 요청하면 새로 연결
+                new_key = self._capture_key()
+                reopen, self._reopen = self._reopen, None
+                if new_key != key and not reopen and (new_key[0], *new_key[3:]) == (key[0], *key[3:]):
+                    # 캡처 크기/FPS만 바뀜 (품질 조절): 연결은 유지한 채 적용
+                    video.retarget(new_key[1], new_key[2])
+                    key = new_key
+                if new_key != key or reopen:
+                    if reopen:
+                        self.metrics.inc("fallwatch_source_reopens_total", camera=self.camera_id)
+                        self.metrics.event("source_reopen", reopen, camera=self.camera_id)
+                        self._record(f"감시: {reopen} → 입력 다시 열기", status=STATUS_WARNING)
+                    video.close(timeout=0.5)
+                    key = new_key
+                    video = self.video = self._open(key)
+                with self._stage("capture"):
+                    frame, t = video.read(timeout=0.5)
+                state = video.state
+                if state != last_state:
+                    # 끊김/멈춤/복구는 상태 기록에 남김 (읽기 실패로 루프를 끝내지 않음)
+                    self.metrics.event("source_state", SOURCE_STATE_LABELS[state], camera=self.camera_id)
+                    if state != SOURCE_STREAMING or last_state != SOURCE_CONNECTING:
+                        self._record(f"카메라 입력: {SOURCE_STATE_LABELS[state]}")
+                    last_state = state
+                if frame is None:
+                    if state == SOURCE_ENDED:
+                        break
+                    continue
+                with self._stage("convert"):
+                    image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                self.process(image, t, generation)
+                self._stop.wait(self.frame_interval)
+        except Exception as exc:
+            # 스레드는 끝내고 Watchdog가 error를 보고 다시 시작
+            if generation == self._generation:
+                self.error = f"{type(exc).__name__}: {exc}"
+                self.metrics.event("worker_error", self.error, camera=self.camera_id)
+        finally:
+            with self._lock:
+                stale = generation != self._generation
+                if stale:
+                    backend = self._abandoned.pop(generation, None)
+                else:
+                    backend = self._backend
+                    self._backend, self._backend_key, self._multi_person = None, None, None
+                    self.current_stage = None
+            if backend is not None:
+                backend.close()
+            if not stale:
+                if video is not None:
+                    video.close()
+                if self.error is None:
+                    self._record("카메라 비활성화")
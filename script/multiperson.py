@@ -0,0 +1,244 @@
+import itertools
+from collections import deque
+
+import cv2
+import numpy as np
+
+from script.backends import create_backend
+from script.detector import detect_fall, DEFAULT_PROFILE
+from script.features import EMPTY_FRAME, PoseFrame, POSE_NONE
+from script.smoothing import OneEuroFilter
+
+
+class HogPersonDetector:
+    """OpenCV HOG 보행자 검출기로 사람 영역(x1, y1, x2, y2 픽셀)을 찾는다
+
+    추가 모델 파일 없이 동작하며, scale 배율로 줄인 영상에서 검출해 비용을 낮춘다.
+    서 있는 사람만 찾으므로 누운/넘어진 사람은 MultiPersonPose가 트랙의 마지막 포즈로 만든 박스로 보완한다.
+    """
+
+    def __init__(self, scale=0.5, min_score=0.3, nms_threshold=0.4):
+        self.scale = scale
+        self.min_score = min_score
+        self.nms_threshold = nms_threshold
+        self._hog = cv2.HOGDescriptor()
+        self._hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+
+    def __call__(self, image):
+        small = cv2.resize(image, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        rects, scores = self._hog.detectMultiScale(small, winStride=(8, 8), padding=(8, 8), scale=1.05)
+        if len(rects) == 0:
+            return np.empty((0, 4), dtype=np.float32)
+        scores = np.asarray(scores, dtype=np.float32).ravel()
+        keep = cv2.dnn.NMSBoxes(rects.tolist(), scores.tolist(), self.min_score, self.nms_threshold)
+        rects = rects[np.asarray(keep, dtype=np.int64).ravel()].astype(np.float32) / self.scale
+        rects[:, 2:] += rects[:, :2]
+        return rects
+
+
+def expand_boxes(boxes, width, height, pad=0.15):
+    """포즈 모델이 팔다리 끝까지 보도록 박스를 pad 비율만큼 넓히고 화면 안으로 자른다"""
+    boxes = boxes.copy()
+    size = boxes[:, 2:] - boxes[:, :2]
+    boxes[:, :2] -= size * pad
+    boxes[:, 2:] += size * pad
+    np.clip(boxes[:, 0::2], 0, width, out=boxes[:, 0::2])
+    np.clip(boxes[:, 1::2], 0, height, out=boxes[:, 1::2])
+    return boxes.astype(np.int32)
+
+
+def crops_to_frame(poses, boxes, width, height):
+    """crop 기준 정규화 좌표 (N, 33, 4)를 전체 프레임 기준 정규화 좌표로 한 번에 변환"""
+    scale = (boxes[:, 2:] - boxes[:, :2]).astype(np.float32)
+    offset = boxes[:, :2].astype(np.float32)
+    frame_size = np.array([width, height], dtype=np.float32)
+    poses[:, :, :2] *= scale[:, None, :]
+    poses[:, :, :2] += offset[:, None, :]
+    poses[:, :, :2] /= frame_size
+    # z는 crop 폭 기준 값이므로 프레임 폭 기준으로 맞춤
+    poses[:, :, 2] *= scale[:, None, 0] / width
+    return poses
+
+
+def pose_box(pose, width, height, min_visibility=0.5, min_aspect=0.5):
+    """보이는 관절을 감싸는 박스 (x1, y1, x2, y2 픽셀), 보이는 관절이 2개 미만이면 None
+
+    누운 사람은 관절이 거의 한 줄이므로 짧은 변을 긴 변의 min_aspect배 이상으로 넓힌다 (가운데 기준).
+    """
+    visible = pose[pose[:, 3] >= min_visibility, :2]
+    if len(visible) < 2:
+        return None
+    low = visible.min(axis=0) * (width, height)
+    high = visible.max(axis=0) * (width, height)
+    center, size = (low + high) / 2, high - low
+    size = np.maximum(size, size.max() * min_aspect)
+    return np.concatenate([center - size / 2, center + size / 2]).astype(np.float32)
+
+
+def iou_matrix(a, b):
+    """(N, 4), (M, 4) 박스 간 IoU (N, M)"""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    a = a.astype(np.float32)
+    b = b.astype(np.float32)
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-6)
+
+
+class Track:
+    """한 사람의 박스, 포즈 이력, 낙상 상태"""
+
+    def __init__(self, track_id, box, history):
+        self.id = track_id
+        self.box = box
+        self.poses = deque(maxlen=history)
+        # 이번 프레임의 포즈와 파생값 (PoseFrame)
+        self.frame = EMPTY_FRAME
+        self.status = None
+        self.features = None
+        self.is_fall = False
+        # 마지막으로 포즈가 보였을 때 누워 있었는지 (낙상 또는 누운 자세, 이 동안은 놓쳐도 트랙을 지우지 않음)
+        self.down = False
+        self.fall_count = 0
+        self.missed = 0
+        self.filter = OneEuroFilter()
+
+
+class PersonTracker:
+    """IoU 기반 탐욕적 매칭으로 프레임 간 사람 ID를 유지하고, 사람별로 평활화/낙상 판단을 한다
+
+    max_missed 프레임 동안 매칭되지 않은 트랙은 지우되, 누워 있던(down) 트랙은 알람이 끊기지 않도록
+    max_down_missed 프레임까지 남겨 두고 결과에도 포함한다. 트랙 후보 crop에서 포즈가 더 이상 안 나오면
+    (일어나 자리를 떴거나 옮겨짐) down을 풀어 보통 트랙처럼 max_missed 뒤에 지운다.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=15, history=90, max_down_missed=300):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.max_down_missed = max_down_missed
+        self.history = history
+        self.tracks = []
+        self._ids = itertools.count(1)
+        self._seq = 0
+
+    def _match(self, boxes):
+        iou = iou_matrix(np.array([t.box for t in self.tracks]).reshape(-1, 4), boxes)
+        pairs = []
+        if iou.size:
+            order = np.argsort(iou, axis=None)[::-1]
+            used_t, used_d = set(), set()
+            for flat in order:
+                ti, di = divmod(int(flat), iou.shape[1])
+                if iou[ti, di] < self.iou_threshold:
+                    break
+                if ti in used_t or di in used_d:
+                    continue
+                used_t.add(ti)
+                used_d.add(di)
+                pairs.append((ti, di))
+        return pairs
+
+    def update(self, boxes, poses, found, t, profile=DEFAULT_PROFILE, owners=None):
+        """이번 프레임의 박스 (N, 4), 포즈 (N, 33, 4), 포즈 검출 여부 (N,)로 트랙을 갱신
+
+        owners: 박스별 후보를 낸 트랙 ID (검출기 박스는 -1). 트랙 후보 박스는 IoU 매칭 없이 그 트랙에 붙이고
+        새 트랙을 만들지 않는다. 포즈가 나오지 않은 후보는 붙이지 않고 그 트랙의 down을 푼다.
+        """
+        self._seq += 1
+        owners = np.full(len(boxes), -1) if owners is None else np.asarray(owners)
+        detections = np.flatnonzero(owners < 0)
+        pairs = [(ti, int(detections[di])) for ti, di in self._match(boxes[detections])]
+        matched_t = {ti for ti, _ in pairs}
+        matched_d = {di for _, di in pairs}
+        index = {track.id: i for i, track in enumerate(self.tracks)}
+        for di in np.flatnonzero(owners >= 0).tolist():
+            ti = index.get(int(owners[di]))
+            if ti is None or ti in matched_t:
+                continue
+            if not found[di]:
+                self.tracks[ti].down = False
+                continue
+            pairs.append((ti, di))
+            matched_t.add(ti)
+
+        for i, track in enumerate(self.tracks):
+            if i not in matched_t:
+                track.missed += 1
+        for di in detections.tolist():
+            if di not in matched_d:
+                self.tracks.append(Track(next(self._ids), boxes[di], self.history))
+                pairs.append((len(self.tracks) - 1, di))
+
+        for ti, di in pairs:
+            track = self.tracks[ti]
+            track.box = boxes[di]
+            track.missed = 0
+            pose = track.filter(poses[di], t).copy() if found[di] else None
+            track.frame = PoseFrame(self._seq, t, pose, profile.min_visibility)
+            if track.frame.state == POSE_NONE:
+                track.filter.reset()
+            else:
+                track.poses.append((t, pose))
+            status, is_fall, features = detect_fall(track.frame, profile)
+            if is_fall and not track.is_fall:
+                track.fall_count += 1
+            if features is not None:
+                # detect_fall은 누운 자세일 때만 knee_shoulder_diff를 계산함
+                track.down = is_fall or "knee_shoulder_diff" in features
+            track.status, track.is_fall, track.features = status, is_fall, features
+
+        self.tracks = [t for t in self.tracks
+                       if t.missed <= self.max_missed or (t.down and t.missed <= self.max_down_missed)]
+        return [t for t in self.tracks if t.missed == 0 or t.down]
+
+    def proposals(self, width, height, min_visibility=0.5):
+        """검출기가 놓치는 누운 사람을 계속 추적하기 위한 트랙별 후보
+
+        (마지막 포즈를 감싸는 박스 (M, 4), 트랙 ID (M,), 트랙의 직전 박스 (M, 4))
+        """
+        boxes, owners, previous = [], [], []
+        for track in self.tracks:
+            box = pose_box(track.poses[-1][1], width, height, min_visibility) if track.poses else None
+            if box is not None:
+                boxes.append(box)
+                owners.append(track.id)
+                previous.append(track.box)
+        return (np.array(boxes, dtype=np.float32).reshape(-1, 4), np.array(owners, dtype=np.int64),
+                np.array(previous, dtype=np.float32).reshape(-1, 4))
+
+
+class MultiPersonPose:
+    """사람 검출 → crop별 포즈 추정(묶음) → ID 추적을 한 번에 수행
+
+    pose_model은 PoseBackend이며 crop들을 process_batch()로 한 번에 넘긴다.
+    MediaPipe는 crop이 매번 다른 사람이므로 static_image_mode=True로 만든다.
+    사람 후보는 검출기 박스에 더해, 이번 검출과 이어지지 않은 트랙의 마지막 포즈 박스(누운 사람 등)를 쓴다.
+    """
+
+    def __init__(self, detector=None, pose_model=None, tracker=None, pad=0.15):
+        self.detector = detector or HogPersonDetector()
+        self.pose_model = pose_model or create_backend("mediapipe-full", static_image_mode=True)
+        self.tracker = tracker or PersonTracker()
+        self.pad = pad
+
+    def process(self, rgb, t, profile=DEFAULT_PROFILE):
+        height, width = rgb.shape[:2]
+        detected = expand_boxes(self.detector(rgb).reshape(-1, 4), width, height, self.pad)
+        proposals, owners, previous = self.tracker.proposals(width, height, profile.min_visibility)
+        # 이번 검출 박스와 이어지는 트랙은 후보가 필요 없음
+        missing = iou_matrix(previous, detected).max(axis=1, initial=0.0) < self.tracker.iou_threshold
+        proposals = expand_boxes(proposals[missing], width, height, self.pad)
+        boxes = np.concatenate([detected, proposals])
+        owners = np.concatenate([np.full(len(detected), -1), owners[missing]])
+        valid = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+        boxes, owners = boxes[valid], owners[valid]
+        crops = [rgb[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes]
+        poses, found = self.pose_model.process_batch(crops)
+        # 트랙 후보는 검출 근거가 없으므로 포즈가 나온 경우만 그 사람으로 인정 (아니면 tracker가 down을 풂)
+        if len(boxes):
+            crops_to_frame(poses, boxes, width, height)
+        return self.tracker.update(boxes, poses, found, t, profile, owners)
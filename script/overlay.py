@@ -0,0 +1,79 @@
+import cv2
+import numpy as np
+
+from script.pose import POSE_CONNECTIONS
+
+# 골격 연결선 양 끝 관절 인덱스 (한 번만 만들어 둠)
+_LINE_A, _LINE_B = (np.array(column, dtype=np.intp) for column in zip(*POSE_CONNECTIONS))
+
+# 색은 RGB (미리보기 버퍼가 RGB)
+SKELETON_COLOR = (0, 255, 0)
+JOINT_COLOR = (255, 255, 255)
+FALL_COLOR = (239, 68, 68)
+TRACK_COLOR = (16, 185, 129)
+# 골격만 표시할 때(skeleton_only) 영상 대신 채우는 배경
+BLANK_COLOR = (31, 41, 55)
+
+
+def draw_skeleton(image, frame, color=SKELETON_COLOR, joint_color=JOINT_COLOR, thickness=2, radius=3):
+    """PoseFrame의 보이는 관절/연결선을 image에 그린다
+
+    연결선은 (선 수, 2, 2) 좌표 배열 하나로 polylines 한 번, 관절점은 길이 0인 선(둥근 끝)으로
+    polylines 한 번에 그린다. 보임 여부는 감지와 같은 frame.mask를 쓴다.
+    """
+    if frame.pose is None:
+        return image
+    height, width = image.shape[:2]
+    points = (frame.pose[:, :2] * (width, height)).astype(np.int32)
+    mask = frame.mask
+    keep = mask[_LINE_A] & mask[_LINE_B]
+    if keep.any():
+        lines = np.stack([points[_LINE_A[keep]], points[_LINE_B[keep]]], axis=1)
+        cv2.polylines(image, lines, False, color, thickness, cv2.LINE_AA)
+    if mask.any():
+        joints = points[mask]
+        cv2.polylines(image, np.stack([joints, joints], axis=1), False, joint_color, radius * 2)
+    return image
+
+
+def draw_tracks(image, tracks, scale=1.0):
+    """사람별 박스, ID, 골격을 표시 (scale: 분석 프레임 → image 배율)"""
+    for track in tracks:
+        x1, y1, x2, y2 = (int(v * scale) for v in track.box)
+        color = FALL_COLOR if track.is_fall else TRACK_COLOR
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(image, f"#{track.id}", (x1 + 4, y1 + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        draw_skeleton(image, track.frame, color=color)
+    return image
+
+
+class PreviewRenderer:
+    """분석 프레임을 줄인 미리보기 버퍼에 복사하고 그 위에만 골격을 그림
+
+    분석 프레임은 읽기만 하므로 감지/기록 쪽과 공유해도 안전하다. 버퍼는 크기가 바뀔 때만 새로
+    할당하며 다음 render()에서 덮어쓰므로, 결과는 바로 인코딩/표시할 것 (보관하려면 복사).
+    skeleton_only면 영상은 복사하지 않고 같은 크기의 빈 배경에 골격만 그린다.
+    """
+
+    def __init__(self, width=640):
+        self.width = width
+        self._buffer = None
+
+    def render(self, image, frame=None, tracks=(), skeleton_only=False):
+        h, w = image.shape[:2]
+        scale = min(1.0, self.width / w)
+        shape = (round(h * scale), round(w * scale)) + image.shape[2:]
+        if self._buffer is None or self._buffer.shape != shape:
+            self._buffer = np.empty(shape, dtype=image.dtype)
+        if skeleton_only:
+            self._buffer[:] = BLANK_COLOR
+        elif scale < 1.0:
+            # 비정수 배율의 INTER_AREA는 느리고 미리보기에는 선형 보간으로 충분
+            cv2.resize(image, (shape[1], shape[0]), dst=self._buffer, interpolation=cv2.INTER_LINEAR)
+        else:
+            np.copyto(self._buffer, image)
+        if tracks:
+            draw_tracks(self._buffer, tracks, scale)
+        elif frame is not None:
+            draw_skeleton(self._buffer, frame)
+        return self._buffer
@@ -0,0 +1,45 @@
+import numpy as np
+
+# MediaPipe Pose 랜드마크 인덱스 (mp.solutions.pose.PoseLandmark 값과 동일)
+NUM_LANDMARKS = 33
+
+NOSE = 0
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_KNEE = 25
+RIGHT_KNEE = 26
+LEFT_ANKLE = 27
+RIGHT_ANKLE = 28
+
+# 배열 열 인덱스: (x, y, z, visibility)
+X, Y, Z, VIS = 0, 1, 2, 3
+
+
+def to_array(landmarks, out=None):
+    """MediaPipe 랜드마크(NormalizedLandmarkList 또는 landmark 시퀀스)를 (33, 4) float32 배열로 변환"""
+    if landmarks is None:
+        return None
+    points = getattr(landmarks, "landmark", landmarks)
+    if len(points) == 0:
+        return None
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+    for i, p in enumerate(points):
+        out[i, 0] = p.x
+        out[i, 1] = p.y
+        out[i, 2] = p.z
+        out[i, 3] = p.visibility
+    return out
+
+
+# 골격 연결선 (mp.solutions.pose.POSE_CONNECTIONS와 동일)
+POSE_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20),
+    (11, 23), (12, 24), (23, 24),
+    (23, 25), (24, 26), (25, 27), (26, 28), (27, 29), (28, 30), (29, 31), (30, 32), (27, 31), (28, 32),
+)
+
@@ -0,0 +1,177 @@
+"""포즈 스트림 바이너리 형식 (int16 양자화 + 이전 프레임과의 차이)
+
+    encoder = PoseEncoder("101")
+    data = encoder.encode(seqs, timestamps, poses)     # poses: (T, 33, 4) 배열 또는 포즈/None 목록
+    packet = PoseDecoder().decode(data)                # PosePacket 또는 키프레임을 기다리는 중이면 None
+
+메시지 하나에 프레임 여러 개(또는 하나)를 담는다.
+    헤더    magic "FWP1", flags(키프레임), 프레임 수, 첫 seq, 기준 seq, 첫 시각(float64), 카메라 id(길이 + UTF-8)
+    프레임별 종류(uint8: 없음/int8/int16), seq 오프셋(uint16), 시각 오프셋(float32)
+    본문    int8 차이 프레임들, int16 차이 프레임들 (각 33×4, 리틀 엔디언)
+좌표는 SCALES 배율로 int16에 양자화하고, 직전에 보낸 포즈(키프레임이면 0)와의 차이를 2^16 나머지로 보낸다
+(복원 시 누적합이 정확히 같은 값이 되므로 손실은 양자화 오차뿐). 30fps에서 대부분 프레임의 차이가 int8에 들어가
+JSON(소수 4자리) 대비 크기가 약 1/10이 된다. 인코더/디코더는 카메라별 직전 포즈를 기억하므로 메시지가 빠지면
+디코더는 기준 seq가 맞지 않는 메시지를 버리고 다음 키프레임(keyframe_interval 메시지마다)부터 다시 복원한다.
+"""
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from script.pose import NUM_LANDMARKS
+
+MAGIC = b"FWP1"
+FLAG_KEY = 1
+NO_BASE = 0xFFFFFFFF
+KIND_NONE, KIND_INT8, KIND_INT16 = 0, 1, 2
+
+# magic, flags, 프레임 수, 첫 seq, 기준 seq(직전 포즈의 seq, 키프레임은 NO_BASE), 첫 시각
+_HEADER = struct.Struct("<4sBHIId")
+_VALUES = NUM_LANDMARKS * 4
+
+# 채널별 양자화 배율: x, y, z는 1/8192 (±4 범위), visibility는 1/1000
+SCALES = np.array([8192.0, 8192.0, 8192.0, 1000.0], dtype=np.float32)
+
+# seqs (T,) int64, timestamps (T,) float64, poses (T, 33, 4) float32 (없는 프레임은 0), present (T,) bool
+PosePacket = namedtuple("PosePacket", "camera seqs timestamps poses present key")
+
+
+def quantize(poses):
+    """(…, 33, 4) float → int16"""
+    return np.clip(np.rint(poses * SCALES), -32767, 32767).astype(np.int16)
+
+
+def dequantize(values):
+    return values.astype(np.float32) / SCALES
+
+
+def _stack(poses):
+    # (T, 33, 4) 배열이면 모두 있는 프레임, 목록이면 None이 없는 프레임
+    if isinstance(poses, np.ndarray):
+        return poses.reshape(-1, NUM_LANDMARKS, 4), np.ones(len(poses), dtype=bool)
+    present = np.array([pose is not None for pose in poses], dtype=bool)
+    stacked = [pose for pose in poses if pose is not None]
+    if not stacked:
+        return np.empty((0, NUM_LANDMARKS, 4), dtype=np.float32), present
+    return np.asarray(stacked, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 4), present
+
+
+class PoseEncoder:
+    """카메라 하나의 포즈 스트림 인코더 (직전 포즈를 기억, keyframe_interval 메시지마다 키프레임)"""
+
+    def __init__(self, camera, keyframe_interval=30):
+        self.camera = str(camera).encode()
+        if len(self.camera) > 255:
+            raise ValueError("카메라 id가 너무 깁니다 (UTF-8 255바이트 이하).")
+        self.keyframe_interval = keyframe_interval
+        self._reference = None
+        self._base = NO_BASE
+        self._messages = 0
+
+    def reset(self):
+        """다음 메시지를 키프레임으로 (새 시청자 접속 등)"""
+        self._reference = None
+
+    def encode(self, seqs, timestamps, poses):
+        count = len(seqs)
+        if not count or count > 0xFFFF:
+            raise ValueError("메시지 하나에 프레임 1~65535개를 담을 수 있습니다.")
+        poses, present = _stack(poses)
+        seqs = np.asarray(seqs, dtype=np.int64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        seq_offsets = seqs - seqs[0]
+        if seq_offsets.min() < 0 or seq_offsets.max() > 0xFFFF:
+            raise ValueError("메시지 안의 seq는 첫 seq부터 65535 이내로 늘어나야 합니다.")
+
+        key = self._reference is None or self._messages % self.keyframe_interval == 0
+        reference = np.zeros((NUM_LANDMARKS, 4), dtype=np.int16) if key else self._reference
+        values = quantize(poses)
+        # 차이는 2^16 나머지 (int32로 빼고 int16으로 자르면 넘쳐도 복원 누적합이 같은 값)
+        chain = np.concatenate([reference[None], values]).astype(np.int32)
+        deltas = np.diff(chain, axis=0).astype(np.int16)
+        fits = ((deltas >= -128) & (deltas <= 127)).all(axis=(1, 2))
+        kinds = np.zeros(count, dtype=np.uint8)
+        kinds[present] = np.where(fits, KIND_INT8, KIND_INT16)
+
+        header = _HEADER.pack(MAGIC, FLAG_KEY if key else 0, count, int(seqs[0]) & 0xFFFFFFFF,
+                              NO_BASE if key else self._base, float(timestamps[0]))
+        data = b"".join((
+            header, bytes((len(self.camera),)), self.camera, kinds.tobytes(),
+            seq_offsets.astype("<u2").tobytes(), (timestamps - timestamps[0]).astype("<f4").tobytes(),
+            deltas[fits].astype(np.int8).tobytes(), deltas[~fits].astype("<i2").tobytes(),
+        ))
+        if len(values):
+            self._reference = values[-1]
+            self._base = int(seqs[present][-1]) & 0xFFFFFFFF
+        elif key:
+            self._reference, self._base = reference, NO_BASE
+        self._messages += 1
+        return data
+
+    def encode_frame(self, seq, timestamp, pose):
+        """프레임 하나짜리 메시지 (pose가 None이면 사람 없음)"""
+        return self.encode((seq,), (timestamp,), [pose])
+
+
+class PoseDecoder:
+    """여러 카메라의 포즈 스트림 디코더 (카메라별 직전 포즈를 기억)"""
+
+    def __init__(self):
+        self._state = {}
+
+    def decode(self, data):
+        """PosePacket, 또는 빠진 메시지 뒤 키프레임을 기다리는 중이면 None"""
+        magic, flags, count, first_seq, base, ts0 = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("포즈 스트림 메시지가 아닙니다.")
+        offset = _HEADER.size
+        length = data[offset]
+        camera = bytes(data[offset + 1:offset + 1 + length]).decode()
+        offset += 1 + length
+        kinds = np.frombuffer(data, np.uint8, count, offset)
+        offset += count
+        seq_offsets = np.frombuffer(data, "<u2", count, offset)
+        offset += 2 * count
+        ts_offsets = np.frombuffer(data, "<f4", count, offset)
+        offset += 4 * count
+
+        key = bool(flags & FLAG_KEY)
+        if key:
+            reference = np.zeros((NUM_LANDMARKS, 4), dtype=np.int16)
+        else:
+            state = self._state.get(camera)
+            if state is None or state[0] != base:
+                self._state.pop(camera, None)
+                return None
+            reference = state[1]
+
+        present = kinds != KIND_NONE
+        fits = kinds[present] == KIND_INT8
+        small = int(fits.sum())
+        large = len(fits) - small
+        int8_deltas = np.frombuffer(data, np.int8, small * _VALUES, offset).reshape(-1, NUM_LANDMARKS, 4)
+        int16_deltas = np.frombuffer(data, "<i2", large * _VALUES, offset + small * _VALUES)
+        int16_deltas = int16_deltas.reshape(-1, NUM_LANDMARKS, 4)
+        # 한 종류뿐이면 (프레임 하나짜리 메시지 등) 마스크 인덱싱 없이
+        if not large:
+            deltas = int8_deltas
+        elif not small:
+            deltas = int16_deltas
+        else:
+            deltas = np.empty((len(fits), NUM_LANDMARKS, 4), dtype=np.int16)
+            deltas[fits] = int8_deltas
+            deltas[~fits] = int16_deltas
+        # 누적합을 int16으로 자르면 인코더의 2^16 나머지 차이가 정확히 되돌아감
+        values = (np.cumsum(deltas, axis=0, dtype=np.int64) + reference).astype(np.int16)
+
+        seqs = (first_seq + seq_offsets.astype(np.int64)) & 0xFFFFFFFF
+        if len(values) == count:
+            poses = dequantize(values)
+        else:
+            poses = np.zeros((count, NUM_LANDMARKS, 4), dtype=np.float32)
+            poses[present] = dequantize(values)
+        if len(values):
+            self._state[camera] = (int(seqs[present][-1]), values[-1])
+        elif key:
+            self._state[camera] = (NO_BASE, reference)
+        return PosePacket(camera, seqs, ts0 + ts_offsets.astype(np.float64), poses, present, key)
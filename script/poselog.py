@@ -0,0 +1,49 @@
+import numpy as np
+
+from script.pose import NUM_LANDMARKS
+
+# 포즈 로그 (.npz)
+#   poses       (T, 33, 4) float32  사람 없는 프레임은 0 (visibility 0)
+#   timestamps  (T,) float64        초 단위
+#   falls       (K, 2) float64      낙상 구간 [시작, 끝] (주석, 없으면 빈 배열)
+#   camera      str
+
+
+class PoseLogWriter:
+    """모니터링 중 포즈를 모아 두었다가 npz 포즈 로그로 저장"""
+
+    def __init__(self, camera="0"):
+        self.camera = str(camera)
+        self._poses = []
+        self._timestamps = []
+
+    def append(self, t, pose):
+        self._timestamps.append(t)
+        self._poses.append(np.zeros((NUM_LANDMARKS, 4), dtype=np.float32) if pose is None else np.array(pose))
+
+    def __len__(self):
+        return len(self._poses)
+
+    def save(self, path, falls=None):
+        save_poselog(path, np.array(self._poses, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 4),
+                     np.array(self._timestamps), falls, self.camera)
+
+
+def save_poselog(path, poses, timestamps, falls=None, camera="0"):
+    falls = np.empty((0, 2)) if falls is None else np.asarray(falls, dtype=np.float64).reshape(-1, 2)
+    np.savez_compressed(path, poses=poses.astype(np.float32), timestamps=np.asarray(timestamps, dtype=np.float64),
+                        falls=falls, camera=np.array(str(camera)))
+
+
+def load_poselog(path):
+    """(poses, timestamps, falls, camera) 반환"""
+    with np.load(path) as data:
+        return data["poses"], data["timestamps"], data["falls"], str(data["camera"])
+
+
+def frame_labels(timestamps, falls):
+    """각 프레임이 낙상 구간 안에 있는지 (T,) bool"""
+    labels = np.zeros(len(timestamps), dtype=bool)
+    for start, end in falls:
+        labels |= (timestamps >= start) & (timestamps <= end)
+    return labels
@@ -0,0 +1,223 @@
+"""파이프라인 구간 타이머와 샘플링 프로파일러 (실행 중 켜고 끔)
+
+    with PROFILER.stage("inference"):
+        pose = backend.process(image)
+
+PROFILER.enabled = True로 켜면 구간별 시간을 모으고, sample_interval마다 구간 안에 있는 스레드의
+파이썬 스택을 샘플링한다. 꺼져 있으면 stage()는 아무것도 하지 않는 공용 컨텍스트를 돌려준다.
+collapsed(seconds)는 최근 seconds초를 flamegraph.pl / speedscope가 읽는 collapsed-stack 형식으로,
+flamegraph_svg()는 외부 도구 없이 볼 수 있는 SVG 플레임 그래프로 만든다.
+"""
+import html
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from contextlib import nullcontext
+
+from script.timeutil import format_kst
+
+_DISABLED = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start", "child")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.child = 0.0
+
+    def __enter__(self):
+        self.profiler._stack().append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        total = end - self.start
+        stack = self.profiler._stack()
+        path = ";".join(stage.name for stage in stack)
+        stack.pop()
+        if stack:
+            stack[-1].child += total
+        # (끝 시각, 스레드;구간 경로, 전체 시간, 하위 구간을 뺀 시간)
+        self.profiler._records.append((end, f"{threading.current_thread().name};{path}", total, total - self.child))
+        return False
+
+
+class StageProfiler:
+    """구간 타이머 + 스택 샘플러
+
+    구간 기록과 샘플은 최근 window초만 보관하므로 켜 둔 채로 두고 필요할 때 구간을 잘라 보면 된다.
+    샘플러는 stage() 안에 들어온 적 있는 스레드(분석/화면 스레드)만 샘플링한다.
+    """
+
+    def __init__(self, enabled=False, window=120.0, sample_interval=0.005, max_records=200_000):
+        self.window = window
+        self.sample_interval = sample_interval
+        self._records = deque(maxlen=max_records)
+        self._samples = deque(maxlen=max_records)
+        self._stacks = {}
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._enabled = False
+        self.enabled = enabled
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        with self._lock:
+            self._enabled = bool(value)
+            if self._enabled and self.sample_interval and (self._sampler is None or not self._sampler.is_alive()):
+                self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+                self._sampler.start()
+
+    def stage(self, name):
+        """구간 측정 컨텍스트 (꺼져 있으면 비용 없음). 중첩하면 '바깥;안쪽' 경로로 기록"""
+        if not self._enabled:
+            return _DISABLED
+        return _Stage(self, name)
+
+    def _stack(self):
+        ident = threading.get_ident()
+        stack = self._stacks.get(ident)
+        if stack is None:
+            stack = self._stacks[ident] = []
+        return stack
+
+    def _sample(self):
+        own = threading.get_ident()
+        while self._enabled:
+            now = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                stack = self._stacks.get(ident)
+                if ident == own or not stack:
+                    continue
+                calls = []
+                while frame is not None:
+                    code = frame.f_code
+                    calls.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                    frame = frame.f_back
+                stages = [f"[{stage.name}]" for stage in list(stack)]
+                self._samples.append((now, ";".join([names.get(ident, str(ident)), *stages, *reversed(calls)])))
+            # 끝난 스레드(지난 Streamlit 실행 등)의 구간 스택 정리. 분석 스레드가 _stack()으로 동시에
+            # 추가하므로 키 목록을 복사해서 돈다 (dict 순회 중 크기 변경 방지)
+            for ident in [ident for ident in list(self._stacks) if ident not in names]:
+                self._stacks.pop(ident, None)
+            time.sleep(self.sample_interval)
+
+    def _recent(self, items, seconds):
+        since = time.perf_counter() - min(seconds or self.window, self.window)
+        return [item for item in list(items) if item[0] >= since]
+
+    def collapsed(self, seconds=None, samples=False):
+        """최근 seconds초의 collapsed-stack 줄 목록 ('스택 값')
+
+        samples=False면 구간 타이머 (값 = 하위 구간을 뺀 마이크로초),
+        True면 샘플러 (값 = 샘플 수, 구간은 [이름]으로 스택 앞에 붙음).
+        """
+        counts = Counter()
+        if samples:
+            for _, key in self._recent(self._samples, seconds):
+                counts[key] += 1
+        else:
+            for _, key, _, own in self._recent(self._records, seconds):
+                counts[key] += own * 1e6
+        return [f"{key} {round(value)}" for key, value in sorted(counts.items()) if round(value) > 0]
+
+    def stats(self, seconds=None):
+        """최근 seconds초의 구간별 (호출 수, 평균, 최대, p95) 초 단위"""
+        durations = {}
+        for _, key, total, _ in self._recent(self._records, seconds):
+            durations.setdefault(key, []).append(total)
+        result = {}
+        for key, values in durations.items():
+            values.sort()
+            result[key] = (len(values), sum(values) / len(values), values[-1], values[int(len(values) * 0.95)])
+        return result
+
+    def summary(self, seconds=10.0):
+        """구간별 '경로: 평균/p95/최대 ms (호출 수)' 목록"""
+        return [
+            f"{key}: {average * 1e3:.2f}/{p95 * 1e3:.2f}/{worst * 1e3:.2f}ms ({count}회)"
+            for key, (count, average, worst, p95) in sorted(self.stats(seconds).items())
+        ]
+
+    def dump(self, directory="data/profiles", seconds=30.0):
+        """최근 seconds초를 구간 타이머/샘플별 .folded(collapsed-stack)와 .svg로 저장하고 경로 목록을 반환"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = format_kst(time.time(), "%Y%m%d-%H%M%S")
+        paths = []
+        for samples, kind in ((False, "stages"), (True, "samples")):
+            lines = self.collapsed(seconds, samples=samples)
+            base = os.path.join(directory, f"{stamp}-{kind}")
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            with open(base + ".svg", "w", encoding="utf-8") as f:
+                f.write(flamegraph_svg(lines, f"FallWatch {stamp} {kind} (최근 {seconds:g}초)"))
+            paths += [base + ".folded", base + ".svg"]
+        return paths
+
+    def clear(self):
+        self._records.clear()
+        self._samples.clear()
+
+
+def flamegraph_svg(lines, title="FallWatch 프로파일", width=1200, row_height=17):
+    """collapsed-stack 줄 목록으로 만든 SVG 플레임 그래프 (막대에 마우스를 올리면 값과 비율)"""
+    root = {"value": 0, "children": {}}
+    for line in lines:
+        stack, _, value = line.rpartition(" ")
+        value = float(value)
+        root["value"] += value
+        node = root
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"value": 0, "children": {}})
+            node["value"] += value
+
+    rects = []
+    depth_max = 0
+
+    def layout(node, x, depth):
+        nonlocal depth_max
+        depth_max = max(depth_max, depth)
+        for name, child in sorted(node["children"].items()):
+            w = child["value"] / root["value"] * width
+            if w >= 0.5:
+                rects.append((name, child["value"], x, depth, w))
+                layout(child, x, depth + 1)
+            x += w
+
+    if root["value"]:
+        layout(root, 0.0, 0)
+    height = (depth_max + 2) * row_height
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="sans-serif" '
+        f'font-size="11"><text x="{width / 2}" y="12" text-anchor="middle">{html.escape(title)}</text>'
+    ]
+    for name, value, x, depth, w in rects:
+        y = height - (depth + 1) * row_height
+        # 이름 해시로 고른 난색 계열 (같은 함수는 같은 색)
+        hue = 10 + zlib.crc32(name.encode()) % 40
+        label = html.escape(name)
+        share = value / root["value"] * 100
+        text = html.escape(name[:int(w / 6.5)]) if w > 40 else ""
+        parts.append(
+            f'<g><title>{label} ({value:.0f}, {share:.1f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_height - 1}" fill="hsl({hue},80%,60%)"/>'
+            f'<text x="{x + 3:.1f}" y="{y + row_height - 5}">'
+            f'{text}</text></g>'
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+# 프로세스 전체에서 쓰는 기본 프로파일러 (FALLWATCH_PROFILE=1이면 켜진 채로 시작)
+PROFILER = StageProfiler(enabled=os.environ.get("FALLWATCH_PROFILE") == "1")
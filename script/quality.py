@@ -0,0 +1,147 @@
+"""CPU 예산에 맞춰 카메라별 분석 품질(FPS, 입력 해상도, 모델)을 자동으로 올리고 내림
+
+한 장비가 여러 카메라를 분석할 때 부하가 몰리면 모든 카메라가 한꺼번에 밀리는 대신,
+낮은 위험 병실 카메라부터 한 단계씩 품질을 낮춰 전체 CPU 사용률을 [quality] cpu_budget 안에 둔다.
+"""
+import dataclasses
+import threading
+import time
+from collections import namedtuple
+
+from script.broadcast import shared_monitors
+from script.metrics import METRICS
+
+# 품질 단계 (0 = 설정 그대로). 비용 대비 감지 영향이 작은 것부터 낮춘다: FPS → 캡처 해상도 → 모델 → 키프레임
+#   fps_scale: capture_fps 배율, size_scale: 캡처 해상도 배율, lighter: 더 가벼운 모델로 몇 단계,
+#   keyframe_interval: 최소 키프레임 간격 (단일 인원 모드만)
+Quality = namedtuple("Quality", "label fps_scale size_scale lighter keyframe_interval")
+
+QUALITY_LEVELS = (
+    Quality("설정 그대로", 1.0, 1.0, 0, 1),
+    Quality("FPS 2/3", 0.67, 1.0, 0, 1),
+    Quality("FPS 2/3, 해상도 3/4", 0.67, 0.75, 0, 1),
+    Quality("FPS 1/2, 해상도 3/4, 가벼운 모델", 0.5, 0.75, 1, 1),
+    Quality("FPS 1/2, 해상도 1/2, 가장 가벼운 모델", 0.5, 0.5, 2, 1),
+    Quality("FPS 1/3, 해상도 1/2, 가장 가벼운 모델, 2프레임마다 추론", 0.33, 0.5, 2, 2),
+)
+
+# 무거운 것 → 가벼운 것 (여기 없는 백엔드는 모델을 바꾸지 않음)
+BACKEND_LADDER = ("mediapipe-heavy", "mediapipe-full", "mediapipe-lite")
+
+
+def apply_quality(camera, level, min_fps=3):
+    """CameraConfig에 품질 단계를 적용한 CameraConfig (캡처 크기 자동이면 해상도 배율은 호출 쪽에서)"""
+    quality = QUALITY_LEVELS[level]
+    if level == 0:
+        return camera
+    changes = {"keyframe_interval": max(camera.keyframe_interval, quality.keyframe_interval)}
+    if camera.capture_fps:
+        changes["capture_fps"] = max(min(min_fps, camera.capture_fps), round(camera.capture_fps * quality.fps_scale))
+    if camera.capture_width:
+        # 짝수 크기 유지 (YUYV 등)
+        changes["capture_width"] = round(camera.capture_width * quality.size_scale / 2) * 2
+        changes["capture_height"] = round(camera.capture_height * quality.size_scale / 2) * 2
+    if camera.backend in BACKEND_LADDER:
+        index = min(BACKEND_LADDER.index(camera.backend) + quality.lighter, len(BACKEND_LADDER) - 1)
+        changes["backend"] = BACKEND_LADDER[index]
+    return dataclasses.replace(camera, **changes)
+
+
+def system_cpu_percent():
+    """마지막 호출 이후 전체 CPU 사용률 (%)"""
+    import psutil  # 화면 페이지와 같은 의존성, 컨트롤러를 쓸 때만 필요
+    return psutil.cpu_percent(interval=None)
+
+
+class QualityController:
+    """interval마다 CPU 사용률과 카메라별 처리 지연을 보고 카메라 하나의 품질을 한 단계 바꿈
+
+    - CPU가 cpu_budget을 넘으면: 고위험이 아닌 카메라 중 가장 덜 낮춘 것부터 한 단계 낮춤.
+      모두 최저 단계면 고위험 카메라를 high_risk_max_level까지 낮춤.
+    - 카메라 하나가 밀리면 (처리 지연 > 프레임 간격, CPU는 여유): 그 카메라만 낮춤.
+    - CPU가 cpu_budget - headroom 밑이고 밀리는 카메라가 없으면: 고위험 카메라부터, 가장 많이 낮춘 것부터 한 단계 올림.
+    바꾼 뒤 cooldown초 동안은 그 효과를 보느라 다시 바꾸지 않는다. 설정은 매번 config_watcher에서 읽는다.
+    """
+
+    def __init__(self, monitors, config_watcher, cpu_percent=system_cpu_percent):
+        # monitors: 현재 모니터 목록을 돌려주는 함수 (기본은 shared_monitors)
+        self.monitors = monitors
+        self.config_watcher = config_watcher
+        self.cpu_percent = cpu_percent
+        self.cpu = None
+        self._last_change = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="quality-controller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        self.cpu_percent()  # 첫 호출은 기준점
+        while not self._stop.wait(self.config_watcher.current.quality.interval):
+            try:
+                self.check()
+            except Exception as exc:
+                METRICS.event("quality_error", f"{type(exc).__name__}: {exc}")
+
+    def check(self, now=None):
+        """한 번 점검하고 (모니터, 새 단계, 이유) 또는 바꾸지 않았으면 None을 반환"""
+        config = self.config_watcher.current
+        settings = config.quality
+        now = time.monotonic() if now is None else now
+        monitors = [monitor for monitor in self.monitors() if monitor.running]
+        if not settings.enabled:
+            for monitor in monitors:
+                if monitor.quality_level:
+                    monitor.set_quality(0, "품질 자동 조절 꺼짐")
+            return None
+        self.cpu = cpu = self.cpu_percent()
+        if not monitors or now - self._last_change < settings.cooldown:
+            return None
+
+        def high_risk(monitor):
+            return config.profile_for(monitor.camera_id).high_risk
+
+        def limit(monitor):
+            top = len(QUALITY_LEVELS) - 1
+            return min(settings.high_risk_max_level, top) if high_risk(monitor) else top
+
+        behind = [monitor for monitor in monitors if monitor.behind]
+        change = None
+        if cpu > settings.cpu_budget or behind:
+            candidates = [m for m in (monitors if cpu > settings.cpu_budget else behind) if m.quality_level < limit(m)]
+            if candidates:
+                target = min(candidates, key=lambda m: (high_risk(m), m.quality_level))
+                reason = (f"CPU {cpu:.0f}% > {settings.cpu_budget:.0f}%" if cpu > settings.cpu_budget
+                          else f"처리 지연 {target.latency * 1e3:.0f}ms")
+                change = (target, target.quality_level + 1, reason)
+        elif cpu < settings.cpu_budget - settings.headroom:
+            candidates = [m for m in monitors if m.quality_level > 0]
+            if candidates:
+                target = max(candidates, key=lambda m: (high_risk(m), m.quality_level))
+                change = (target, target.quality_level - 1, f"CPU {cpu:.0f}% 여유")
+        if change is not None:
+            monitor, level, reason = change
+            monitor.set_quality(level, reason)
+            self._last_change = now
+        return change
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def quality_controller(config_watcher):
+    """프로세스에 하나만 두는 컨트롤러 (처음 부를 때 공유 모니터들을 대상으로 시작)"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = QualityController(shared_monitors, config_watcher).start()
+        return _controller
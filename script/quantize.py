@@ -0,0 +1,108 @@
+"""포즈 랜드마크 ONNX 모델을 INT8로 양자화
+
+    python -m script.quantize models/pose_landmark.onnx -o models/pose_landmark_int8.onnx --calib clips/*.mp4
+    python -m script.quantize models/pose_landmark.onnx -o models/pose_landmark_int8.onnx   # 동적 양자화
+
+보정 영상(--calib)을 주면 실제 프레임으로 활성값 범위를 잡는 정적 양자화(QDQ, 가중치/활성값 INT8)를,
+없으면 가중치만 INT8로 바꾸는 동적 양자화를 한다. 결과 모델은 입출력 형식이 같으므로
+카메라 설정에서 backend = "onnx", model_path만 바꿔 쓰면 된다.
+"""
+import argparse
+import contextlib
+import os
+
+import cv2
+import numpy as np
+
+from script.backends import letterbox
+
+
+def _input_layout(model_path):
+    import onnxruntime as ort
+    model_input = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"]).get_inputs()[0]
+    shape = model_input.shape
+    nchw = shape[1] == 3
+    height, width = (shape[2], shape[3]) if nchw else (shape[1], shape[2])
+    return model_input.name, nchw, int(width), int(height)
+
+
+def calibration_frames(paths, count=200):
+    """보정용 RGB 프레임을 영상들에서 고르게 뽑는다"""
+    frames = []
+    per_clip = max(1, count // max(len(paths), 1))
+    for path in paths:
+        capture = cv2.VideoCapture(path)
+        total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or per_clip
+        for index in np.linspace(0, max(total - 1, 0), per_clip).astype(int):
+            capture.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+            ret, frame = capture.read()
+            if ret:
+                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        capture.release()
+    return frames
+
+
+def _calibration_reader(model_path, frames):
+    from onnxruntime.quantization import CalibrationDataReader
+
+    input_name, nchw, width, height = _input_layout(model_path)
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self._frames = iter(frames)
+
+        def get_next(self):
+            frame = next(self._frames, None)
+            if frame is None:
+                return None
+            tensor = np.zeros((1, height, width, 3), dtype=np.float32)
+            letterbox(frame, tensor[0])
+            if nchw:
+                tensor = np.ascontiguousarray(tensor.transpose(0, 3, 1, 2))
+            return {input_name: tensor}
+
+    return FrameReader()
+
+
+def quantize_model(model_path, output_path, frames=None, per_channel=True):
+    """frames가 있으면 정적(QDQ) 양자화, 없으면 동적 양자화"""
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    prepared = output_path + ".prep.onnx"
+    try:
+        quant_pre_process(model_path, prepared)
+        if frames:
+            quantize_static(
+                prepared, output_path, _calibration_reader(prepared, frames),
+                quant_format=QuantFormat.QDQ,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                per_channel=per_channel,
+            )
+        else:
+            quantize_dynamic(prepared, output_path, weight_type=QuantType.QInt8, per_channel=per_channel)
+    finally:
+        # 전처리 단계에서 실패했으면 파일이 없을 수 있음
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(prepared)
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("model")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--calib", nargs="*", default=[], help="보정용 녹화 영상")
+    parser.add_argument("--calib-frames", type=int, default=200)
+    parser.add_argument("--per-tensor", action="store_true", help="채널별 대신 텐서 단위 양자화")
+    args = parser.parse_args()
+
+    frames = calibration_frames(args.calib, args.calib_frames) if args.calib else None
+    quantize_model(args.model, args.output, frames, per_channel=not args.per_tensor)
+    mode = f"정적 양자화 (보정 프레임 {len(frames)}개)" if frames else "동적 양자화"
+    print(f"{args.output} 저장 완료 - {mode}")
+
+
+if __name__ == "__main__":
+    main()
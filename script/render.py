@@ -0,0 +1,212 @@
+import html
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from script.eventstore import STATUS_CLASS
+from script.features import POSE_NONE
+from script.timeutil import format_kst
+from script.pose import (
+    LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP, LEFT_KNEE, RIGHT_KNEE, LEFT_ANKLE, RIGHT_ANKLE,
+)
+
+# 관절 정보 표에 표시할 관절
+KEY_JOINTS = (
+    (LEFT_SHOULDER, "왼쪽 어깨"),
+    (RIGHT_SHOULDER, "오른쪽 어깨"),
+    (LEFT_HIP, "왼쪽 엉덩이"),
+    (RIGHT_HIP, "오른쪽 엉덩이"),
+    (LEFT_KNEE, "왼쪽 무릎"),
+    (RIGHT_KNEE, "오른쪽 무릎"),
+    (LEFT_ANKLE, "왼쪽 발목"),
+    (RIGHT_ANKLE, "오른쪽 발목"),
+)
+
+NO_LANDMARKS_HTML = "<div class='info-text'>감지된 관절 정보가 없습니다.</div>"
+
+_TABLE_HEAD = (
+    "<div class='info-text'>인식 상태: %s</div>"
+    "<table style=\"width:100%%; border-collapse: collapse;\">"
+    "<tr style=\"background-color: #EEF2FF;\">"
+    "<th style=\"text-align: left; padding: 0.5rem;\">관절</th>"
+    "<th style=\"text-align: center; padding: 0.5rem;\">X</th>"
+    "<th style=\"text-align: center; padding: 0.5rem;\">Y</th>"
+    "<th style=\"text-align: center; padding: 0.5rem;\">Z</th>"
+    "<th style=\"text-align: center; padding: 0.5rem;\">신뢰도</th>"
+    "</tr>"
+)
+_TABLE_TAIL = "</table>"
+
+# 행 템플릿: 배경색/관절 이름은 생성 시 한 번 채워 두고, 매 갱신에는 셀 값만 %로 채운다
+_ROW = (
+    "<tr style=\"background-color: {bg};\">"
+    "<td style=\"padding: 0.5rem;\">{name}</td>"
+    "<td style=\"text-align: center; padding: 0.5rem;\">%.3f</td>"
+    "<td style=\"text-align: center; padding: 0.5rem;\">%.3f</td>"
+    "<td style=\"text-align: center; padding: 0.5rem;\">%.3f</td>"
+    "<td style=\"text-align: center; padding: 0.5rem; color: %s; font-weight: bold;\">%.2f</td>"
+    "</tr>"
+)
+_OCCLUDED_ROW = (
+    "<tr style=\"background-color: {bg};\">"
+    "<td style=\"padding: 0.5rem;\">{name}</td>"
+    "<td colspan=\"3\" style=\"text-align: center; padding: 0.5rem; color: #9CA3AF;\">가려짐</td>"
+    "<td style=\"text-align: center; padding: 0.5rem; color: %s; font-weight: bold;\">%.2f</td>"
+    "</tr>"
+)
+
+
+def confidence_color(visibility):
+    """신뢰도 색: 0.7 초과 초록, 0.5 초과 주황, 그 밖은 빨강"""
+    return "#10B981" if visibility > 0.7 else "#F59E0B" if visibility > 0.5 else "#EF4444"
+
+
+# 표시 자릿수 (x, y, z 소수 셋째, 신뢰도 둘째 자리) → 바뀐 셀 비교용 정수 배율
+_DISPLAY_SCALE = np.array([1000, 1000, 1000, 100], dtype=np.float32)
+
+_HISTORY_HEAD = "<div style='max-height: 300px; overflow-y: auto;'>"
+_HISTORY_TAIL = "</div>"
+_HISTORY_ITEM = "<div class='log-item'><span class='%s'>[%s]: %s</span></div>"
+
+
+class RenderStats:
+    """UI 렌더링 비용 집계 (감지 시간과 별도)
+
+    구간 이름별 호출 수, 누적/최대 시간을 모으고, 평균 비용이 예산(budget, 초)을 넘으면
+    interval()이 갱신 주기를 비례해서 늘려 렌더링이 처리 루프를 잡아먹지 않게 한다.
+    """
+
+    def __init__(self, budget=0.005):
+        self.budget = budget
+        self.sections = {}
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        section = self.sections.setdefault(name, [0, 0.0, 0.0])
+        section[0] += 1
+        section[1] += seconds
+        section[2] = max(section[2], seconds)
+
+    def average(self, name):
+        count, total, _ = self.sections.get(name, (0, 0.0, 0.0))
+        return total / count if count else 0.0
+
+    def interval(self, name, base):
+        """평균 렌더링 시간이 예산을 넘으면 그만큼 갱신 주기를 늘린다"""
+        average = self.average(name)
+        if average <= self.budget:
+            return base
+        return base * average / self.budget
+
+    def summary(self):
+        """구간별 '이름: 평균/최대 ms (호출 수)' 목록"""
+        return [
+            f"{name}: {total / count * 1e3:.2f}/{worst * 1e3:.2f}ms ({count}회)"
+            for name, (count, total, worst) in self.sections.items()
+        ]
+
+
+class LandmarkTableRenderer:
+    """관절 정보 표 HTML
+
+    행 템플릿은 생성 시 한 번 만들고, 갱신할 때는 표시 값(반올림 후)이 바뀐 행만 다시 채운다.
+    완성된 표는 (인식 상태, 표시 값 전체의 바이트)를 키로 보관하므로 같은 화면이 다시 나오면 그대로 재사용한다.
+    render()는 (html, 직전과 달라졌는지)를 반환하므로 바뀌지 않았으면 화면 갱신을 건너뛸 수 있다.
+    """
+
+    def __init__(self, joints=KEY_JOINTS, show_occluded=True, cache_size=32):
+        self.joints = np.array([index for index, _ in joints])
+        self.show_occluded = show_occluded
+        self.cache_size = cache_size
+        self._rows = []
+        self._occluded_rows = []
+        for position, (_, name) in enumerate(joints):
+            bg = "#F9FAFB" if position % 2 == 0 else "white"
+            self._rows.append(_ROW.format(bg=bg, name=name))
+            self._occluded_rows.append(_OCCLUDED_ROW.format(bg=bg, name=name))
+        # 행별 직전 표시 값 (좌표는 소수 셋째 자리, 신뢰도는 둘째 자리까지 정수로)
+        self._quantized = np.full((len(joints), 4), np.iinfo(np.int32).min, dtype=np.int32)
+        self._visible = np.zeros(len(joints), dtype=bool)
+        self._cells = [""] * len(joints)
+        self._cache = OrderedDict()
+        self._last = None
+
+    def _update_rows(self, frame):
+        values = frame.pose[self.joints]
+        quantized = np.rint(values * _DISPLAY_SCALE).astype(np.int32)
+        visible = frame.mask[self.joints]
+        changed = (quantized != self._quantized).any(axis=1) | (visible != self._visible)
+        for position in np.flatnonzero(changed).tolist():
+            x, y, z, visibility = values[position].tolist()
+            color = confidence_color(visibility)
+            if not visible[position]:
+                self._cells[position] = self._occluded_rows[position] % (color, visibility) if self.show_occluded else ""
+            else:
+                self._cells[position] = self._rows[position] % (x, y, z, color, visibility)
+        self._quantized = quantized
+        self._visible = visible
+        return quantized.tobytes() + visible.tobytes()
+
+    def render(self, frame, state_label=""):
+        if frame.state == POSE_NONE:
+            html_text = NO_LANDMARKS_HTML
+        else:
+            key = (state_label, self._update_rows(frame))
+            html_text = self._cache.get(key)
+            if html_text is None:
+                html_text = _TABLE_HEAD % state_label + "".join(self._cells) + _TABLE_TAIL
+                self._cache[key] = html_text
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(key)
+        changed = html_text is not self._last
+        self._last = html_text
+        return html_text, changed
+
+
+class HistoryRenderer:
+    """상태 기록 HTML
+
+    기록 한 줄(fragment)은 (시각, 상태, 메시지)를 키로 한 번만 만들어 두고,
+    목록이 바뀌어도 새로 들어온 줄만 만든다. 상태 색은 Event.status 코드로 정한다(문자열 검사 없음).
+    """
+
+    def __init__(self, cache_size=256):
+        self.cache_size = cache_size
+        self._fragments = OrderedDict()
+        self._last_key = None
+        self._last = ""
+
+    def _fragment(self, event):
+        key = (event.ts, event.status, event.message)
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            fragment = _HISTORY_ITEM % (STATUS_CLASS[event.status], format_kst(event.ts), html.escape(event.message))
+            self._fragments[key] = fragment
+            if len(self._fragments) > self.cache_size:
+                self._fragments.popitem(last=False)
+        return key, fragment
+
+    def render(self, events):
+        """오래된 것부터 정렬된 Event 목록 → (최신순 HTML, 직전과 달라졌는지)"""
+        keys, fragments = [], []
+        for event in reversed(events):
+            key, fragment = self._fragment(event)
+            keys.append(key)
+            fragments.append(fragment)
+        list_key = tuple(keys)
+        if list_key == self._last_key:
+            return self._last, False
+        self._last_key = list_key
+        self._last = _HISTORY_HEAD + "".join(fragments) + _HISTORY_TAIL
+        return self._last, True
@@ -0,0 +1,53 @@
+"""Streamlit 페이지들이 함께 쓰는 프로세스 단위 자원 (이벤트 저장소, 설정 감시, 카메라 모니터)
+
+    monitor = camera_monitor("0")     # app.py, app2.py 어느 쪽이 먼저 열려도 같은 방식으로 만든 모니터
+
+페이지마다 다른 factory로 shared_monitor를 부르면 먼저 연 페이지의 모니터가 그대로 쓰이므로,
+모니터는 여기서 한 가지 방식(공유 저장소/설정 감시, 저장소의 최근 기록으로 시작)으로만 만든다.
+"""
+import threading
+
+from script.broadcast import shared_monitor
+from script.config import ConfigWatcher
+from script.eventstore import EventStore
+from script.monitor import CameraMonitor
+
+EVENT_DB_PATH = "data/events.db"
+# 화면 상태 기록에 보여 줄 최근 이벤트 수
+HISTORY_LIMIT = 10
+
+_lock = threading.Lock()
+_store = None
+_config_watcher = None
+
+
+def event_store():
+    """프로세스에 하나뿐인 이벤트 저장소"""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = EventStore(EVENT_DB_PATH)
+        return _store
+
+
+def config_watcher():
+    """프로세스에 하나뿐인 설정 감시 (파일 변경 시 자동으로 다시 읽힘)"""
+    global _config_watcher
+    with _lock:
+        if _config_watcher is None:
+            _config_watcher = ConfigWatcher()
+        return _config_watcher
+
+
+def _create_monitor(camera_id):
+    # 입력(장치/파일/RTSP/MJPEG)은 설정 파일의 카메라 source를 따름
+    store = event_store()
+    monitor = CameraMonitor(camera_id, config_watcher=config_watcher(), store=store, history_limit=HISTORY_LIMIT)
+    monitor.seed_history(list(reversed(store.recent(camera_id, limit=HISTORY_LIMIT))))
+    return monitor
+
+
+def camera_monitor(camera_id):
+    """camera_id의 공유 모니터 (같은 프로세스의 모든 세션이 카메라 하나와 분석 스레드 하나를 함께 씀)"""
+    camera_id = str(camera_id)
+    return shared_monitor(camera_id, lambda: _create_monitor(camera_id))
@@ -0,0 +1,88 @@
+import math
+
+import numpy as np
+
+from script.pose import NUM_LANDMARKS
+
+
+class OneEuroFilter:
+    """(33, 4) 포즈 배열 전체에 한 번에 적용하는 One-Euro 필터
+
+    - 좌표(x, y, z)는 속도에 따라 차단 주파수가 바뀌는 One-Euro 방식으로 평활화한다.
+    - 갱신 가중치에 visibility를 곱해, 잘 안 보이는 관절은 이전 값을 더 오래 유지한다.
+    - 한 프레임에 max_jump 이상 튄 관절은 이상치로 보고 버리되, max_rejects 프레임 연속이면 받아들인다.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=5.0, d_cutoff=1.0, max_jump=0.25, max_rejects=3,
+                 num_landmarks=NUM_LANDMARKS):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.max_jump = max_jump
+        self.max_rejects = max_rejects
+
+        self._state = np.zeros((num_landmarks, 4), dtype=np.float32)
+        self._velocity = np.zeros((num_landmarks, 3), dtype=np.float32)
+        self._rejects = np.zeros(num_landmarks, dtype=np.int32)
+        self._out = np.empty((num_landmarks, 4), dtype=np.float32)
+        # 중간 계산용 버퍼 (프레임마다 할당하지 않도록 미리 확보)
+        self._delta = np.empty((num_landmarks, 3), dtype=np.float32)
+        self._alpha = np.empty((num_landmarks, 3), dtype=np.float32)
+        self._jump = np.empty(num_landmarks, dtype=np.float32)
+        self._last_t = None
+
+    def reset(self):
+        self._last_t = None
+
+    @staticmethod
+    def _alpha_for(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, pose, t):
+        """pose: (33, 4) 배열, t: 초 단위 시각. 평활화된 (33, 4) 배열(내부 버퍼)을 반환"""
+        if self._last_t is None:
+            self._state[:] = pose
+            self._velocity.fill(0)
+            self._rejects.fill(0)
+            self._last_t = t
+            np.copyto(self._out, self._state)
+            return self._out
+
+        dt = max(t - self._last_t, 1e-3)
+        self._last_t = t
+        coords = self._state[:, :3]
+        vis = pose[:, 3]
+
+        np.subtract(pose[:, :3], coords, out=self._delta)
+
+        # 이상치: 화면 평면에서 한 프레임에 크게 튄 관절
+        np.hypot(self._delta[:, 0], self._delta[:, 1], out=self._jump)
+        outlier = (self._jump > self.max_jump) & (self._rejects < self.max_rejects)
+        self._rejects += outlier
+        self._rejects[~outlier] = 0
+
+        # 속도 추정 (이상치는 속도 갱신에서도 제외)
+        a_d = self._alpha_for(self.d_cutoff, dt)
+        np.multiply(self._delta, a_d / dt, out=self._alpha)
+        self._alpha -= a_d * self._velocity
+        self._alpha[outlier] = 0
+        self._velocity += self._alpha
+
+        # 속도 비례 차단 주파수 → 관절별 alpha
+        np.abs(self._velocity, out=self._alpha)
+        self._alpha *= self.beta
+        self._alpha += self.min_cutoff
+        self._alpha *= 2 * math.pi * dt
+        np.divide(self._alpha, self._alpha + 1.0, out=self._alpha)
+        self._alpha *= vis[:, None]
+        self._alpha[outlier] = 0
+
+        self._delta *= self._alpha
+        coords += self._delta
+
+        # visibility는 단순 지수 평활
+        self._state[:, 3] += a_d * (vis - self._state[:, 3])
+
+        np.copyto(self._out, self._state)
+        return self._out
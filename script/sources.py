@@ -0,0 +1,340 @@
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+# FFmpeg 저지연 옵션: RTSP는 TCP로(패킷 손실로 인한 깨진 프레임 방지), 디먹서/디코더 내부 버퍼 최소화
+LOW_LATENCY_FFMPEG_OPTIONS = "rtsp_transport;tcp|fflags;nobuffer|flags;low_delay|max_delay;500000"
+
+FFMPEG_OPTIONS_ENV = "OPENCV_FFMPEG_CAPTURE_OPTIONS"
+# FFmpeg 옵션 환경 변수는 프로세스 전체에 보이므로, 바꿔 두는 동안 다른 FFmpeg 열기는 기다림
+_FFMPEG_OPEN_LOCK = threading.Lock()
+
+NETWORK_SCHEMES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://")
+
+# 입력 상태
+SOURCE_CONNECTING = "connecting"      # 여는 중
+SOURCE_STREAMING = "streaming"        # 프레임 수신 중
+SOURCE_STALLED = "stalled"            # 연결은 됐지만 stall_timeout 동안 새 프레임 없음
+SOURCE_RECONNECTING = "reconnecting"  # 끊김 → backoff 후 다시 연결
+SOURCE_ENDED = "ended"                # 파일 끝 (loop=False)
+SOURCE_CLOSED = "closed"
+
+SOURCE_STATE_LABELS = {
+    SOURCE_CONNECTING: "연결 중",
+    SOURCE_STREAMING: "수신 중",
+    SOURCE_STALLED: "프레임 멈춤",
+    SOURCE_RECONNECTING: "재연결 중",
+    SOURCE_ENDED: "영상 끝",
+    SOURCE_CLOSED: "종료",
+}
+
+
+# 처리가 밀릴 때 버퍼 정책
+#   oldest: 버퍼(queue_size장)를 순서대로 처리하고, 가득 차면 가장 오래된 프레임을 버림
+#   latest: 항상 가장 최근 프레임만 처리하고 그 사이 프레임은 버림 (지연 최소)
+DROP_OLDEST = "oldest"
+DROP_LATEST = "latest"
+DROP_POLICIES = (DROP_OLDEST, DROP_LATEST)
+
+
+# 자주 지원되는 캡처 해상도 (너비, 높이)
+STANDARD_SIZES = (
+    (320, 240), (424, 240), (640, 360), (640, 480), (800, 600),
+    (960, 540), (1280, 720), (1600, 900), (1920, 1080),
+)
+
+
+def capture_size_for(input_size, scale=2.0, sizes=STANDARD_SIZES):
+    """포즈 모델 입력 (너비, 높이)에 맞는 가장 작은 캡처 해상도
+
+    사람이 화면 일부만 차지하므로 프레임 짧은 변이 모델 입력의 큰 변 × scale 이상인 것 중 화소 수가
+    가장 적은 해상도를 고른다 (다인원 crop은 scale을 더 크게).
+    """
+    need = max(input_size) * scale
+    candidates = [size for size in sizes if min(size) >= need]
+    if not candidates:
+        return max(sizes, key=lambda size: size[0] * size[1])
+    return min(candidates, key=lambda size: size[0] * size[1])
+
+
+def negotiate(capture, size, fps=0):
+    """장치에 해상도/FPS/픽셀 형식을 요청하고 실제로 적용된 (너비, 높이, FPS, 형식)을 반환
+
+    640x480 이하는 압축 해제가 필요 없는 YUYV, 그보다 크면 USB 대역폭 때문에 MJPG를 요청한다.
+    드라이버는 가장 가까운 지원 모드를 고르므로 결과는 요청과 다를 수 있다.
+    """
+    width, height = size
+    fourcc = "YUYV" if width * height <= 640 * 480 else "MJPG"
+    capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        capture.set(cv2.CAP_PROP_FPS, fps)
+    code = int(capture.get(cv2.CAP_PROP_FOURCC))
+    actual = "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)) if code else ""
+    return (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            capture.get(cv2.CAP_PROP_FPS), actual)
+
+
+def parse_source(spec):
+    """'0' 같은 숫자는 장치 번호, 그 외는 파일 경로/URL"""
+    if isinstance(spec, int):
+        return spec
+    spec = str(spec).strip()
+    return int(spec) if spec.isdigit() else spec
+
+
+def is_network(spec):
+    return isinstance(spec, str) and spec.lower().startswith(NETWORK_SCHEMES)
+
+
+def open_capture(spec, low_latency=True, hw_decode=True, open_timeout=5.0, read_timeout=5.0):
+    """장치/파일/URL을 연다. 파일과 URL은 FFmpeg로 열고 열기/읽기 시간 제한과 하드웨어 디코딩(가능하면)을 건다."""
+    spec = parse_source(spec)
+    if isinstance(spec, int):
+        capture = cv2.VideoCapture(spec)
+    else:
+        params = [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(open_timeout * 1000),
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(read_timeout * 1000),
+        ]
+        if hw_decode:
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        # FFmpeg 옵션은 환경 변수로만 전달되고 열 때만 읽힌다. 이 열기 동안에만 넣고 바로 지움
+        # (사용자가 직접 지정했으면 그대로 둠)
+        with _FFMPEG_OPEN_LOCK:
+            override = low_latency and is_network(spec) and FFMPEG_OPTIONS_ENV not in os.environ
+            if override:
+                os.environ[FFMPEG_OPTIONS_ENV] = LOW_LATENCY_FFMPEG_OPTIONS
+            try:
+                capture = cv2.VideoCapture(spec, cv2.CAP_FFMPEG, params)
+            finally:
+                if override:
+                    os.environ.pop(FFMPEG_OPTIONS_ENV, None)
+    if capture.isOpened():
+        # 드라이버/디코더 쪽 대기 프레임을 최소화 (지원하지 않는 백엔드는 무시)
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return capture
+
+
+class VideoSource:
+    """장치/파일/RTSP/MJPEG 입력을 백그라운드 스레드에서 읽는 프레임 소스
+
+    - 버퍼는 최근 buffer_frames장만 유지하고 오래된 프레임부터 버린다 (처리가 느려도 지연이 쌓이지 않음).
+      drop_policy가 latest면 read()가 항상 가장 최근 프레임을 주고 밀린 프레임은 버린다 (frames_dropped에 셈).
+    - 읽기 실패/끊김이면 backoff(최소, 최대 초)로 간격을 두 배씩 늘리며 다시 연결한다. 성공하면 최소로 되돌림.
+    - stall_timeout 동안 새 프레임이 없으면 SOURCE_STALLED로 표시하고, 읽기가 돌아오면 다시 연결한다.
+    - 파일은 realtime이면 원래 FPS 속도로 내보내고, 끝나면 loop에 따라 처음부터 또는 SOURCE_ENDED.
+    - size(너비, 높이)/fps를 주면 장치는 그 모드로 열고(negotiate), 협상이 안 되는 파일/URL은
+      fps를 넘는 프레임을 grab()만 하고 버려 색 변환을 생략하며, 목표보다 크면 미리 할당한 버퍼로 한 번만 줄인다.
+    read()는 (BGR 프레임, 수신 시각 epoch 초) 또는 새 프레임이 없으면 (None, None)을 반환한다.
+    heartbeat는 읽기 스레드가 마지막으로 살아 있음을 알린 monotonic 시각 (열기/읽기/재연결 대기마다 갱신)으로,
+    이 값이 오래 멈춰 있으면 드라이버 호출에서 멈춘 것이다 (Watchdog가 소스를 새로 연다).
+    줄인 프레임은 버퍼를 돌려 쓰므로 buffer_frames + 2번 읽기 뒤에는 덮어써진다 (보관하려면 복사할 것).
+    """
+
+    def __init__(self, spec, buffer_frames=2, low_latency=True, hw_decode=True, stall_timeout=5.0,
+                 backoff=(0.5, 30.0), realtime=True, loop=False, size=None, fps=0, drop_policy=DROP_OLDEST):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"알 수 없는 drop_policy: {drop_policy}")
+        self.spec = parse_source(spec)
+        self.drop_policy = drop_policy
+        self.size = tuple(size) if size else None
+        self.target_fps = fps
+        # 장치 협상 결과 (너비, 높이, FPS, 픽셀 형식)
+        self.negotiated = None
+        self._renegotiate = False
+        self._resize_buffers = []
+        self._resize_index = 0
+        self.low_latency = low_latency
+        self.hw_decode = hw_decode
+        self.stall_timeout = stall_timeout
+        self.backoff = backoff
+        self.realtime = realtime
+        self.loop = loop
+        self.is_file = isinstance(self.spec, str) and not is_network(self.spec)
+        self.state = SOURCE_CONNECTING
+        self.last_error = None
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.reconnects = 0
+        self.fps = 0.0
+        self.frame_size = None
+        self._last_frame = None
+        self.heartbeat = time.monotonic()
+        self._frames = deque(maxlen=max(1, buffer_frames))
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"source-{self.spec}", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self, timeout=2.0):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.state = SOURCE_CLOSED
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def stalled(self):
+        return self.state == SOURCE_STALLED
+
+    @property
+    def depth(self):
+        """버퍼에 쌓인 (아직 읽지 않은) 프레임 수"""
+        return len(self._frames)
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def retarget(self, size=None, fps=0):
+        """실행 중에 목표 크기/FPS를 바꿈 (다시 연결하지 않음, 장치는 읽기 스레드가 다음 프레임 전에 다시 협상)"""
+        self.size = tuple(size) if size else None
+        self.target_fps = fps
+        if isinstance(self.spec, int) and self.size:
+            self._renegotiate = True
+
+    def read(self, timeout=1.0):
+        with self._cond:
+            self._cond.wait_for(lambda: self._frames or self._stop.is_set() or self.state == SOURCE_ENDED, timeout)
+            if self._frames:
+                if self.drop_policy == DROP_LATEST:
+                    self.frames_dropped += len(self._frames) - 1
+                    item = self._frames.pop()
+                    self._frames.clear()
+                    return item
+                return self._frames.popleft()
+        # 연결은 살아 있는데 프레임이 안 오면 멈춤으로 표시
+        if (self.state == SOURCE_STREAMING and self._last_frame is not None
+                and time.monotonic() - self._last_frame > self.stall_timeout):
+            self.state = SOURCE_STALLED
+        return None, None
+
+    def _fit(self, frame):
+        """목표보다 크면 (비율 유지, 짧은 변 = 목표의 짧은 변) 돌려 쓰는 버퍼 중 하나로 한 번만 줄인다
+
+        비정수 배율의 INTER_AREA는 원본 크기에서 매우 느리므로 여기서는 선형 보간을 쓰고,
+        모델 입력으로의 마지막 축소(letterbox)가 INTER_AREA로 앨리어싱을 처리한다.
+        """
+        if self.size is None:
+            return frame
+        h, w = frame.shape[:2]
+        scale = min(self.size) / min(w, h)
+        if scale >= 1.0:
+            return frame
+        size = (round(w * scale), round(h * scale))
+        shape = (size[1], size[0]) + frame.shape[2:]
+        if not self._resize_buffers or self._resize_buffers[0].shape != shape:
+            count = self._frames.maxlen + 2
+            self._resize_buffers = [np.empty(shape, dtype=frame.dtype) for _ in range(count)]
+        out = self._resize_buffers[self._resize_index]
+        self._resize_index = (self._resize_index + 1) % len(self._resize_buffers)
+        return cv2.resize(frame, size, dst=out, interpolation=cv2.INTER_LINEAR)
+
+    def _push(self, frame):
+        frame = self._fit(frame)
+        now = time.monotonic()
+        with self._cond:
+            if len(self._frames) == self._frames.maxlen:
+                self.frames_dropped += 1
+            self._frames.append((frame, time.time()))
+            self._cond.notify_all()
+        self._last_frame = now
+        self.frames_read += 1
+        self.state = SOURCE_STREAMING
+
+    def _run(self):
+        delay = self.backoff[0]
+        while not self._stop.is_set():
+            self.state = SOURCE_CONNECTING if self.frames_read == 0 else SOURCE_RECONNECTING
+            self.heartbeat = time.monotonic()
+            capture = open_capture(self.spec, self.low_latency, self.hw_decode,
+                                   open_timeout=self.stall_timeout, read_timeout=self.stall_timeout)
+            try:
+                if capture.isOpened():
+                    if isinstance(self.spec, int) and self.size:
+                        self.negotiated = negotiate(capture, self.size, self.target_fps)
+                    self.fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+                    if self._read_loop(capture):
+                        delay = self.backoff[0]
+                    if self.state == SOURCE_ENDED:
+                        return
+                else:
+                    self.last_error = "열기 실패"
+            finally:
+                capture.release()
+            if self._stop.is_set():
+                return
+            self.state = SOURCE_RECONNECTING
+            self.reconnects += 1
+            self.heartbeat = time.monotonic() + delay
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.backoff[1])
+
+    def _read_loop(self, capture):
+        """끊길 때까지 읽는다. 프레임을 하나라도 받았으면 True"""
+        received = False
+        interval = 1.0 / self.fps if self.realtime and self.is_file and self.fps > 0 else 0.0
+        next_time = time.monotonic()
+        credit = 0.0
+        while not self._stop.is_set():
+            self.heartbeat = time.monotonic()
+            if self._renegotiate:
+                self._renegotiate = False
+                self.negotiated = negotiate(capture, self.size, self.target_fps)
+                self.fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+            # 원본 FPS가 목표보다 높으면 일부 프레임은 grab()만 (디코딩 후 색 변환/복사 생략, 목표는 retarget으로 바뀔 수 있음)
+            keep_every = self.fps / self.target_fps if self.target_fps and self.fps > self.target_fps else 1.0
+            credit += 1.0
+            if credit < keep_every:
+                ok, frame = capture.grab(), None
+            else:
+                credit -= keep_every
+                ok, frame = capture.read()
+            if ok and frame is None:
+                if interval:
+                    next_time += interval
+                    self._stop.wait(max(0.0, next_time - time.monotonic()))
+                continue
+            if not ok:
+                if self.is_file and received:
+                    if not self.loop:
+                        self.state = SOURCE_ENDED
+                        with self._cond:
+                            self._cond.notify_all()
+                        return received
+                    capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    continue
+                self.last_error = "읽기 실패"
+                return received
+            if (self._last_frame is not None and received
+                    and time.monotonic() - self._last_frame > self.stall_timeout):
+                # 읽기가 오래 막혔다 돌아옴 → 멈춘 스트림으로 보고 새로 연결
+                self.last_error = "스트림 멈춤"
+                self.state = SOURCE_STALLED
+                return received
+            received = True
+            self.frame_size = (frame.shape[1], frame.shape[0])
+            self._push(frame)
+            if interval:
+                next_time += interval
+                self._stop.wait(max(0.0, next_time - time.monotonic()))
+        return received
@@ -0,0 +1,168 @@
+"""IP 카메라 대역 MJPEG(HTTP) 테스트 스트림 서버
+
+    python -m script.streamserver clip.mp4 --port 8081 --fps 15
+    python -m script.streamserver --port 8081            # 합성 영상
+
+http://127.0.0.1:8081/stream.mjpg 로 multipart/x-mixed-replace JPEG 스트림을 보낸다.
+카메라 설정의 source에 이 주소를 넣으면 실제 IP 카메라 없이 수신/재연결/멈춤 감지를 확인할 수 있다.
+StreamServer.disconnect()는 접속을 끊고(네트워크 끊김), stall(초)는 연결을 유지한 채 프레임만 멈춘다.
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+BOUNDARY = b"frame"
+
+
+def synthetic_frames(width=640, height=480):
+    """프레임 번호와 움직이는 막대가 있는 합성 영상 (무한)"""
+    index = 0
+    while True:
+        frame = np.full((height, width, 3), 40, dtype=np.uint8)
+        x = index * 8 % width
+        cv2.rectangle(frame, (x, height // 4), (x + 40, height * 3 // 4), (0, 200, 255), -1)
+        cv2.putText(frame, str(index), (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+        yield frame
+        index += 1
+
+
+def video_frames(path):
+    """영상 파일을 끝나면 처음부터 반복"""
+    capture = cv2.VideoCapture(path)
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, frame = capture.read()
+                if not ok:
+                    return
+            yield frame
+    finally:
+        capture.release()
+
+
+class StreamServer:
+    """프레임 생성 스레드 하나가 JPEG를 만들고, 접속자마다 최신 JPEG를 보낸다"""
+
+    def __init__(self, frames=None, port=8081, address="127.0.0.1", fps=15.0, quality=80):
+        self.frames = frames if frames is not None else synthetic_frames()
+        self.fps = fps
+        self.quality = quality
+        self.frame_count = 0
+        self._jpeg = None
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._stall_until = 0.0
+        self._generation = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path != "/stream.mjpg":
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY.decode()}")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                server._stream(self)
+
+        self.httpd = ThreadingHTTPServer((address, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.url = f"http://{address}:{self.port}/stream.mjpg"
+        self._threads = []
+
+    def _produce(self):
+        interval = 1.0 / self.fps
+        next_time = time.monotonic()
+        for frame in self.frames:
+            if self._stop.is_set():
+                return
+            if time.monotonic() >= self._stall_until:
+                ok, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                if ok:
+                    with self._cond:
+                        self._jpeg = data.tobytes()
+                        self.frame_count += 1
+                        self._cond.notify_all()
+            next_time += interval
+            self._stop.wait(max(0.0, next_time - time.monotonic()))
+
+    def _stream(self, handler):
+        generation = self._generation
+        seen = 0  # frame_count 0 = 아직 프레임 없음
+        while not self._stop.is_set():
+            with self._cond:
+                self._cond.wait_for(lambda: self.frame_count != seen or self._stop.is_set()
+                                    or self._generation != generation, 1.0)
+                if self._generation != generation:
+                    return
+                if self.frame_count == seen:
+                    continue
+                seen, data = self.frame_count, self._jpeg
+            try:
+                handler.wfile.write(b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\n"
+                                    + f"Content-Length: {len(data)}\r\n\r\n".encode() + data + b"\r\n")
+                handler.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+    def start(self):
+        for target in (self._produce, self.httpd.serve_forever):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def disconnect(self):
+        """현재 접속을 모두 끊는다 (접속자는 다시 연결해야 함)"""
+        with self._cond:
+            self._generation += 1
+            self._cond.notify_all()
+
+    def stall(self, seconds):
+        """연결은 유지한 채 seconds 동안 새 프레임을 보내지 않는다"""
+        self._stall_until = time.monotonic() + seconds
+
+    def stop(self):
+        self._stop.set()
+        self.disconnect()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", nargs="?", help="반복 재생할 영상 (없으면 합성 영상)")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--fps", type=float, default=15.0)
+    args = parser.parse_args()
+
+    frames = video_frames(args.video) if args.video else None
+    with StreamServer(frames, args.port, args.address, args.fps) as server:
+        print(f"스트림: {server.url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
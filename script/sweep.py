@@ -0,0 +1,388 @@
+"""녹화된 포즈 로그로 detect_fall 임계값 조합을 병렬로 훑어 오경보율/감지 지연의 파레토 앞면을 구함
+
+    python -m script.sweep logs/*.npz --max-false-alarms 0.5 --name swept
+    python -m script.sweep logs/ --grid lying_confidence=0.4:0.8:0.05 --grid min_visibility=0.5 --dry-run
+
+낙상 판정(is_fall)에 쓰이는 값은 min_visibility, lying_shoulder_hip, lying_knee_shoulder, lying_confidence뿐이다
+(upright/unstable 임계값은 주의/정상 문구만 바꾸므로 기준 프로필 값을 그대로 둔다).
+1. 포즈 로그를 한 번 읽어 min_visibility 값마다 CameraMonitor와 같은 One-Euro 필터를 거친 뒤
+   프레임별 |어깨-엉덩이|, 무릎-어깨, 평균 신뢰도를 PoseFrame으로 계산해 공유 메모리 배열에 올린다
+   (판단 불가 프레임은 |어깨-엉덩이| = inf로 두어 어떤 조합에서도 낙상이 아니게 함).
+2. 작업 프로세스들이 공유 배열을 복사 없이 붙여 조합 묶음마다 (조합, 프레임) 낙상 판정을 한 번에 계산하고,
+   script.evaluate와 같은 사건 단위 기준으로 경보/오경보/재현율/지연을 센다.
+3. 재현율이 min_recall 이상인 조합 중 (시간당 오경보, 평균 지연) 파레토 앞면을 출력하고,
+   오경보가 max_false_alarms 이하인 것 중 지연이 가장 짧은 조합을 설정 파일의 [profiles.<name>]으로 쓴다.
+"""
+import argparse
+import dataclasses
+import itertools
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from script.config import DEFAULT_CONFIG_PATH, DetectionProfile, load_config
+from script.evaluate import collect
+from script.features import POSE_NONE, POSE_VALID, PoseFrame
+from script.poselog import load_poselog
+from script.smoothing import OneEuroFilter
+
+# 훑을 항목과 기본 값 범위 (min_visibility는 필터/특징을 값마다 따로 준비하므로 몇 개만)
+SWEEP_PARAMETERS = ("min_visibility", "lying_shoulder_hip", "lying_knee_shoulder", "lying_confidence")
+DEFAULT_GRID = {
+    "min_visibility": (0.4, 0.5, 0.6),
+    "lying_shoulder_hip": tuple(np.round(np.arange(0.05, 0.3001, 0.0125), 4)),
+    "lying_knee_shoulder": tuple(np.round(np.arange(0.1, 0.5001, 0.02), 4)),
+    "lying_confidence": tuple(np.round(np.arange(0.3, 0.9001, 0.05), 4)),
+}
+
+# 조합 하나의 결과 (오경보는 시간당, 지연은 찾은 낙상의 평균/최대 초)
+Candidate = namedtuple(
+    "Candidate", "params alarms false_alarms false_alarm_rate detected recall delay_mean delay_max"
+)
+
+
+class PoseDataset:
+    """포즈 로그들을 이어 붙인 공유 메모리 배열
+
+    features   (V, 3, T) float32  min_visibility 값별 [|어깨-엉덩이|, 무릎-어깨, 평균 신뢰도]
+    first      (T,) bool          로그의 첫 프레임 (경보 구간이 로그 경계를 넘지 않게)
+    near_fall  (T,) bool          주석 낙상 구간(앞뒤 tolerance 포함) 안의 프레임
+    timestamps (T,) float64
+    falls      (K, 3) float64     주석 구간별 [시작 시각, 창 첫 프레임, 창 끝 프레임(제외)]
+    """
+
+    ARRAYS = ("features", "first", "near_fall", "timestamps", "falls")
+
+    def __init__(self, arrays, visibilities, hours, blocks=None):
+        self.arrays = arrays
+        self.visibilities = visibilities
+        self.hours = hours
+        self._blocks = blocks or []
+
+    @classmethod
+    def from_logs(cls, paths, visibilities, tolerance=1.0):
+        chunks = {name: [] for name in cls.ARRAYS}
+        offset, seconds = 0, 0.0
+        for path in paths:
+            poses, timestamps, falls, _ = load_poselog(path)
+            if not len(poses):
+                continue
+            chunks["features"].append(np.stack([frame_features(poses, timestamps, v) for v in visibilities]))
+            first = np.zeros(len(poses), dtype=bool)
+            first[0] = True
+            chunks["first"].append(first)
+            near = np.zeros(len(poses), dtype=bool)
+            for begin, end in falls:
+                lo = np.searchsorted(timestamps, begin - tolerance, side="left")
+                hi = np.searchsorted(timestamps, end + tolerance, side="right")
+                near[lo:hi] = True
+                chunks["falls"].append((begin, offset + lo, offset + hi))
+            chunks["near_fall"].append(near)
+            chunks["timestamps"].append(timestamps)
+            offset += len(poses)
+            seconds += float(timestamps[-1] - timestamps[0])
+        if not offset:
+            raise ValueError("포즈 로그에 프레임이 없습니다.")
+        arrays = {
+            "features": np.concatenate(chunks["features"], axis=2).astype(np.float32),
+            "first": np.concatenate(chunks["first"]),
+            "near_fall": np.concatenate(chunks["near_fall"]),
+            "timestamps": np.concatenate(chunks["timestamps"]).astype(np.float64),
+            "falls": np.array(chunks["falls"], dtype=np.float64).reshape(-1, 3),
+        }
+        return cls(arrays, tuple(visibilities), seconds / 3600)
+
+    def share(self):
+        """배열을 공유 메모리로 옮기고 작업 프로세스가 붙을 때 쓸 (이름, 모양, dtype) 목록을 반환"""
+        specs = {}
+        for name, array in self.arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            shared = np.ndarray(array.shape, array.dtype, buffer=block.buf)
+            shared[...] = array
+            self.arrays[name] = shared
+            self._blocks.append(block)
+            specs[name] = (block.name, array.shape, array.dtype.str)
+        return specs, self.visibilities, self.hours
+
+    @classmethod
+    def attach(cls, specs, visibilities, hours):
+        blocks, arrays = [], {}
+        for name, (block_name, shape, dtype) in specs.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks.append(block)
+            arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        return cls(arrays, visibilities, hours, blocks)
+
+    def close(self, unlink=False):
+        self.arrays = {}
+        for block in self._blocks:
+            block.close()
+            if unlink:
+                block.unlink()
+        self._blocks = []
+
+    @property
+    def frames(self):
+        return self.arrays["timestamps"].shape[0]
+
+
+def frame_features(poses, timestamps, min_visibility):
+    """(3, T) [|어깨-엉덩이|, 무릎-어깨, 평균 신뢰도], 판단 불가(POSE_VALID 아님) 프레임은 [inf, inf, 0]
+
+    CameraMonitor/evaluate.replay와 같은 필터와 PoseFrame 값을 쓰므로 detect_fall과 판정이 같다.
+    """
+    smoother = OneEuroFilter()
+    out = np.empty((3, len(poses)), dtype=np.float32)
+    out[0], out[1], out[2] = np.inf, np.inf, 0.0
+    for i, (pose, t) in enumerate(zip(poses, timestamps)):
+        pose = smoother(pose, t).copy() if pose[:, 3].any() else None
+        frame = PoseFrame(i, t, pose, min_visibility)
+        if frame.state == POSE_NONE:
+            smoother.reset()
+        elif frame.state == POSE_VALID:
+            out[:, i] = abs(frame.shoulder_hip_diff), frame.knee_shoulder_diff, frame.mean_confidence
+    return out
+
+
+def score_combinations(dataset, combos):
+    """combos (C, 4) [visibility 인덱스, lying_shoulder_hip, lying_knee_shoulder, lying_confidence]
+    → (C, 5) [경보, 맞은 경보, 찾은 낙상, 지연 합, 지연 최대]
+
+    (조합, 프레임) 판정 행렬로 한 번에 계산한다: 경보 = 낙상 판정이 시작된 프레임 (로그 첫 프레임은 새로 시작),
+    맞은 경보 = 주석 창 안에 든 프레임이 하나라도 있는 경보 구간, 지연 = 주석 시작 → 창 안의 첫 낙상 판정.
+    """
+    arrays = dataset.arrays
+    features, first, near, timestamps, falls = (arrays[name] for name in PoseDataset.ARRAYS)
+    out = np.zeros((len(combos), 5))
+    for v in np.unique(combos[:, 0]).astype(int):
+        rows = np.flatnonzero(combos[:, 0] == v)
+        shoulder_hip, knee_shoulder, confidence = features[v]
+        params = combos[rows, 1:, None]
+        fall = (shoulder_hip < params[:, 0]) & (knee_shoulder < params[:, 1]) & (confidence > params[:, 2])
+
+        previous = np.zeros_like(fall)
+        previous[:, 1:] = fall[:, :-1]
+        previous[:, first] = False
+        starts = fall & ~previous
+        run = np.cumsum(starts, axis=1, dtype=np.int32)
+        # 경보 구간마다 주석 창 안 프레임이 처음 나온 곳만 세서 구간당 한 번
+        hit_run = np.where(fall & near, run, 0)
+        seen = np.zeros_like(hit_run)
+        seen[:, 1:] = np.maximum.accumulate(hit_run, axis=1)[:, :-1]
+        out[rows, 0] = starts.sum(axis=1)
+        out[rows, 1] = ((hit_run > 0) & (hit_run != seen)).sum(axis=1)
+
+        delay_max = np.zeros(len(rows))
+        for begin, lo, hi in falls:
+            window = fall[:, int(lo):int(hi)]
+            found = window.any(axis=1)
+            delay = np.maximum(0.0, timestamps[int(lo) + window.argmax(axis=1)] - begin)
+            out[rows, 2] += found
+            out[rows, 3] += np.where(found, delay, 0.0)
+            delay_max = np.maximum(delay_max, np.where(found, delay, 0.0))
+        out[rows, 4] = delay_max
+    return out
+
+
+_dataset = None
+
+
+def _attach(specs, visibilities, hours):
+    global _dataset
+    _dataset = PoseDataset.attach(specs, visibilities, hours)
+
+
+def _score_task(combos):
+    # (조합 수 × 프레임) 판정 행렬이 커지지 않게 나눠 계산
+    step = max(1, (1 << 23) // max(_dataset.frames, 1))
+    return np.concatenate([score_combinations(_dataset, combos[i:i + step]) for i in range(0, len(combos), step)])
+
+
+def parse_grid(items, base=DEFAULT_GRID):
+    """'이름=값', '이름=a,b,c', '이름=시작:끝:간격' 목록으로 기본 범위를 바꾼 grid"""
+    grid = dict(base)
+    for item in items or ():
+        name, _, spec = item.partition("=")
+        if name not in SWEEP_PARAMETERS:
+            raise ValueError(f"훑을 수 없는 항목: {name} ({', '.join(SWEEP_PARAMETERS)} 중 하나)")
+        if ":" in spec:
+            start, stop, step = (float(v) for v in spec.split(":"))
+            values = np.arange(start, stop + step / 2, step)
+        else:
+            values = [float(v) for v in spec.split(",")]
+        grid[name] = tuple(np.round(values, 4))
+    return grid
+
+
+def sweep(paths, grid=DEFAULT_GRID, jobs=None, tolerance=1.0):
+    """grid의 모든 조합을 평가한 Candidate 목록과 (프레임 수, 시간)"""
+    visibilities = grid["min_visibility"]
+    dataset = PoseDataset.from_logs(paths, visibilities, tolerance)
+    combos = np.array(list(itertools.product(
+        range(len(visibilities)), grid["lying_shoulder_hip"], grid["lying_knee_shoulder"], grid["lying_confidence"],
+    )), dtype=np.float64)
+    jobs = jobs or os.cpu_count() or 1
+    try:
+        if jobs > 1:
+            specs = dataset.share()
+            parts = [part for part in np.array_split(combos, jobs * 4) if len(part)]
+            with ProcessPoolExecutor(jobs, initializer=_attach, initargs=specs) as executor:
+                scores = np.concatenate(list(executor.map(_score_task, parts)))
+        else:
+            global _dataset
+            _dataset = dataset
+            scores = _score_task(combos)
+        frames, hours, total_falls = dataset.frames, dataset.hours, len(dataset.arrays["falls"])
+    finally:
+        dataset.close(unlink=True)
+
+    candidates = []
+    for combo, (alarms, correct, detected, delay_sum, delay_max) in zip(combos, scores):
+        params = dict(zip(SWEEP_PARAMETERS, (float(visibilities[int(combo[0])]), *combo[1:].round(4).tolist())))
+        false_alarms = int(alarms - correct)
+        candidates.append(Candidate(
+            params, int(alarms), false_alarms, false_alarms / hours if hours else float("nan"), int(detected),
+            detected / total_falls if total_falls else float("nan"),
+            delay_sum / detected if detected else float("nan"), delay_max if detected else float("nan"),
+        ))
+    return candidates, frames, hours
+
+
+def pareto_front(candidates, min_recall=0.9):
+    """재현율 min_recall 이상 중 (시간당 오경보, 평균 지연)이 다른 조합에 모두 뒤지지 않는 것 (오경보 오름차순)"""
+    eligible = [c for c in candidates if c.recall >= min_recall and c.delay_mean == c.delay_mean]
+    front, best_delay = [], float("inf")
+    for candidate in sorted(eligible, key=lambda c: (c.false_alarm_rate, c.delay_mean, -c.recall)):
+        if candidate.delay_mean < best_delay:
+            front.append(candidate)
+            best_delay = candidate.delay_mean
+    return front
+
+
+def choose(front, max_false_alarms=1.0):
+    """오경보가 max_false_alarms/시간 이하인 것 중 지연이 가장 짧은 조합 (없으면 오경보가 가장 적은 것)"""
+    allowed = [c for c in front if c.false_alarm_rate <= max_false_alarms]
+    return allowed[-1] if allowed else (front[0] if front else None)
+
+
+def _section_span(text, name):
+    """[profiles.<name>] 절의 (시작, 끝) 위치: 머리줄부터 마지막 키/값 줄까지 (없으면 None)
+
+    다음 절 앞의 빈 줄/주석은 다음 절의 것으로 보고 범위에 넣지 않는다.
+    """
+    match = re.compile(rf"^\[profiles\.{re.escape(name)}\][ \t]*$", re.MULTILINE).search(text)
+    if not match:
+        return None
+    following = re.compile(r"^[ \t]*\[", re.MULTILINE).search(text, match.end())
+    limit = following.start() if following else len(text)
+    end = match.end()
+    for line in re.compile(r"^[ \t]*[^\s#].*$", re.MULTILINE).finditer(text, match.end(), limit):
+        end = line.end()
+    return match.start(), end
+
+
+def write_profile(path, name, profile):
+    """설정 파일의 [profiles.<name>] 절을 profile 값으로 바꾸거나 끝에 추가 (다른 절과 주석은 그대로)
+
+    절의 머리줄부터 마지막 키/값 줄까지만 바꾸며, 그 밖의 내용이 바이트 단위로 같은지 확인한다.
+    임시 파일에 쓴 뒤 load_config로 확인하고 바꿔 넣으므로, 실행 중인 ConfigWatcher가 반쯤 쓴 파일을 읽지 않는다.
+    """
+    values = {f.name: getattr(profile, f.name) for f in dataclasses.fields(DetectionProfile) if f.name != "name"}
+    section = "\n".join([f"[profiles.{name}]"] + [
+        f"{key} = {str(value).lower() if isinstance(value, bool) else repr(value)}" for key, value in values.items()
+    ])
+    text = ""
+    if os.path.exists(path):
+        with open(path, encoding="utf-8", newline="") as f:
+            text = f.read()
+    span = _section_span(text, name)
+    if span:
+        start, end = span
+        new_text = text[:start] + section + text[end:]
+        new_start, new_end = _section_span(new_text, name)
+        if new_text[:new_start] != text[:start] or new_text[new_end:] != text[end:]:
+            raise ValueError(f"[profiles.{name}] 절 밖의 내용이 바뀌어 쓰지 않았습니다: {path}")
+    else:
+        new_text = text.rstrip("\n") + ("\n\n" if text else "") + section + "\n"
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8", newline="") as f:
+        f.write(new_text)
+    try:
+        load_config(temporary)
+    except Exception:
+        os.remove(temporary)
+        raise
+    os.replace(temporary, path)
+
+
+def _fmt(value, pattern):
+    return "-" if value != value else format(value, pattern)
+
+
+def format_front(front, chosen=None):
+    header = (f"{'':1} {'vis':>4} {'어깨-엉덩이':>6} {'무릎-어깨':>6} {'신뢰도':>6} | {'경보':>4} | {'오경보/h':>8} | "
+              f"{'재현율':>6} | {'지연 평균/최대':>13}")
+    lines = [header, "-" * len(header)]
+    for c in front:
+        p = c.params
+        delay = f"{_fmt(c.delay_mean, '.2f')}/{_fmt(c.delay_max, '.2f')}s"
+        lines.append(
+            f"{'*' if c is chosen else ' ':1} {p['min_visibility']:>4.2f} {p['lying_shoulder_hip']:>10.4f} "
+            f"{p['lying_knee_shoulder']:>9.4f} {p['lying_confidence']:>9.4f} | {c.alarms:>4} | "
+            f"{_fmt(c.false_alarm_rate, '.2f'):>8} | {_fmt(c.recall, '.3f'):>6} | {delay:>13}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="+", help="포즈 로그(.npz, 낙상 구간 주석 포함) 또는 디렉터리")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="기준 프로필을 읽고 결과를 쓸 설정 파일")
+    parser.add_argument("--base", default="default", help="훑지 않는 항목을 가져올 기준 프로필")
+    parser.add_argument("--name", default="swept", help="결과를 쓸 프로필 이름")
+    parser.add_argument("--grid", action="append", metavar="항목=범위",
+                        help="값 범위 바꾸기: 0.5 | 0.4,0.5 | 0.05:0.3:0.01 (여러 번 지정 가능)")
+    parser.add_argument("--min-recall", type=float, default=0.9)
+    parser.add_argument("--max-false-alarms", type=float, default=1.0, help="허용할 시간당 오경보")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="주석 구간 앞뒤 허용 오차 (초)")
+    parser.add_argument("--jobs", type=int, default=None, help="작업 프로세스 수 (기본 = CPU 수)")
+    parser.add_argument("--dry-run", action="store_true", help="설정 파일에 쓰지 않음")
+    args = parser.parse_args()
+
+    paths = [path for path in collect(args.logs) if path.endswith(".npz")]
+    if not paths:
+        parser.error("포즈 로그(.npz)가 없습니다.")
+    config = load_config(args.config)
+    if args.base not in config.profiles:
+        parser.error(f"설정에 없는 프로필: {args.base}")
+    grid = parse_grid(args.grid)
+    count = int(np.prod([len(values) for values in grid.values()]))
+
+    start = time.perf_counter()
+    candidates, frames, hours = sweep(paths, grid, args.jobs, args.tolerance)
+    elapsed = time.perf_counter() - start
+    print(f"로그 {len(paths)}개 ({frames}프레임, {hours:.2f}시간) × 조합 {count}개: {elapsed:.1f}초 "
+          f"({count * frames / elapsed / 1e6:.1f}M 조합·프레임/초)")
+
+    front = pareto_front(candidates, args.min_recall)
+    if not front:
+        print(f"재현율 {args.min_recall} 이상인 조합이 없습니다. --min-recall이나 --grid 범위를 조정하세요.")
+        return
+    chosen = choose(front, args.max_false_alarms)
+    print(format_front(front, chosen))
+    profile = dataclasses.replace(config.profiles[args.base], name=args.name, **chosen.params)
+    profile.validate()
+    if args.dry_run:
+        print(f"선택: {chosen.params} (--dry-run, 저장 안 함)")
+    else:
+        write_profile(args.config, args.name, profile)
+        print(f"선택: {chosen.params} → {args.config} [profiles.{args.name}]")
+
+
+if __name__ == "__main__":
+    main()
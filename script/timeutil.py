@@ -0,0 +1,15 @@
+import datetime
+from zoneinfo import ZoneInfo
+
+KST = ZoneInfo("Asia/Seoul")
+
+
+# epoch 초 → KST 문자열 (표시/내보내기 시점에만 호출)
+def format_kst(ts, fmt="%Y-%m-%d %H:%M:%S"):
+    return datetime.datetime.fromtimestamp(ts, KST).strftime(fmt)
+
+
+# KST 기준 날짜의 자정 epoch 초
+def kst_day_start(ts):
+    day = datetime.datetime.fromtimestamp(ts, KST).replace(hour=0, minute=0, second=0, microsecond=0)
+    return day.timestamp()
@@ -0,0 +1,78 @@
+import threading
+import time
+
+
+class Watchdog:
+    """CameraMonitor 감시 스레드
+
+    interval마다 단계별 진행 상태(heartbeat)와 입력 버퍼를 확인해 지표(게이지)를 갱신하고,
+    - 분석 스레드의 한 단계(추론, 전달 등)가 inference_timeout초 넘게 끝나지 않거나
+      분석 스레드가 오류로 끝났으면 분석 스레드를 새로 시작하고 (monitor.restart_worker)
+    - 입력 읽기 스레드가 capture_timeout초 넘게 응답이 없으면 입력을 새로 연다 (monitor.reopen_source).
+    제한 시간은 카메라 설정(inference_timeout, capture_timeout)을 매번 읽으므로 실행 중에 바꿀 수 있다.
+    재시작은 제한 시간 + interval 안에 이루어지며, 재시작한 뒤 grace초 동안은 같은 조치를 반복하지 않는다.
+    """
+
+    def __init__(self, monitor, interval=1.0, grace=5.0):
+        self.monitor = monitor
+        self.interval = interval
+        self.grace = grace
+        self._thread = None
+        self._last_action = 0.0
+        self._frames = 0
+        self._frames_at = time.monotonic()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=f"watchdog-{self.monitor.camera_id}", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        monitor = self.monitor
+        # 모니터가 멈추면 끝남 (멈췄다 바로 다시 켜진 경우는 계속 감시)
+        while not (monitor._stop.is_set() and not monitor.running):
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as exc:
+                monitor.metrics.event("watchdog_error", f"{type(exc).__name__}: {exc}", camera=monitor.camera_id)
+
+    def check(self, now=None):
+        """한 번 점검하고 취한 조치 이름(없으면 None)을 반환"""
+        monitor = self.monitor
+        metrics = monitor.metrics
+        camera_id = monitor.camera_id
+        now = time.monotonic() if now is None else now
+        camera = monitor.config_watcher.current.camera(camera_id)
+
+        # 지표: 입력 버퍼 깊이/버린 프레임/재연결, 처리 FPS, 단계별 마지막 완료 후 경과 시간
+        video = monitor.video
+        if video is not None:
+            metrics.set("fallwatch_queue_depth", video.depth, camera=camera_id)
+            metrics.set("fallwatch_frames_dropped", video.frames_dropped, camera=camera_id)
+            metrics.set("fallwatch_source_reconnects", video.reconnects, camera=camera_id)
+            metrics.set("fallwatch_capture_heartbeat_age_seconds", max(0.0, now - video.heartbeat), camera=camera_id)
+        seq = monitor._seq
+        if now > self._frames_at:
+            metrics.set("fallwatch_processed_fps", (seq - self._frames) / (now - self._frames_at), camera=camera_id)
+        self._frames, self._frames_at = seq, now
+        for name, beat in list(monitor.heartbeats.items()):
+            metrics.set("fallwatch_stage_heartbeat_age_seconds", now - beat, camera=camera_id, stage=name)
+        metrics.set("fallwatch_viewers", monitor.viewers, camera=camera_id)
+
+        if monitor._stop.is_set() or now - self._last_action < self.grace:
+            return None
+        action = None
+        stage = monitor.current_stage
+        if stage is not None and now - stage[1] > camera.inference_timeout:
+            action = "worker"
+            monitor.restart_worker(f"'{stage[0]}' 단계 {now - stage[1]:.0f}초 멈춤")
+        elif monitor._thread is not None and not monitor.running and monitor.error:
+            action = "worker"
+            monitor.restart_worker(f"분석 스레드 오류 ({monitor.error})")
+        elif video is not None and video.alive and now - video.heartbeat > camera.capture_timeout:
+            action = "source"
+            monitor.reopen_source(f"입력 읽기 {now - video.heartbeat:.0f}초 응답 없음")
+        if action:
+            self._last_action = now
+        return action
@@ -3,10 +3,13 @@ import cv2
 import time
 import psutil
 import numpy as np
-import mediapipe as mp
-import datetime
-from zoneinfo import ZoneInfo
-from getposedata import process_frame
+from script.backends import create_backend
+from script.detector import detect_fall, POSE_STATE_LABELS
+from script.features import PoseFrame
+from script.eventstore import Event, STATUS_CLASS, STATUS_INFO, status_code
+from script.render import HistoryRenderer, LandmarkTableRenderer
+from script.overlay import PreviewRenderer
+from script.timeutil import format_kst
 
 # 페이지 설정
 st.set_page_config(
@@ -93,114 +96,28 @@ if 'last_status' not in st.session_state:
 if 'camera_active' not in st.session_state:
     st.session_state.camera_active = False
 
-# 현재 시간(KST) 설정
-kst_now = datetime.datetime.now(ZoneInfo("Asia/Seoul"))
-timestamp = kst_now.strftime("%Y-%m-%d %H:%M:%S")
+# 화면 조각 렌더러 (템플릿/기록 줄은 세션 동안 재사용)
+if 'landmark_renderer' not in st.session_state:
+    st.session_state.landmark_renderer = LandmarkTableRenderer(show_occluded=False)
 
-# 낙상 감지 함수 (기존 코드와 동일)
-def detect_fall(landmarks):
-    """MediaPipe 관절 좌표를 기반으로 낙상 상태를 감지하는 함수"""
-    if not landmarks:
-        return "정상: 감지 중", False
-    
-    # 필요한 관절 좌표 추출
-    key_points = [
-        mp.solutions.pose.PoseLandmark.LEFT_SHOULDER,
-        mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER,
-        mp.solutions.pose.PoseLandmark.LEFT_HIP,
-        mp.solutions.pose.PoseLandmark.RIGHT_HIP,
-        mp.solutions.pose.PoseLandmark.LEFT_KNEE,
-        mp.solutions.pose.PoseLandmark.RIGHT_KNEE,
-        mp.solutions.pose.PoseLandmark.LEFT_ANKLE,
-        mp.solutions.pose.PoseLandmark.RIGHT_ANKLE
-    ]
-    
-    # 필요한 관절이 모두 감지되었는지 확인
-    if not all(point.value in landmarks.landmark for point in key_points):
-        return "주의: 일부 관절 감지 불가", False
-    
-    left_shoulder_y = landmarks.landmark[mp.solutions.pose.PoseLandmark.LEFT_SHOULDER.value].y
-    right_shoulder_y = landmarks.landmark[mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER.value].y
-    left_hip_y = landmarks.landmark[mp.solutions.pose.PoseLandmark.LEFT_HIP.value].y
-    right_hip_y = landmarks.landmark[mp.solutions.pose.PoseLandmark.RIGHT_HIP.value].y
-    
-    shoulder_hip_diff = ((left_shoulder_y + right_shoulder_y) / 2) - ((left_hip_y + right_hip_y) / 2)
-    abs_shoulder_hip_diff = abs(shoulder_hip_diff)
-    
-    left_knee_y = landmarks.landmark[mp.solutions.pose.PoseLandmark.LEFT_KNEE.value].y
-    right_knee_y = landmarks.landmark[mp.solutions.pose.PoseLandmark.RIGHT_KNEE.value].y
-    left_ankle_y = landmarks.landmark[mp.solutions.pose.PoseLandmark.LEFT_ANKLE.value].y
-    right_ankle_y = landmarks.landmark[mp.solutions.pose.PoseLandmark.RIGHT_ANKLE.value].y
-    
-    confidences = [landmarks.landmark[point.value].visibility for point in key_points]
-    avg_confidence = sum(confidences) / len(confidences)
-    
-    if abs_shoulder_hip_diff < 0.15 and avg_confidence > 0.6:
-        knee_ankle_shoulder_diff = abs(((left_knee_y + right_knee_y) / 2) - ((left_shoulder_y + right_shoulder_y) / 2))
-        
-        if knee_ankle_shoulder_diff < 0.3:
-            return "위험: 낙상 감지됨", True
-        else:
-            return "주의: 비정상적 자세", False
-    
-    elif shoulder_hip_diff < -0.2 and avg_confidence > 0.7:
-        return "정상: 안정적 자세", False
-    
-    elif abs_shoulder_hip_diff < 0.2 and avg_confidence > 0.7:
-        return "주의: 불안정한 자세", False
-        
-    return "정상: 모니터링 중", False
+if 'history_renderer' not in st.session_state:
+    st.session_state.history_renderer = HistoryRenderer()
 
-# 특정 관절의 정보를 테이블로 표시하는 함수 (기존 코드와 동일)
-def display_landmarks(landmarks):
-    if not landmarks:
-        return "<div class='info-text'>감지된 관절 정보가 없습니다.</div>"
-    
-    key_joints = [
-        (mp.solutions.pose.PoseLandmark.LEFT_SHOULDER, "왼쪽 어깨"),
-        (mp.solutions.pose.PoseLandmark.RIGHT_SHOULDER, "오른쪽 어깨"),
-        (mp.solutions.pose.PoseLandmark.LEFT_HIP, "왼쪽 엉덩이"),
-        (mp.solutions.pose.PoseLandmark.RIGHT_HIP, "오른쪽 엉덩이"),
-        (mp.solutions.pose.PoseLandmark.LEFT_KNEE, "왼쪽 무릎"),
-        (mp.solutions.pose.PoseLandmark.RIGHT_KNEE, "오른쪽 무릎"),
-        (mp.solutions.pose.PoseLandmark.LEFT_ANKLE, "왼쪽 발목"),
-        (mp.solutions.pose.PoseLandmark.RIGHT_ANKLE, "오른쪽 발목")
-    ]
-    
-    table_html = """
-    <table style="width:100%; border-collapse: collapse;">
-      <tr style="background-color: #EEF2FF;">
-        <th style="text-align: left; padding: 0.5rem;">관절</th>
-        <th style="text-align: center; padding: 0.5rem;">X</th>
-        <th style="text-align: center; padding: 0.5rem;">Y</th>
-        <th style="text-align: center; padding: 0.5rem;">Z</th>
-        <th style="text-align: center; padding: 0.5rem;">신뢰도</th>
-      </tr>
-    """
-    
-    for idx, (landmark_id, joint_name) in enumerate(key_joints):
-        if landmark_id.value in landmarks.landmark:
-            landmark = landmarks.landmark[landmark_id.value]
-            
-            confidence_color = "#10B981" if landmark.visibility > 0.7 else \
-                              "#F59E0B" if landmark.visibility > 0.5 else "#EF4444"
-            
-            bg_color = "#F9FAFB" if idx % 2 == 0 else "white"
-            
-            table_html += f"""
-            <tr style="background-color: {bg_color};">
-              <td style="padding: 0.5rem;">{joint_name}</td>
-              <td style="text-align: center; padding: 0.5rem;">{landmark.x:.3f}</td>
-              <td style="text-align: center; padding: 0.5rem;">{landmark.y:.3f}</td>
-              <td style="text-align: center; padding: 0.5rem;">{landmark.z:.3f}</td>
-              <td style="text-align: center; padding: 0.5rem; color: {confidence_color}; font-weight: bold;">
-                {landmark.visibility:.2f}
-              </td>
-            </tr>
-            """
-    
-    table_html += "</table>"
-    return table_html
+if 'preview_renderer' not in st.session_state:
+    st.session_state.preview_renderer = PreviewRenderer()
+
+# 단일 사진 입력이므로 정지 영상 모드 포즈 백엔드 사용 (세션마다 하나)
+def get_backend():
+    if 'pose_backend' not in st.session_state:
+        st.session_state.pose_backend = create_backend("mediapipe-full", static_image_mode=True)
+    return st.session_state.pose_backend
+
+# 상태 기록 추가 (시각은 epoch 초로 두고 표시할 때 KST로 변환)
+def add_history(message, status=None):
+    if status is None:
+        status = status_code(message)
+    st.session_state.history.append(Event(None, "0", time.time(), status, message, None, None))
+    st.session_state.last_status = message
 
 # 제목 표시
 st.markdown("<div class='title'>🛡️ 지능형 노인 낙상 감지 시스템</div>", unsafe_allow_html=True)
@@ -221,11 +138,7 @@ with status_col1:
 
 with status_col2:
     recent_status = st.session_state.last_status
-    status_class = "status-normal"
-    if "주의" in recent_status:
-        status_class = "status-warning"
-    elif "위험" in recent_status or "낙상" in recent_status:
-        status_class = "status-danger"
+    status_class = STATUS_CLASS[status_code(recent_status)]
     
     st.markdown(f"""
     <div class="status-card">
@@ -252,13 +165,7 @@ with col1:
     camera_toggle = st.checkbox("카메라 활성화", value=st.session_state.camera_active)
     if camera_toggle != st.session_state.camera_active:
         st.session_state.camera_active = camera_toggle
-        status_time = datetime.datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
-        if camera_toggle:
-            st.session_state.history.append(f"[{status_time}]: 카메라 활성화")
-            st.session_state.last_status = "카메라 활성화"
-        else:
-            st.session_state.history.append(f"[{status_time}]: 카메라 비활성화")
-            st.session_state.last_status = "카메라 비활성화"
+        add_history("카메라 활성화" if camera_toggle else "카메라 비활성화", status=STATUS_INFO)
     
     # Streamlit의 내장 카메라 컴포넌트 사용
     if st.session_state.camera_active:
@@ -272,22 +179,25 @@ with col1:
             
             # 이미지 처리 및 관절 추출
             try:
-                processed_frame, landmarks = process_frame(frame)
+                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                pose = get_backend().process(image)
+                
+                # 인식 상태/파생값은 이 프레임 객체에 한 번만 계산되어 표시와 감지가 공유
+                frame_features = PoseFrame(0, time.time(), pose)
                 
-                # 결과 이미지 표시
-                st.image(processed_frame, channels="BGR", use_column_width=True)
+                # 결과 이미지 표시 (분석 이미지는 그대로, 줄인 미리보기에만 골격을 그림)
+                st.image(st.session_state.preview_renderer.render(image, frame_features), channels="RGB",
+                         use_column_width=True)
                 
                 # 낙상 상태 체크
-                status, is_fall = detect_fall(landmarks)
-                status_time = datetime.datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y-%m-%d %H:%M:%S")
+                status, is_fall, _ = detect_fall(frame_features)
                 
                 if is_fall:
                     st.session_state.fall_count += 1
                 
                 # 상태가 변경된 경우에만 기록
                 if st.session_state.last_status != status:
-                    st.session_state.history.append(f"[{status_time}]: {status}")
-                    st.session_state.last_status = status
+                    add_history(status)
                     
                     # 히스토리 크기 제한
                     if len(st.session_state.history) > 10:
@@ -296,11 +206,9 @@ with col1:
                 # 관절 정보 업데이트
                 with col2:
                     st.markdown("<div class='subheader'>🦴 관절 정보</div>", unsafe_allow_html=True)
-                    if landmarks:
-                        landmark_table = display_landmarks(landmarks)
-                        st.markdown(landmark_table, unsafe_allow_html=True)
-                    else:
-                        st.markdown("<div class='info-text'>감지된 관절 정보가 없습니다.</div>", unsafe_allow_html=True)
+                    landmark_table, _ = st.session_state.landmark_renderer.render(
+                        frame_features, POSE_STATE_LABELS.get(frame_features.state, ""))
+                    st.markdown(landmark_table, unsafe_allow_html=True)
             except Exception as e:
                 st.error(f"이미지 처리 오류: {str(e)}")
     else:
@@ -332,17 +240,7 @@ with col2:
     
     # 히스토리 표시
     if st.session_state.history:
-        history_html = "<div style='max-height: 300px; overflow-y: auto;'>"
-        for item in reversed(st.session_state.history):
-            status_class = "status-normal"
-            if "주의" in item:
-                status_class = "status-warning"
-            elif "위험" in item or "낙상" in item:
-                status_class = "status-danger"
-                
-            history_html += f"<div class='log-item'><span class='{status_class}'>{item}</span></div>"
-        history_html += "</div>"
-        
+        history_html, _ = st.session_state.history_renderer.render(st.session_state.history)
         st.markdown(history_html, unsafe_allow_html=True)
     else:
         st.markdown("<div class='info-text'>기록된 활동이 없습니다.</div>", unsafe_allow_html=True)
@@ -356,7 +254,7 @@ st.sidebar.metric("메모리 사용량", f"{memory.percent}%")
 # 푸터
 st.markdown(f"""
 <div style="text-align: center; margin-top: 2rem; padding-top: 1rem; border-top: 1px solid #E5E7EB; color: #9CA3AF; font-size: 0.875rem;">
-    © 2025 지능형 노인 낙상 감지 시스템 | 현재 시간: {timestamp}
+    © 2025 지능형 노인 낙상 감지 시스템 | 현재 시간: {format_kst(time.time())}
 </div>
 """, unsafe_allow_html=True)
 